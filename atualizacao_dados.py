@@ -0,0 +1,208 @@
+# Atualização do dataset processado em segundo plano (stale-while-revalidate)
+#
+# Com o TTL do cache, o primeiro usuário depois da expiração esperava a leitura da fonte
+# (rede) e o ETL inteiro. Aqui uma thread do processo refaz o dataset em intervalo fixo
+# ou quando pedido (botão de atualização), enquanto todas as sessões continuam lendo a
+# última versão pronta. A troca é só a substituição de uma referência sob um lock, e uma
+# atualização com falha mantém a versão anterior (o erro fica disponível para a tela).
+# Com o cache compartilhado, as réplicas do app leem e publicam o mesmo dataset (ver
+# `cache_compartilhado`): só uma delas consulta a fonte a cada atualização. Linhas que
+# ainda não chegaram à fonte (lançamentos do app; ver `lancamento_dados`) entram por um
+# complemento aplicado sobre cada versão carregada, sem refazer a carga.
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from cache_compartilhado import carregar_dados_compartilhados, MODO_CACHE_COMPARTILHADO, CAMINHO_DATASET_COMPARTILHADO
+from dashboard_data import (
+    montar_dados_processados, forcar_ressincronizacao_completa, expirar_snapshot_fonte, obter_versao_dados,
+    calcular_assinatura_configuracao
+)
+from instrumentacao import registrar_evento, contar_linhas, COMPONENTE_PIPELINE, COMPONENTE_CACHE
+from snapshot_dados import expirar_snapshot, IDADE_MAXIMA_SNAPSHOT_SEGUNDOS
+
+# Intervalo entre atualizações automáticas (padrão: a idade máxima do snapshot)
+INTERVALO_ATUALIZACAO_SEGUNDOS = float(os.environ.get('INTERVALO_ATUALIZACAO_DADOS_SEGUNDOS', IDADE_MAXIMA_SNAPSHOT_SEGUNDOS))
+
+registro_log = logging.getLogger(__name__)
+
+def carregar_dados(forcar: bool = False) -> pd.DataFrame:
+    """
+    Carregador padrão do atualizador: o dataset compartilhado entre réplicas ou, sem o
+    cache compartilhado, o pipeline direto.
+
+    Args:
+        forcar (bool): Descarta os snapshots e refaz o dataset mesmo que esteja recente.
+    """
+    if forcar:
+        forcar_ressincronizacao_completa()
+    if MODO_CACHE_COMPARTILHADO:
+        return carregar_dados_compartilhados(
+            montar_dados_processados, calcular_assinatura_configuracao(), obter_versao_dados, forcar=forcar
+        )
+    return montar_dados_processados()
+
+def expirar_dados_fonte(fonte_dados):
+    """
+    Faz a próxima atualização ler as linhas acrescentadas a `fonte_dados` (ex: lançamentos
+    recém-enviados), em vez de servir o snapshot e o dataset compartilhado ainda recentes.
+    """
+    expirar_snapshot_fonte(fonte_dados)
+    if MODO_CACHE_COMPARTILHADO:
+        expirar_snapshot(CAMINHO_DATASET_COMPARTILHADO)
+
+class AtualizadorDados:
+    """
+    Mantém a última versão pronta do dataset e a refaz em uma thread de fundo.
+    Só a primeira carga do processo (quando ainda não há nada para servir) é feita na
+    thread de quem pediu os dados.
+
+    O `complemento` opcional, `complemento(dados) -> dados`, acrescenta à versão carregada
+    as linhas que ainda não estavam na fonte quando ela foi lida (o instante da leitura vem
+    nos `attrs`; ver `dashboard_data.ler_dados_brutos_fonte`); é reaplicado a cada carga e
+    quando pedido (ver `aplicar_complemento`).
+    """
+
+    def __init__(self, carregador=carregar_dados, intervalo_segundos: float = INTERVALO_ATUALIZACAO_SEGUNDOS, complemento=None):
+        self.carregador = carregador
+        self.intervalo_segundos = intervalo_segundos
+        self.complemento = complemento
+        self.dados = None
+        # Última versão carregada, antes do complemento
+        self.dados_carregados = None
+        self.instante_dados = None
+        self.ultimo_erro = None
+        self.trava = threading.Lock()
+        # Serializa as cargas: a primeira carga síncrona e a thread nunca rodam juntas
+        self.trava_carga = threading.Lock()
+        self.pedido_atualizacao = threading.Event()
+        self.ressincronizar = False
+        self.thread = None
+
+    def iniciar(self):
+        """Inicia a thread de atualização (uma por atualizador; chamadas repetidas são ignoradas)."""
+        with self.trava:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self.executar_laco, name='atualizador_dados', daemon=True)
+            self.thread.start()
+
+    def obter_dados(self) -> pd.DataFrame:
+        """
+        Última versão pronta do dataset, sem esperar a fonte. Se ainda não houver nenhuma,
+        faz a primeira carga agora. Cada acesso é registrado como evento de cache: 'hit'
+        (versão recente), 'stale' (versão antiga servida enquanto a thread a refaz) ou 'miss'
+        (primeira carga, feita na thread de quem pediu).
+
+        Returns:
+            pd.DataFrame: Dataset processado (vazio se a primeira carga falhou; ver `ultimo_erro`).
+        """
+        inicio = time.perf_counter()
+        resultado_cache = self.classificar_acesso()
+        if self.dados is None:
+            with self.trava_carga:
+                if self.dados is None:
+                    self.atualizar()
+        dados = self.dados if self.dados is not None else pd.DataFrame()
+        registrar_evento({
+            'componente': COMPONENTE_CACHE,
+            'etapa': 'dados_processados',
+            'segundos': round(time.perf_counter() - inicio, 6),
+            'resultado_cache': resultado_cache,
+            'linhas_saida': contar_linhas(dados),
+            'versao_dados': obter_versao_dados(dados),
+        })
+        return dados
+
+    def classificar_acesso(self) -> str:
+        """'miss' sem versão pronta; 'stale' se ela passou do intervalo ou uma carga está pendente; senão 'hit'."""
+        if self.dados is None:
+            return 'miss'
+        versao_vencida = self.instante_dados is None or time.time() - self.instante_dados > self.intervalo_segundos
+        if versao_vencida or self.pedido_atualizacao.is_set() or self.trava_carga.locked():
+            return 'stale'
+        return 'hit'
+
+    def solicitar_atualizacao(self, ressincronizar: bool = False):
+        """
+        Pede uma atualização imediata à thread, sem esperar por ela.
+
+        Args:
+            ressincronizar (bool): Descarta os snapshots antes (reprocessa todas as fontes).
+        """
+        with self.trava:
+            self.ressincronizar = self.ressincronizar or ressincronizar
+        self.pedido_atualizacao.set()
+
+    def atualizar(self) -> bool:
+        """
+        Refaz o dataset e, se deu certo, passa a servi-lo. Uma falha mantém a versão anterior.
+
+        Returns:
+            bool: True se o dataset foi refeito.
+        """
+        with self.trava:
+            ressincronizar, self.ressincronizar = self.ressincronizar, False
+
+        inicio = time.perf_counter()
+        try:
+            dados_novos = self.carregador(forcar=ressincronizar)
+        except Exception as erro:
+            registro_log.warning("Atualização dos dados falhou; mantendo a versão anterior: %s", erro)
+            with self.trava:
+                self.ultimo_erro = erro
+            self.registrar_atualizacao('falha', inicio)
+            return False
+
+        with self.trava:
+            self.dados_carregados = dados_novos
+            self.publicar(self.complementar(dados_novos))
+            self.instante_dados = time.time()
+            self.ultimo_erro = None
+        self.registrar_atualizacao('sucesso', inicio)
+        return True
+
+    def aplicar_complemento(self):
+        """
+        Reaplica o complemento sobre a última versão carregada (ex: logo após um lançamento),
+        sem consultar a fonte. As sessões passam a ver as linhas novas na próxima execução.
+        """
+        with self.trava:
+            if self.dados_carregados is not None:
+                self.publicar(self.complementar(self.dados_carregados))
+
+    def complementar(self, dados: pd.DataFrame) -> pd.DataFrame:
+        """Versão carregada mais as linhas do complemento (sem elas se o complemento falhar)."""
+        if self.complemento is None:
+            return dados
+        try:
+            return self.complemento(dados)
+        except Exception as erro:
+            registro_log.warning("Complemento dos dados falhou; servindo só a versão carregada: %s", erro)
+            return dados
+
+    def publicar(self, dados_novos: pd.DataFrame):
+        """Passa a servir `dados_novos` (chamado com `self.trava`)."""
+        # Mesma versão: mantém o objeto já servido (e os caches derivados dele)
+        if self.dados is None or obter_versao_dados(self.dados) != obter_versao_dados(dados_novos):
+            self.dados = dados_novos
+
+    def executar_laco(self):
+        """Corpo da thread: atualiza a cada intervalo ou assim que uma atualização é pedida."""
+        while True:
+            self.pedido_atualizacao.wait(timeout=self.intervalo_segundos)
+            self.pedido_atualizacao.clear()
+            with self.trava_carga:
+                self.atualizar()
+
+    def registrar_atualizacao(self, resultado: str, inicio: float):
+        registrar_evento({
+            'componente': COMPONENTE_PIPELINE,
+            'etapa': 'atualizacao_segundo_plano',
+            'segundos': round(time.perf_counter() - inicio, 6),
+            'resultado': resultado,
+            'versao_dados': obter_versao_dados(self.dados) if self.dados is not None else None,
+        })
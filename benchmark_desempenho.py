@@ -0,0 +1,187 @@
+# Suíte de benchmark do ETL e da preparação de dados dos componentes visuais
+#
+# Gera planilhas sintéticas de vários tamanhos, mede cada etapa de `carregar_dados_processados`
+# e cada preparação de dados usada pelos `renderizar_*`, e grava os tempos em JSON para
+# comparar execuções entre commits.
+#
+# Uso:
+#   python benchmark_desempenho.py                               (1 mil, 100 mil, 1 milhão e 10 milhões)
+#   python benchmark_desempenho.py --tamanhos 1000 100000
+#   python benchmark_desempenho.py --comparar resultados_benchmark/benchmark_abc1234.json
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cubo_agregado import construir_cubo_agregado
+from dashboard_data import (
+    limpar_e_padronizar_dados, aplicar_regras_negocio_volei, calcular_metricas_performance,
+    calcular_chaves_periodo, MotorConsultas, FiltrosConsulta,
+    COL_ATLETA, COL_TIPO, COL_LOCAL, COL_FUNDAMENTOS, COL_CHAVE_DIA, COL_CHAVE_MES, COL_CATEGORIA, COL_TOTAL_CALCULADO
+)
+from fontes_dados import FonteCSV, FonteArrow, exportar_para_arrow
+from gerador_dados_sinteticos import gerar_planilha_sintetica, exportar_planilha_csv
+from indice_filtros import construir_indice_filtros, ConsultaFiltros
+from preparacao_visualizacoes import (
+    preparar_kpis_globais, preparar_metricas_por_categoria, preparar_resumo_ataque,
+    preparar_resumo_levantamento, construir_agregados_periodo
+)
+
+TAMANHOS_PADRAO = [1_000, 100_000, 1_000_000, 10_000_000]
+PASTA_RESULTADOS = Path('resultados_benchmark')
+COLUNAS_FILTRAVEIS = [COL_ATLETA, COL_TIPO, COL_LOCAL, COL_CATEGORIA, COL_FUNDAMENTOS]
+
+# Uma etapa é considerada regressão quando fica mais lenta que este fator
+LIMIAR_REGRESSAO_PADRAO = 1.2
+
+def obter_commit_atual() -> str:
+    """Hash curto do commit atual (ou 'desconhecido' fora de um repositório git)."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+def contar_linhas(resultado) -> int:
+    """Quantidade de linhas de um resultado de etapa (DataFrame, índice ou outro objeto)."""
+    if isinstance(resultado, pd.DataFrame):
+        return len(resultado)
+    if hasattr(resultado, 'dados'):
+        return len(resultado.dados)
+    if isinstance(resultado, int):
+        return resultado
+    return 1
+
+class MedidorEtapas:
+    """Executa etapas cronometradas e acumula os registros de um tamanho de planilha."""
+
+    def __init__(self, linhas_planilha: int):
+        self.linhas_planilha = linhas_planilha
+        self.registros = []
+
+    def medir(self, nome_etapa: str, funcao, dados_entrada, *argumentos):
+        """Cronometra `funcao(dados_entrada, *argumentos)` e registra tempo e linhas."""
+        linhas_entrada = contar_linhas(dados_entrada)
+        inicio = time.perf_counter()
+        resultado = funcao(dados_entrada, *argumentos)
+        segundos = time.perf_counter() - inicio
+
+        self.registros.append({
+            'etapa': nome_etapa,
+            'linhas_planilha': self.linhas_planilha,
+            'linhas_entrada': linhas_entrada,
+            'linhas_saida': contar_linhas(resultado),
+            'segundos': round(segundos, 6),
+        })
+        print(f"  {nome_etapa:<35} {segundos:>10.4f}s  ({linhas_entrada:,} -> {contar_linhas(resultado):,} linhas)")
+        return resultado
+
+def aplicar_filtros_tipicos(indice_filtros, atleta: str) -> FiltrosConsulta:
+    """Reproduz a consulta da sidebar: atleta, período completo e as opções de cada widget."""
+    consulta = ConsultaFiltros(indice_filtros)
+    consulta.restringir(COL_ATLETA, [atleta])
+    data_inicio, data_fim = consulta.obter_limites_datas()
+    consulta.restringir_datas(data_inicio, data_fim)
+    for coluna in COLUNAS_FILTRAVEIS[1:]:
+        consulta.contar_opcoes(coluna)
+    return FiltrosConsulta(data_inicio, data_fim, {COL_ATLETA: [atleta]})
+
+def medir_tamanho(linhas_planilha: int, incluir_leitura_csv: bool) -> list:
+    """Mede todas as etapas do pipeline e da preparação visual para um tamanho de planilha."""
+    print(f"\n{linhas_planilha:,} linhas")
+    medidor = MedidorEtapas(linhas_planilha)
+    dados_brutos = medidor.medir('gerar_planilha_sintetica', gerar_planilha_sintetica, linhas_planilha)
+
+    if incluir_leitura_csv:
+        with tempfile.TemporaryDirectory() as pasta_temporaria:
+            caminho_csv = Path(pasta_temporaria) / 'planilha.csv'
+            exportar_planilha_csv(dados_brutos, caminho_csv)
+            dados_brutos = medidor.medir('leitura_csv', FonteCSV.ler_dados_brutos, FonteCSV(caminho_csv))
+
+            caminho_arrow = Path(pasta_temporaria) / 'planilha.arrow'
+            exportar_para_arrow(dados_brutos, caminho_arrow)
+            dados_brutos = medidor.medir('leitura_arrow', FonteArrow.ler_dados_brutos, FonteArrow(caminho_arrow))
+
+    # Etapas de carregar_dados_processados
+    dados = medidor.medir('limpar_e_padronizar_dados', limpar_e_padronizar_dados, dados_brutos)
+    dados = medidor.medir('aplicar_regras_negocio_volei', aplicar_regras_negocio_volei, dados)
+    dados = medidor.medir('calcular_metricas_performance', calcular_metricas_performance, dados)
+    dados = medidor.medir('calcular_chaves_periodo', calcular_chaves_periodo, dados)
+
+    # Estruturas derivadas (uma vez por versão do dataset)
+    cubo = medidor.medir('construir_cubo_agregado', construir_cubo_agregado, dados)
+    indice_filtros = medidor.medir('construir_indice_filtros', construir_indice_filtros, cubo, COLUNAS_FILTRAVEIS, COL_TOTAL_CALCULADO)
+    motor_consultas = medidor.medir('construir_motor_consultas', MotorConsultas, cubo)
+
+    # Preparação de dados de cada componente (a cada rerun)
+    atleta = str(cubo[COL_ATLETA].iloc[0])
+    filtros = medidor.medir('aplicar_filtros_laterais', aplicar_filtros_tipicos, indice_filtros, atleta)
+    medidor.medir('preparar_kpis_globais', preparar_kpis_globais, motor_consultas, filtros)
+    medidor.medir('preparar_metricas_por_categoria', preparar_metricas_por_categoria, motor_consultas, filtros)
+    medidor.medir('preparar_resumo_levantamento', preparar_resumo_levantamento, motor_consultas, filtros)
+    medidor.medir('preparar_resumo_ataque', preparar_resumo_ataque, motor_consultas, filtros)
+    medidor.medir('agregados_periodo_mensal', construir_agregados_periodo, motor_consultas, COL_CHAVE_MES)
+    medidor.medir('agregados_periodo_diario', construir_agregados_periodo, motor_consultas, COL_CHAVE_DIA, True)
+    return medidor.registros
+
+def gravar_resultados(registros: list, caminho_saida: Path):
+    """Grava os registros em JSON, junto com o commit e as versões do ambiente."""
+    caminho_saida.parent.mkdir(parents=True, exist_ok=True)
+    conteudo = {
+        'commit': obter_commit_atual(),
+        'data_execucao': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'resultados': registros,
+    }
+    caminho_saida.write_text(json.dumps(conteudo, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"\nResultados gravados em {caminho_saida}")
+
+def comparar_com_referencia(registros: list, caminho_referencia: Path, limiar_regressao: float):
+    """Imprime a razão de tempo (atual / referência) por etapa e destaca as regressões."""
+    referencia = json.loads(caminho_referencia.read_text(encoding='utf-8'))
+    tempos_referencia = {
+        (registro['etapa'], registro['linhas_planilha']): registro['segundos']
+        for registro in referencia['resultados']
+    }
+    print(f"\nComparação com {caminho_referencia} (commit {referencia.get('commit')})")
+    for registro in registros:
+        segundos_referencia = tempos_referencia.get((registro['etapa'], registro['linhas_planilha']))
+        if not segundos_referencia:
+            continue
+        razao = registro['segundos'] / segundos_referencia
+        marcador = '  <-- REGRESSÃO' if razao > limiar_regressao else ''
+        print(f"  {registro['etapa']:<35} {registro['linhas_planilha']:>12,}  {razao:>6.2f}x{marcador}")
+
+def interpretar_argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark do ETL e da preparação visual do dashboard.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO, help="Quantidades de linhas a medir.")
+    parser.add_argument('--saida', type=Path, help="Arquivo JSON de saída (padrão: resultados_benchmark/benchmark_<commit>.json).")
+    parser.add_argument('--comparar', type=Path, help="JSON de uma execução anterior para comparação.")
+    parser.add_argument('--limiar-regressao', type=float, default=LIMIAR_REGRESSAO_PADRAO)
+    parser.add_argument('--sem-leitura-csv', action='store_true', help="Não mede a leitura de CSV/Arrow (evita gravar arquivos grandes).")
+    return parser.parse_args()
+
+def executar_benchmark():
+    argumentos = interpretar_argumentos()
+    registros = []
+    for linhas_planilha in argumentos.tamanhos:
+        registros.extend(medir_tamanho(linhas_planilha, not argumentos.sem_leitura_csv))
+
+    caminho_saida = argumentos.saida or PASTA_RESULTADOS / f"benchmark_{obter_commit_atual()}.json"
+    gravar_resultados(registros, caminho_saida)
+
+    if argumentos.comparar:
+        comparar_com_referencia(registros, argumentos.comparar, argumentos.limiar_regressao)
+
+if __name__ == "__main__":
+    executar_benchmark()
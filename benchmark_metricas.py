@@ -0,0 +1,79 @@
+# Benchmark do motor de métricas vetorizado (calcular_metricas_performance)
+#
+# Uso: python benchmark_metricas.py
+#
+# Mede a vazão (linhas por segundo) do cálculo de métricas de 1 mil a 10 milhões de linhas
+# e compara com a implementação antiga baseada em `apply` linha a linha.
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard_data import (
+    calcular_metricas_performance,
+    COL_FUNDAMENTOS, COL_QTD_CORRETA, COL_QTD_ERRADA, COL_QTD_TOTAL,
+    COL_TOTAL_CALCULADO, COL_EFICIENCIA
+)
+
+TAMANHOS_AMOSTRA = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+# A versão antiga leva minutos acima deste tamanho, então é medida só até aqui
+LIMITE_LINHAS_VERSAO_ANTIGA = 100_000
+
+FUNDAMENTOS_EXEMPLO = [
+    'Saque - Viagem', 'Recepção - Manchete', 'Ataque - Diagonal', 'Ataque - Paralela',
+    'Levantamento - Bom (não considere manchete)', 'Levantamento - Condução (Erro)'
+]
+
+def gerar_dados_exemplo(quantidade_linhas: int) -> pd.DataFrame:
+    """Gera um DataFrame já limpo, no formato esperado pelo cálculo de métricas."""
+    gerador = np.random.default_rng(42)
+    acertos = gerador.integers(0, 20, quantidade_linhas).astype(np.float64)
+    erros = gerador.integers(0, 20, quantidade_linhas).astype(np.float64)
+    return pd.DataFrame({
+        COL_FUNDAMENTOS: gerador.choice(FUNDAMENTOS_EXEMPLO, quantidade_linhas),
+        COL_QTD_CORRETA: acertos,
+        COL_QTD_ERRADA: erros,
+        COL_QTD_TOTAL: acertos + erros,
+    })
+
+def calcular_eficiencia_versao_antiga(dados: pd.DataFrame) -> pd.Series:
+    """Reproduz o cálculo original (uma chamada Python por linha), usado como referência."""
+    total_calculado = dados[COL_QTD_CORRETA] + dados[COL_QTD_ERRADA]
+    dados_referencia = dados.assign(**{COL_TOTAL_CALCULADO: total_calculado})
+    return dados_referencia.apply(
+        lambda linha: linha[COL_QTD_CORRETA] / linha[COL_TOTAL_CALCULADO]
+                      if linha[COL_TOTAL_CALCULADO] > 0 else 0.0,
+        axis=1
+    )
+
+def medir_segundos(funcao, dados: pd.DataFrame) -> tuple:
+    """Executa a função sobre uma cópia dos dados e retorna (resultado, segundos)."""
+    copia_dados = dados.copy()
+    inicio = time.perf_counter()
+    resultado = funcao(copia_dados)
+    return resultado, time.perf_counter() - inicio
+
+def formatar_vazao(quantidade_linhas: int, segundos: float) -> str:
+    """Formata a vazão em milhões de linhas por segundo."""
+    return f"{quantidade_linhas / segundos / 1e6:10.2f} M linhas/s"
+
+def executar_benchmark():
+    print(f"{'Linhas':>12} | {'Vetorizado':>12} | {'Vazão':>20} | {'Versão antiga':>14} | {'Ganho':>8}")
+    for quantidade_linhas in TAMANHOS_AMOSTRA:
+        dados = gerar_dados_exemplo(quantidade_linhas)
+        resultado_novo, segundos_novo = medir_segundos(calcular_metricas_performance, dados)
+        linha_relatorio = f"{quantidade_linhas:>12,} | {segundos_novo:>11.4f}s | {formatar_vazao(quantidade_linhas, segundos_novo):>20}"
+
+        if quantidade_linhas <= LIMITE_LINHAS_VERSAO_ANTIGA:
+            resultado_antigo, segundos_antigo = medir_segundos(calcular_eficiencia_versao_antiga, dados)
+            # Garante que o motor vetorizado produz exatamente os mesmos valores
+            np.testing.assert_allclose(resultado_novo[COL_EFICIENCIA].to_numpy(), resultado_antigo.to_numpy())
+            linha_relatorio += f" | {segundos_antigo:>13.4f}s | {segundos_antigo / segundos_novo:>7.0f}x"
+        else:
+            linha_relatorio += f" | {'-':>14} | {'-':>8}"
+
+        print(linha_relatorio)
+
+if __name__ == "__main__":
+    executar_benchmark()
@@ -0,0 +1,224 @@
+# Dataset processado compartilhado entre processos (réplicas do app na mesma máquina)
+#
+# Cada réplica do Streamlit tinha o próprio cache: lia a planilha, rodava o ETL e guardava
+# a própria cópia do dataset. Aqui o dataset unificado fica num arquivo Arrow IPC (sem
+# compressão) que todas as réplicas mapeiam em memória: as colunas do DataFrame apontam
+# direto para as páginas do arquivo, que o sistema operacional mantém uma vez só no page
+# cache. Uma trava de arquivo garante que só uma réplica refaz o dataset por vez; as
+# demais continuam servindo a versão gravada até a nova ser publicada (rename atômico).
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from snapshot_dados import CAMINHO_SNAPSHOT, IDADE_MAXIMA_SNAPSHOT_SEGUNDOS
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos (cada réplica refaz o próprio dataset)
+    fcntl = None
+
+# Quando ativo, o atualizador de dados lê e publica o dataset pelo arquivo compartilhado
+MODO_CACHE_COMPARTILHADO = True
+
+CAMINHO_DATASET_COMPARTILHADO = Path(os.environ.get(
+    'CAMINHO_DATASET_COMPARTILHADO', CAMINHO_SNAPSHOT.with_name('dataset_compartilhado.arrow')
+))
+
+CHAVE_METADADOS_COMPARTILHADO = b"dataset_compartilhado"
+
+# Tipos anuláveis do pandas (valores + máscara de nulos), como o Int16 das quantidades
+ARRAYS_MASCARADOS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+registro_log = logging.getLogger(__name__)
+
+def obter_caminho_trava(caminho: Path) -> Path:
+    """Arquivo usado só para a trava (o dataset em si é substituído a cada publicação)."""
+    return caminho.with_name(f"{caminho.name}.lock")
+
+def travar_arquivo(arquivo_trava, bloquear: bool, compartilhada: bool = False) -> bool:
+    """
+    Trava exclusiva (flock) sobre o arquivo aberto; liberada ao fechá-lo. Com
+    `compartilhada`, várias travas compartilhadas convivem e só excluem a exclusiva.
+
+    Returns:
+        bool: True se a trava foi obtida (sempre True com `bloquear`).
+    """
+    if fcntl is None:
+        return True
+    modo = fcntl.LOCK_SH if compartilhada else fcntl.LOCK_EX
+    try:
+        fcntl.flock(arquivo_trava.fileno(), modo if bloquear else modo | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+def ler_metadados_compartilhados(caminho: Path) -> dict | None:
+    """Metadados gravados com o dataset (lê só o esquema), ou None se o arquivo não é utilizável."""
+    try:
+        with pa.memory_map(str(caminho), 'r') as arquivo_mapeado:
+            esquema = pa.ipc.open_file(arquivo_mapeado).schema
+        return json.loads(esquema.metadata[CHAVE_METADADOS_COMPARTILHADO])
+    except FileNotFoundError:
+        return None
+    except Exception as erro:
+        registro_log.warning("Dataset compartilhado ilegível em %s: %s", caminho, erro)
+        return None
+
+def converter_coluna_sem_copia(coluna: pa.Array, tipo_pandas):
+    """
+    Converte uma coluna Arrow no array pandas do tipo original reaproveitando os buffers
+    (mapeados) do arquivo: códigos das categorias, inteiros e floats sem nulos e datas não
+    são copiados. Colunas com nulos copiam só o necessário para a máscara.
+    """
+    if isinstance(tipo_pandas, pd.CategoricalDtype):
+        indices = coluna.indices.fill_null(-1) if coluna.null_count else coluna.indices
+        return pd.Categorical.from_codes(indices.to_numpy(zero_copy_only=False), dtype=tipo_pandas, validate=False)
+    if isinstance(tipo_pandas, pd.api.extensions.ExtensionDtype) and issubclass(tipo_pandas.construct_array_type(), ARRAYS_MASCARADOS):
+        if coluna.null_count:
+            valores = coluna.fill_null(0).to_numpy(zero_copy_only=False)
+            mascara = coluna.is_null().to_numpy(zero_copy_only=False)
+        else:
+            valores = coluna.to_numpy(zero_copy_only=False)
+            # np.zeros não ocupa memória física até ser escrito
+            mascara = np.zeros(len(coluna), dtype=bool)
+        return tipo_pandas.construct_array_type()(valores, mascara)
+    if isinstance(tipo_pandas, np.dtype) and tipo_pandas.kind in 'fiumM':
+        return coluna.to_numpy(zero_copy_only=False).astype(tipo_pandas, copy=False)
+    return coluna.to_pandas().astype(tipo_pandas).array
+
+def converter_tabela_sem_copia(tabela: pa.Table) -> pd.DataFrame:
+    """
+    DataFrame com os mesmos tipos de `tabela.to_pandas()` cujas colunas apontam para os
+    buffers da tabela (ver `converter_coluna_sem_copia`).
+    """
+    # Os tipos pandas exatos (categorias, Int16...) saem da conversão de uma fatia vazia
+    tipos_pandas = tabela.slice(0, 0).to_pandas().dtypes
+    colunas = {}
+    for nome in tabela.column_names:
+        coluna = tabela.column(nome)
+        if coluna.num_chunks != 1:
+            colunas[nome] = coluna.to_pandas().astype(tipos_pandas[nome]).array
+            continue
+        colunas[nome] = converter_coluna_sem_copia(coluna.chunk(0), tipos_pandas[nome])
+    return pd.DataFrame(colunas, copy=False)
+
+def ler_dataset_compartilhado(caminho: Path, assinatura: str) -> pd.DataFrame | None:
+    """
+    Mapeia o arquivo em memória e monta o DataFrame sem copiar as colunas. As colunas
+    são somente leitura (as páginas são as mesmas em todas as réplicas).
+
+    Args:
+        caminho (Path): Arquivo do dataset compartilhado.
+        assinatura (str): Configuração esperada (fontes, regras); outro valor invalida o arquivo.
+
+    Returns:
+        pd.DataFrame | None: Dataset com os `attrs` gravados, ou None se não houver um utilizável.
+    """
+    try:
+        # O mapeamento segue válido depois do `with` e mesmo se o arquivo for substituído:
+        # os buffers da tabela mantêm a referência às páginas
+        with pa.memory_map(str(caminho), 'r') as arquivo_mapeado:
+            tabela = pa.ipc.open_file(arquivo_mapeado).read_all()
+        metadados = json.loads(tabela.schema.metadata[CHAVE_METADADOS_COMPARTILHADO])
+    except FileNotFoundError:
+        return None
+    except Exception as erro:
+        registro_log.warning("Dataset compartilhado ilegível em %s: %s", caminho, erro)
+        return None
+
+    if metadados.get('assinatura') != assinatura:
+        return None
+    dados = converter_tabela_sem_copia(tabela)
+    dados.attrs.update(metadados['attrs'])
+    return dados
+
+def gravar_dataset_compartilhado(dados: pd.DataFrame, caminho: Path, assinatura: str, versao_dados: str):
+    """
+    Publica o dataset: grava num temporário e o renomeia por cima do anterior (as réplicas
+    que ainda mapeiam a versão antiga não são afetadas). Se a versão não mudou, só renova
+    a data do arquivo.
+    """
+    metadados_atuais = ler_metadados_compartilhados(caminho)
+    if metadados_atuais and metadados_atuais.get('assinatura') == assinatura and metadados_atuais.get('versao_dados') == versao_dados:
+        os.utime(caminho)
+        return
+
+    metadados = {'assinatura': assinatura, 'versao_dados': versao_dados, 'attrs': dados.attrs}
+    tabela = pa.Table.from_pandas(dados, preserve_index=False)
+    tabela = tabela.replace_schema_metadata({
+        **(tabela.schema.metadata or {}), CHAVE_METADADOS_COMPARTILHADO: json.dumps(metadados, default=str).encode()
+    })
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho_temporario = caminho.with_suffix(f".{os.getpid()}.tmp")
+    with pa.OSFile(str(caminho_temporario), 'wb') as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    os.replace(caminho_temporario, caminho)
+
+def arquivo_esta_recente(caminho: Path, idade_maxima_segundos: float) -> bool:
+    """Indica se o dataset foi publicado (ou confirmado) há pouco tempo."""
+    try:
+        return time.time() - caminho.stat().st_mtime <= idade_maxima_segundos
+    except FileNotFoundError:
+        return False
+
+def carregar_dados_compartilhados(
+    carregador,
+    assinatura: str,
+    versao_de,
+    caminho: Path = CAMINHO_DATASET_COMPARTILHADO,
+    idade_maxima_segundos: float = IDADE_MAXIMA_SNAPSHOT_SEGUNDOS,
+    forcar: bool = False
+) -> pd.DataFrame:
+    """
+    Lê o dataset compartilhado quando está recente; senão, a réplica que obtiver a trava o
+    refaz com `carregador()` e o publica, e as outras servem a versão já gravada.
+
+    Args:
+        carregador: Função sem argumentos que monta o dataset processado.
+        assinatura (str): Configuração que define o conteúdo (ver `ler_dataset_compartilhado`).
+        versao_de: Função que extrai a versão de um dataset (evita regravar a mesma versão).
+        caminho (Path): Arquivo compartilhado.
+        idade_maxima_segundos (float): Idade a partir da qual o arquivo é refeito.
+        forcar (bool): Refaz o dataset mesmo com o arquivo recente.
+
+    Returns:
+        pd.DataFrame: Dataset processado, mapeado do arquivo compartilhado.
+    """
+    if not forcar and arquivo_esta_recente(caminho, idade_maxima_segundos):
+        dados = ler_dataset_compartilhado(caminho, assinatura)
+        if dados is not None:
+            return dados
+
+    caminho_trava = obter_caminho_trava(caminho)
+    caminho_trava.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho_trava, 'a') as arquivo_trava:
+        if not travar_arquivo(arquivo_trava, bloquear=False):
+            # Outra réplica está refazendo o dataset: serve a versão gravada sem esperar
+            dados = ler_dataset_compartilhado(caminho, assinatura)
+            if dados is not None:
+                return dados
+            travar_arquivo(arquivo_trava, bloquear=True)
+            # Quem esperou encontra o dataset que a outra réplica acabou de publicar
+            forcar = False
+
+        if not forcar and arquivo_esta_recente(caminho, idade_maxima_segundos):
+            dados = ler_dataset_compartilhado(caminho, assinatura)
+            if dados is not None:
+                return dados
+
+        dados_novos = carregador()
+        try:
+            gravar_dataset_compartilhado(dados_novos, caminho, assinatura, versao_de(dados_novos))
+        except Exception as erro:
+            registro_log.warning("Não foi possível publicar o dataset compartilhado em %s: %s", caminho, erro)
+            return dados_novos
+
+    # Relido do arquivo: a cópia montada nesta réplica é descartada e todas usam as mesmas páginas
+    dados = ler_dataset_compartilhado(caminho, assinatura)
+    return dados if dados is not None else dados_novos
@@ -0,0 +1,119 @@
+# Cache de figuras Plotly por estado dos filtros
+#
+# Todo widget alterado dispara um rerun completo do script, e cada gráfico refazia a sua
+# agregação e a construção da figura (`px.*` valida e monta todos os traces) mesmo quando
+# nada do que ele mostra mudou. Aqui a figura pronta fica guardada sob uma chave formada
+# pela versão do dataset e pela seleção que de fato afeta o gráfico; o cache é LRU e tem
+# teto de memória (tamanho estimado pela figura serializada).
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from instrumentacao import registrar_evento, COMPONENTE_CACHE
+
+# Teto de memória das figuras guardadas (somando todas as sessões) e de quantidade de entradas
+LIMITE_MEMORIA_FIGURAS_MB = float(os.environ.get('LIMITE_MEMORIA_FIGURAS_MB', 64))
+LIMITE_ENTRADAS_FIGURAS = 256
+
+def calcular_chave_figura(nome_grafico: str, versao_dados: str, *estado) -> str:
+    """
+    Chave do gráfico para a versão do dataset e o estado dos filtros que o afetam.
+
+    Args:
+        nome_grafico (str): Identifica o gráfico (o mesmo estado gera figuras diferentes por gráfico).
+        versao_dados (str): Versão do dataset processado.
+        *estado: Seleções relevantes (FiltrosConsulta, atletas, períodos...), com `repr` estável.
+
+    Returns:
+        str: Hash hexadecimal da combinação.
+    """
+    return hashlib.sha1(repr((nome_grafico, versao_dados, estado)).encode('utf-8')).hexdigest()
+
+def estimar_tamanho_bytes(valor) -> int:
+    """Tamanho aproximado de um valor guardado: figuras pelo JSON, DataFrames pela memória."""
+    if isinstance(valor, go.Figure):
+        return len(pio.to_json(valor, validate=False))
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, (tuple, list)):
+        return sum(estimar_tamanho_bytes(item) for item in valor)
+    return sys.getsizeof(valor)
+
+class CacheFiguras:
+    """
+    Cache LRU de figuras (ou de tuplas figura + dados de apoio) com teto de memória.
+    É compartilhado entre sessões: o acesso ao dicionário é protegido por um lock, mas a
+    construção roda fora dele, para um gráfico lento não bloquear os demais.
+    """
+
+    def __init__(self, limite_memoria_mb: float = LIMITE_MEMORIA_FIGURAS_MB, limite_entradas: int = LIMITE_ENTRADAS_FIGURAS):
+        self.limite_memoria_bytes = int(limite_memoria_mb * 1024 ** 2)
+        self.limite_entradas = limite_entradas
+        self.entradas = OrderedDict()
+        self.bytes_ocupados = 0
+        self.trava = threading.Lock()
+
+    def obter_ou_construir(self, nome_grafico: str, chave: str, construtor):
+        """
+        Devolve o valor guardado sob `chave` ou o constrói com `construtor()` e o guarda.
+
+        Args:
+            nome_grafico (str): Nome exibido no painel de performance/log.
+            chave (str): Resultado de `calcular_chave_figura`.
+            construtor: Função sem argumentos que agrega os dados e monta a figura.
+
+        Returns:
+            O valor construído (ou guardado) para a chave.
+        """
+        inicio = time.perf_counter()
+        with self.trava:
+            entrada = self.entradas.get(chave)
+            if entrada is not None:
+                self.entradas.move_to_end(chave)
+        if entrada is not None:
+            self.registrar_acesso(nome_grafico, 'hit', inicio)
+            return entrada[0]
+
+        valor = construtor()
+        self.guardar(chave, valor, estimar_tamanho_bytes(valor))
+        self.registrar_acesso(nome_grafico, 'miss', inicio)
+        return valor
+
+    def guardar(self, chave: str, valor, tamanho_bytes: int):
+        """Insere o valor e descarta os menos usados até respeitar os limites."""
+        if tamanho_bytes > self.limite_memoria_bytes:
+            return
+
+        with self.trava:
+            entrada_anterior = self.entradas.pop(chave, None)
+            if entrada_anterior is not None:
+                self.bytes_ocupados -= entrada_anterior[1]
+            self.entradas[chave] = (valor, tamanho_bytes)
+            self.bytes_ocupados += tamanho_bytes
+
+            while self.bytes_ocupados > self.limite_memoria_bytes or len(self.entradas) > self.limite_entradas:
+                _, (_, tamanho_descartado) = self.entradas.popitem(last=False)
+                self.bytes_ocupados -= tamanho_descartado
+
+    def limpar(self):
+        """Descarta todas as figuras guardadas."""
+        with self.trava:
+            self.entradas.clear()
+            self.bytes_ocupados = 0
+
+    def registrar_acesso(self, nome_grafico: str, resultado_cache: str, inicio: float):
+        registrar_evento({
+            'componente': COMPONENTE_CACHE,
+            'etapa': f"figura:{nome_grafico}",
+            'segundos': round(time.perf_counter() - inicio, 6),
+            'resultado_cache': resultado_cache,
+            'figuras_guardadas': len(self.entradas),
+            'memoria_figuras_mb': round(self.bytes_ocupados / 1024 ** 2, 2),
+        })
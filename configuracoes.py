@@ -65,3 +65,27 @@ Bola dentro da quadra adversária.
 **❌ Errada:**
 Bola fora, bola na rede."""
 }
+
+# Regras de negócio aplicadas aos fundamentos (ver `aplicar_regras_negocio_volei`).
+# Cada regra casa por nome exato ('fundamento': texto ou lista) ou por expressão regular
+# ('padrao'), e a primeira regra que casar decide a ação:
+#   'forcar_acerto'       -> todas as ações da linha contam como acerto
+#   'forcar_erro'         -> todas as ações da linha contam como erro
+#   'remover_totalizador' -> a linha é a soma das subcategorias e é descartada
+# Para usar outra tabela sem alterar o código, aponte CAMINHO_REGRAS_NEGOCIO para um JSON
+# com a mesma lista.
+REGRAS_NEGOCIO_VOLEI = [
+    # Levantamento 'Bom' implica 100% de acerto
+    {'fundamento': 'Levantamento - Bom (não considere manchete)', 'acao': 'forcar_acerto'},
+    # Erros fatais de levantamento implicam 100% de erro
+    {
+        'fundamento': [
+            'Levantamento - Bola não permite ataque (Erro)',
+            'Levantamento - Dois toque (Erro)',
+            'Levantamento - Condução (Erro)',
+        ],
+        'acao': 'forcar_erro',
+    },
+    # 'Levantamento' e 'Ataque' já são a soma das subcategorias (evita contagem duplicada)
+    {'fundamento': ['Levantamento', 'Ataque'], 'acao': 'remover_totalizador'},
+]
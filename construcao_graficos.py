@@ -0,0 +1,202 @@
+# Construção das figuras do dashboard (sem chamadas ao Streamlit)
+#
+# Cada `construir_grafico_*` prepara os dados pelas funções de `preparacao_visualizacoes`
+# e devolve a figura Plotly pronta (ou None sem dados). O app as exibe com `st.plotly_chart`
+# e o gerador de relatórios (`relatorios_atletas`) as grava em HTML estático.
+# plotly.express é importado dentro dos construtores: a importação só é paga na primeira
+# figura montada, e não na partida do app.
+import pandas as pd
+
+from dashboard_data import (
+    COL_CATEGORIA, COL_DATA, COL_EFICIENCIA, COL_QTD_CORRETA, COL_TOTAL_CALCULADO, ROTULO_ACERTO_LEVANTAMENTO
+)
+from preparacao_visualizacoes import (
+    preparar_resumo_ataque, preparar_resumo_levantamento, preparar_dados_grafico_categoria,
+    preparar_serie_eficiencia_diaria
+)
+from estatistica_comparacao import COL_IC_INFERIOR, COL_IC_SUPERIOR
+from configuracoes import CORES_CATEGORIAS
+
+# --- Helpers de Visualização ---
+
+def obter_cor_por_eficiencia(valor_eficiencia):
+    """Retorna código Hex da cor baseado na eficiência."""
+    if valor_eficiencia >= 0.70: return '#2ecc71' # Verde Excelente
+    if valor_eficiencia >= 0.50: return '#f1c40f' # Amarelo Atenção
+    return '#e74c3c' # Vermelho Crítico
+
+def obter_texto_status(valor_eficiencia):
+    """Retorna label de texto baseado na eficiência."""
+    if valor_eficiencia >= 0.70: return 'Excelente'
+    if valor_eficiencia >= 0.50: return 'Atenção'
+    return 'Crítico'
+
+# --- Gráficos ---
+
+def construir_grafico_quadrante_ataque(motor_consultas, filtros):
+    """Monta o gráfico de dispersão do quadrante de ataque (None se não houver ataques)."""
+    # Agrega apenas variações de ataque
+    resumo_ataque = preparar_resumo_ataque(motor_consultas, filtros)
+    
+    if resumo_ataque.empty:
+        return None
+    
+    volume_medio = resumo_ataque['Total Calculado'].mean()
+    meta_eficiencia_percentual = 0.60 
+    
+    import plotly.express as px
+
+    grafico_dispersao = px.scatter(
+        resumo_ataque,
+        x='Total Calculado',
+        y='Eficiencia',
+        # text='Fundamentos', # Removido para limpar a visualização
+        size='Total Calculado',
+        hover_data=['Fundamentos', 'Quantidade correta'],
+        color='Eficiencia',
+        color_continuous_scale='RdYlGn',
+        title="Relação Volume vs Eficiência",
+        labels={'Eficiencia': 'Eficiência (%)'}
+    )
+
+    grafico_dispersao.update_traces(
+        hovertemplate="<br>".join([
+            "Fundamento: %{customdata[0]}",
+            "Total Calculado: %{x}",
+            "Quantidade correta: %{customdata[1]}",
+            "Eficiência: %{y:.0%}"
+        ]) + "<extra></extra>"
+    )
+    
+    # Linhas de referência (Quadrantes)
+    grafico_dispersao.add_hline(y=meta_eficiencia_percentual, line_dash="dash", line_color="white", annotation_text="Meta")
+    grafico_dispersao.add_vline(x=volume_medio, line_dash="dash", line_color="white", annotation_text="Volume Médio")
+
+    # Formatação da barra de cores para porcentagem
+    grafico_dispersao.update_layout(coloraxis_colorbar=dict(tickformat='.0%'))
+    
+    # Anotações dos quadrantes
+    max_x, min_x = resumo_ataque['Total Calculado'].max(), resumo_ataque['Total Calculado'].min()
+    
+    # Lista de tuplas com configuração das anotações
+    # Ajuste de Y para evitar sobreposição (acima de 100% e abaixo de 0%)
+    offset_superior = 1.10
+    offset_inferior = -0.10
+    
+    config_quadrantes = [
+        (max_x, offset_superior, "💎 SEGURANÇA", "#2ecc71"),
+        (min_x, offset_superior, "🚀 POTENCIAL", "#3498db"),
+        (max_x, offset_inferior, "⚠️ RISCO", "#e74c3c"),
+        (min_x, offset_inferior, "🗑️ DESCARTE", "#7f8c8d")
+    ]
+    
+    for pos_x, pos_y, rotulo, cor in config_quadrantes:
+        grafico_dispersao.add_annotation(x=pos_x, y=pos_y, text=rotulo, showarrow=False, font=dict(color=cor, size=14))
+
+    # Formatação da barra de cores para porcentagem
+    grafico_dispersao.update_layout(
+        coloraxis_colorbar=dict(tickformat='.0%'),
+        xaxis_title="Volume (Repetições)",
+        yaxis_title="Eficiência (%)",
+        yaxis_tickformat='.0%',
+        # Expande o eixo Y para caber as anotações deslocadas
+        yaxis=dict(range=[-0.15, 1.15]), 
+        height=500
+    )
+    return grafico_dispersao
+
+def construir_grafico_levantamento(motor_consultas, filtros):
+    """
+    Agrega os levantamentos por causa e monta o gráfico de rosca.
+    
+    Returns:
+        tuple: (resumo por Tipo Detalhado, figura — None se não houver ações).
+    """
+    # 1. Filtrar apenas levantamentos e 2. Agrupar por Tipo Detalhado (acerto ou causa do erro)
+    resumo_geral = preparar_resumo_levantamento(motor_consultas, filtros)
+    
+    if resumo_geral.empty:
+        return resumo_geral, None
+    
+    total_acoes = resumo_geral['Total Calculado'].sum()
+    
+    if total_acoes == 0:
+        return resumo_geral, None
+
+    import plotly.express as px
+
+    # 4. Gráfico de Rosca (Donut)
+    # Define cores para garantir que Acerto seja verde
+    grafico_rosca = px.pie(
+        resumo_geral,
+        values='Total Calculado',
+        names='Tipo Detalhado',
+        title=f"Distribuição Total: {int(total_acoes)} Ações",
+        hole=0.4,
+        color='Tipo Detalhado',
+        # Mapa de cores explícito para destacar o acerto e diferenciar erros
+        color_discrete_map={
+            ROTULO_ACERTO_LEVANTAMENTO: "#2ecc71", # Verde
+            "Dois toque": "#e74c3c",           # Vermelho
+            "Condução": "#e67e22",             # Laranja
+            "Bola não permite ataque": "#f1c40f" # Amarelo
+        } 
+    )
+    
+    grafico_rosca.update_traces(textposition='inside', textinfo='percent+label+value')
+    grafico_rosca.update_layout(showlegend=True)
+    return resumo_geral, grafico_rosca
+
+def construir_grafico_comparacao(dados_a, rotulo_a, dados_b, rotulo_b, **opcoes_grafico):
+    """
+    Barras agrupadas de eficiência por categoria para dois cenários.
+    
+    Args:
+        dados_a, dados_b (pd.DataFrame): Fatias do agregado por período de cada cenário.
+        rotulo_a, rotulo_b (str): Legenda de cada cenário.
+        **opcoes_grafico: Argumentos extras do `px.bar` (ex.: título).
+        
+    Returns:
+        go.Figure | None: Gráfico, ou None se nenhum cenário tiver dados.
+    """
+    df_grafico = pd.concat([
+        preparar_dados_grafico_categoria(dados_a, rotulo_a),
+        preparar_dados_grafico_categoria(dados_b, rotulo_b)
+    ])
+    
+    if df_grafico.empty:
+        return None
+    
+    # Barras de erro com o IC 95% (Wilson) de cada categoria
+    df_grafico = df_grafico.assign(
+        **{'Erro Superior': df_grafico[COL_IC_SUPERIOR] - df_grafico['Eficiencia'],
+           'Erro Inferior': df_grafico['Eficiencia'] - df_grafico[COL_IC_INFERIOR]}
+    )
+    import plotly.express as px
+
+    fig = px.bar(
+        df_grafico, x='Categoria', y='Eficiencia', color='Atleta',
+        barmode='group', text_auto='.0%', error_y='Erro Superior', error_y_minus='Erro Inferior',
+        **opcoes_grafico
+    )
+    fig.update_yaxes(tickformat='.0%')
+    return fig
+
+def construir_grafico_serie_diaria(agregados_diarios, atleta):
+    """
+    Linha de eficiência diária por categoria de um atleta. A série já vem reduzida no
+    servidor (LTTB), então o tamanho do gráfico não cresce com o histórico.
+    """
+    serie = preparar_serie_eficiencia_diaria(agregados_diarios, atleta)
+    if serie.empty:
+        return None
+
+    import plotly.express as px
+
+    fig = px.line(
+        serie, x=COL_DATA, y=COL_EFICIENCIA, color=COL_CATEGORIA, markers=True,
+        color_discrete_map=CORES_CATEGORIAS, hover_data=[COL_QTD_CORRETA, COL_TOTAL_CALCULADO],
+        title=f"Eficiência diária por categoria — {atleta}"
+    )
+    fig.update_yaxes(tickformat='.0%', range=[0, 1.05])
+    return fig
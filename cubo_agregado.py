@@ -0,0 +1,57 @@
+# Cubo de agregação (rollup) para os renderizadores do dashboard
+#
+# Calculado uma única vez por atualização de dados: soma acertos, erros e totais no grão
+# Fonte × Atleta × Data × Tipo × Local × Categoria × Fundamentos. Como mantém os mesmos nomes de
+# colunas do dataset processado, filtros e gráficos trabalham sobre ele sem mudanças,
+# e cada interação passa a custar o número de grupos em vez do número de linhas.
+import pandas as pd
+
+from instrumentacao import medir_etapa
+from dashboard_data import (
+    calcular_eficiencia,
+    COL_ATLETA, COL_DATA, COL_TIPO, COL_LOCAL, COL_CATEGORIA, COL_FUNDAMENTOS,
+    COL_QTD_CORRETA, COL_QTD_ERRADA, COL_TOTAL_CALCULADO, COL_EFICIENCIA,
+    COL_CHAVE_DIA, COL_CHAVE_SEMANA, COL_CHAVE_MES, COL_FONTE
+)
+
+# As chaves de período dependem só da Data, então não alteram o grão do cubo
+DIMENSOES_CUBO = [
+    COL_FONTE, COL_ATLETA, COL_DATA, COL_TIPO, COL_LOCAL, COL_CATEGORIA, COL_FUNDAMENTOS,
+    COL_CHAVE_DIA, COL_CHAVE_SEMANA, COL_CHAVE_MES
+]
+MEDIDAS_CUBO = [COL_QTD_CORRETA, COL_QTD_ERRADA, COL_TOTAL_CALCULADO]
+
+def agregar_cubo(dados: pd.DataFrame, dimensoes: list) -> pd.DataFrame:
+    """
+    Soma as medidas por um subconjunto das dimensões e recalcula a eficiência do grupo.
+    Serve tanto para montar o cubo a partir das linhas quanto para derivar visões mais
+    grossas a partir do próprio cubo (ex: por Categoria).
+
+    Args:
+        dados (pd.DataFrame): Linhas processadas ou células do cubo.
+        dimensoes (list): Colunas de agrupamento.
+
+    Returns:
+        pd.DataFrame: Uma linha por grupo com as medidas somadas e a eficiência.
+    """
+    # dropna=False preserva linhas sem Local; observed=True ignora categorias sem dados
+    agregado = dados.groupby(dimensoes, observed=True, dropna=False)[MEDIDAS_CUBO].sum().reset_index()
+    agregado[COL_EFICIENCIA] = calcular_eficiencia(agregado)
+    return agregado
+
+@medir_etapa()
+def construir_cubo_agregado(dados: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monta o cubo no grão mais fino usado pelo dashboard.
+
+    Args:
+        dados (pd.DataFrame): Dataset processado completo.
+
+    Returns:
+        pd.DataFrame: Cubo com as dimensões e medidas somadas (vazio se não houver dados).
+    """
+    if dados.empty:
+        return dados
+
+    dimensoes_presentes = [coluna for coluna in DIMENSOES_CUBO if coluna in dados.columns]
+    return agregar_cubo(dados, dimensoes_presentes)
@@ -1,12 +1,43 @@
 # Forced update for GitHub sync
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date
+
+import duckdb
 import pandas as pd
 import numpy as np
 import streamlit as st
-from streamlit_gsheets import GSheetsConnection
+
+from pandas.api.types import union_categoricals
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from cache_compartilhado import obter_caminho_trava, travar_arquivo
+from instrumentacao import medir_etapa, capturar_execucao, adotar_execucao
+
+from fontes_dados import obter_fontes_configuradas
+from ingestao_incremental import (
+    criar_estado_ingestao, historico_esta_intacto, remover_linhas_vazias_finais
+)
+from regras_negocio import (
+    resolver_acoes_fundamentos, calcular_assinatura_regras,
+    ACAO_NENHUMA, ACAO_FORCAR_ACERTO, ACAO_FORCAR_ERRO, ACAO_REMOVER_TOTALIZADOR, CAMINHO_REGRAS_NEGOCIO, REGRAS_NEGOCIO
+)
+from snapshot_dados import (
+    SnapshotDados, calcular_impressao_digital, encadear_impressao_digital, carregar_snapshot, salvar_snapshot,
+    snapshot_esta_recente, confirmar_snapshot_atualizado, descartar_snapshot, expirar_snapshot, obter_caminho_snapshot_fonte,
+    CAMINHO_SNAPSHOT, VERSAO_ESQUEMA_SNAPSHOT
+)
 
 # --- Constantes de Domínio e Configuração ---
 
 NOME_ABA_PLANILHA = 'Página1'
+# Abas carregadas (uma por dupla/temporada); sobrescritas por ABAS_FONTE_DADOS
+NOMES_ABAS_PLANILHA = [NOME_ABA_PLANILHA]
 
 # Nomes de Colunas (Origem)
 COL_DATA = 'Data'
@@ -24,6 +55,14 @@ COL_CATEGORIA = 'Categoria'
 COL_TOTAL_CALCULADO = 'Total Calculado'
 COL_EFICIENCIA = 'Eficiencia'
 
+# Chaves inteiras de período (calculadas no ETL a partir da Data)
+COL_CHAVE_DIA = 'Chave Dia'             # AAAAMMDD
+COL_CHAVE_SEMANA = 'Chave Semana ISO'   # AAAASS (ano e semana ISO)
+COL_CHAVE_MES = 'Chave Mês'             # AAAAMM
+
+# Aba/arquivo de origem de cada linha (acrescentada na união das fontes)
+COL_FONTE = 'Fonte'
+
 # Strings de Regra de Negócio
 PREFIXO_ATAQUE = 'Ataque'
 TEXTO_LEVANTAMENTO = 'Levantamento'
@@ -45,11 +84,69 @@ CASOS_LEVANTAMENTO_ERRO_FATAL = [
     'Levantamento - Condução (Erro)'
 ]
 
+# --- Taxonomia dos Fundamentos ---
+
+# Atributos derivados do texto de cada fundamento (calculados uma vez por valor distinto)
+COL_SUBTIPO = 'Subtipo'
+COL_FUNDAMENTO_ERRO = 'Fundamento de Erro'
+COL_VARIACAO_ATAQUE = 'Variação de Ataque'
+PREFIXO_VARIACAO_ATAQUE = 'Ataque -'
+MARCADOR_FUNDAMENTO_ERRO = '(Erro)'
+ROTULO_ACERTO_LEVANTAMENTO = "✅ Acerto (Bola Boa)"
+
+# Conjuntos fixos de categorias (valores observados fora deles são acrescentados ao final)
+CATEGORIAS_FUNDAMENTO = [PREFIXO_ATAQUE, TEXTO_LEVANTAMENTO, TEXTO_RECEPCAO, TEXTO_SAQUE, CATEGORIA_OUTROS]
+TIPOS_TREINO = [TIPO_ESPECIFICO, TIPO_RACHA, TIPO_TORNEIO]
+
+# --- Esquema Compacto (Memória) ---
+
+# Quando ativo, dimensões viram `category` e contagens viram inteiros anuláveis pequenos
+MODO_ESQUEMA_COMPACTO = True
+
+COLUNAS_QUANTIDADE = [COL_QTD_CORRETA, COL_QTD_ERRADA, COL_QTD_TOTAL]
+CATEGORIAS_FIXAS_POR_DIMENSAO = {
+    COL_ATLETA: [],
+    COL_TIPO: TIPOS_TREINO,
+    COL_LOCAL: [],
+    COL_FUNDAMENTOS: [],
+}
+TIPOS_INTEIROS_COMPACTOS = ['Int16', 'Int32', 'Int64']
+
+# Chave em `DataFrame.attrs` com a versão do dataset processado
+CHAVE_VERSAO_DADOS = 'versao_dados'
+# Chave em `DataFrame.attrs` com as fontes deixadas de fora na carga
+CHAVE_FONTES_IGNORADAS = 'fontes_ignoradas'
+# Chaves em `DataFrame.attrs` com o instante em que a fonte foi lida (ver `ler_dados_brutos_fonte`):
+# no dataset de uma fonte, o instante; no unificado, {identificação da fonte: instante}
+CHAVE_INSTANTE_LEITURA = 'instante_leitura'
+CHAVE_INSTANTES_LEITURA_FONTES = 'instantes_leitura_fontes'
+
+# Quando ativo, cada atualização processa só as linhas acrescentadas à planilha (append-only)
+MODO_INGESTAO_INCREMENTAL = True
+
+# Máximo de fontes lidas e processadas ao mesmo tempo
+LIMITE_FONTES_PARALELAS = 8
+
+# --- ETL em Streaming (exportações históricas muito grandes) ---
+
+# Quando ativo, a carga completa lê a fonte em blocos (ver `etl_streaming`)
+MODO_ETL_STREAMING = False
+SAIDA_STREAMING_LINHAS = 'linhas'         # materializa as linhas processadas
+SAIDA_STREAMING_AGREGADOS = 'agregados'   # guarda só o cubo agregado (memória do tamanho do cubo)
+SAIDA_STREAMING = SAIDA_STREAMING_LINHAS
+TAMANHO_BLOCO_STREAMING = 100_000
+
+registro_log = logging.getLogger(__name__)
+
 # --- Funções de ETL (Extract, Transform, Load) ---
 
-def obter_conexao_e_dados_brutos() -> pd.DataFrame:
+@medir_etapa()
+def obter_conexao_e_dados_brutos(fonte_dados) -> pd.DataFrame:
     """
-    Estabelece conexão com o Google Sheets e lê os dados brutos.
+    Lê os dados brutos de uma fonte (aba do Google Sheets ou arquivo local; ver `fontes_dados`).
+    
+    Args:
+        fonte_dados (FonteDados): Fonte a ler.
     
     Returns:
         pd.DataFrame: DataFrame contendo os dados crus da planilha.
@@ -58,18 +155,50 @@ def obter_conexao_e_dados_brutos() -> pd.DataFrame:
         Exception: Se houver falha na conexão ou leitura.
     """
     try:
-        conexao = st.connection("gsheets", type=GSheetsConnection)
-        dados_brutos = conexao.read(worksheet=NOME_ABA_PLANILHA, header=1)
-        return dados_brutos
+        return fonte_dados.ler_dados_brutos()
     except Exception as erro:
-        raise Exception(f"Falha crítica ao acessar planilha Google Sheets: {erro}")
+        raise Exception(f"Falha crítica ao acessar {fonte_dados.descrever()}: {erro}")
 
-def limpar_e_padronizar_dados(dados: pd.DataFrame) -> pd.DataFrame:
+@contextmanager
+def travar_escritas_fonte(fonte_dados, exclusiva: bool = False):
+    """
+    Trava de arquivo (entre threads e réplicas) que separa as leituras da fonte das escritas
+    do app nela (ver `lancamento_dados`): leituras compartilham a trava; uma escrita, com a
+    baixa no buffer de lançamentos, fica com ela sozinha.
+
+    Args:
+        fonte_dados (FonteDados): Fonte lida ou escrita.
+        exclusiva (bool): True para escrever; False para ler.
+    """
+    caminho_trava = obter_caminho_trava(obter_caminho_snapshot_fonte(fonte_dados.identificar(), CAMINHO_SNAPSHOT.with_name('escritas')))
+    caminho_trava.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho_trava, 'a') as arquivo_trava:
+        travar_arquivo(arquivo_trava, bloquear=True, compartilhada=not exclusiva)
+        yield
+
+def ler_dados_brutos_fonte(fonte_dados) -> tuple:
+    """
+    Lê a fonte inteira (sem as linhas vazias finais) sem nenhuma escrita do app em curso.
+    Todo lançamento dado como enviado antes do instante devolvido está nos dados lidos, e
+    nenhum enviado depois dele.
+
+    Returns:
+        tuple: (dados brutos, instante da leitura em segundos desde a época).
+    """
+    with travar_escritas_fonte(fonte_dados):
+        dados_brutos = remover_linhas_vazias_finais(obter_conexao_e_dados_brutos(fonte_dados))
+        return dados_brutos, time.time()
+
+@medir_etapa()
+def limpar_e_padronizar_dados(dados: pd.DataFrame, esquema_compacto: bool = MODO_ESQUEMA_COMPACTO) -> pd.DataFrame:
     """
     Realiza a limpeza inicial, tipagem e padronização de colunas.
+    O DataFrame recebido não é alterado: com o copy-on-write do pandas, o resultado
+    compartilha as colunas intactas com ele e só as colunas convertidas são novas.
     
     Args:
         dados (pd.DataFrame): Dados brutos.
+        esquema_compacto (bool): Se True, aplica tipos compactos (categorias e inteiros pequenos).
         
     Returns:
         pd.DataFrame: Dados limpos e tipados.
@@ -77,8 +206,8 @@ def limpar_e_padronizar_dados(dados: pd.DataFrame) -> pd.DataFrame:
     if dados.empty:
         return dados
 
-    # Remove espaços em branco do nome das colunas
-    dados.columns = dados.columns.str.strip()
+    # Remove espaços em branco do nome das colunas (novo objeto, mesmas colunas)
+    dados = dados.set_axis(dados.columns.str.strip(), axis=1)
     
     # --- Tratamento de Retrocompatibilidade (Coluna Tipo) ---
     if COL_TIPO not in dados.columns:
@@ -93,17 +222,115 @@ def limpar_e_padronizar_dados(dados: pd.DataFrame) -> pd.DataFrame:
         dados[COL_ATLETA] = dados[COL_ATLETA].fillna("Desconhecido").astype(str)
     
     # Remove linhas inválidas (sem dados nos campos chave)
-    # Adicionado .copy() para evitar SettingWithCopyWarning
-    dados = dados.dropna(subset=[COL_DATA, COL_FUNDAMENTOS]).copy()
+    dados = dados.dropna(subset=[COL_DATA, COL_FUNDAMENTOS])
     
     # Conversão de Data (DD/MM/AAAA)
-    dados[COL_DATA] = pd.to_datetime(dados[COL_DATA], dayfirst=True, errors='coerce')
+    dados[COL_DATA] = converter_datas(dados[COL_DATA])
     
     # Conversão de Colunas Numéricas
-    colunas_para_converter = [COL_QTD_CORRETA, COL_QTD_ERRADA, COL_QTD_TOTAL]
-    for coluna in colunas_para_converter:
+    for coluna in COLUNAS_QUANTIDADE:
         dados[coluna] = pd.to_numeric(dados[coluna], errors='coerce').fillna(0)
+
+    if esquema_compacto:
+        dados = compactar_esquema_dados(dados)
+        
+    return dados
+
+def converter_datas(valores: pd.Series) -> pd.Series:
+    """
+    Converte as datas (DD/MM/AAAA) interpretando cada texto distinto uma vez: as sessões
+    repetem a mesma data em dezenas de linhas, e o parse linha a linha criava
+    intermediários do tamanho da coluna.
+    
+    Args:
+        valores (pd.Series): Coluna de datas em texto.
+        
+    Returns:
+        pd.Series: Coluna datetime (NaT para vazios e datas inválidas).
+    """
+    codigos, valores_distintos = codificar_valores(valores)
+    datas_distintas = pd.DatetimeIndex(pd.to_datetime(valores_distintos, dayfirst=True, errors='coerce'))
+    # Código -1 (vazio) vira NaT
+    return pd.Series(datas_distintas.take(codigos, allow_fill=True), index=valores.index, name=valores.name)
+
+def converter_para_categoria(valores: pd.Series, categorias_fixas: list) -> pd.Series:
+    """
+    Converte uma coluna de texto para `category`, mantendo a ordem das categorias fixas
+    e acrescentando (ordenados) os valores observados que não pertencem a elas. Os códigos
+    saem de uma única codificação da coluna, sem intermediários por linha.
+    
+    Args:
+        valores (pd.Series): Coluna de texto.
+        categorias_fixas (list): Categorias conhecidas de antemão (pode ser vazia).
+        
+    Returns:
+        pd.Series: Coluna categórica equivalente.
+    """
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        # Só os valores presentes na coluna, como numa coluna de texto
+        valores = valores.cat.remove_unused_categories()
+    codigos, valores_distintos = codificar_valores(valores)
+    categorias_extras = sorted(set(valores_distintos) - set(categorias_fixas))
+    tipo_categoria = pd.CategoricalDtype(categorias_fixas + categorias_extras)
+    # Posição de cada valor distinto nas categorias finais; o código -1 (vazio) se mantém
+    codigos_categoria = np.append(tipo_categoria.categories.get_indexer(valores_distintos), -1)[codigos]
+    return pd.Series(
+        pd.Categorical.from_codes(codigos_categoria, dtype=tipo_categoria), index=valores.index, name=valores.name
+    )
+
+def escolher_tipo_inteiro_compacto(valores: pd.Series):
+    """
+    Escolhe o menor inteiro anulável capaz de guardar os valores com folga para somas
+    entre colunas (ex: Total Calculado = corretas + erradas).
+    
+    Args:
+        valores (pd.Series): Coluna numérica sem valores nulos.
         
+    Returns:
+        str | None: Nome do tipo (ex: 'Int16') ou None se houver valores fracionários.
+    """
+    if not (valores % 1 == 0).all():
+        return None
+
+    maior_valor_absoluto = valores.abs().max() if len(valores) else 0
+    for nome_tipo in TIPOS_INTEIROS_COMPACTOS:
+        if maior_valor_absoluto * 2 <= np.iinfo(nome_tipo.lower()).max:
+            return nome_tipo
+    return None
+
+def medir_memoria_mb(dados: pd.DataFrame) -> float:
+    """Retorna o uso de memória do DataFrame (incluindo textos) em megabytes."""
+    return dados.memory_usage(deep=True).sum() / 1024 ** 2
+
+def compactar_esquema_dados(dados: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aplica o esquema compacto: dimensões como `category` e contagens como inteiros
+    anuláveis pequenos. Registra no log a memória antes e depois.
+    
+    Args:
+        dados (pd.DataFrame): Dados já limpos e tipados.
+        
+    Returns:
+        pd.DataFrame: Mesmos dados com tipos compactos.
+    """
+    memoria_antes_mb = medir_memoria_mb(dados)
+
+    colunas_compactas = {}
+    for coluna, categorias_fixas in CATEGORIAS_FIXAS_POR_DIMENSAO.items():
+        if coluna in dados.columns:
+            colunas_compactas[coluna] = converter_para_categoria(dados[coluna], categorias_fixas)
+
+    for coluna in COLUNAS_QUANTIDADE:
+        tipo_inteiro = escolher_tipo_inteiro_compacto(dados[coluna])
+        if tipo_inteiro:
+            colunas_compactas[coluna] = dados[coluna].astype(tipo_inteiro)
+    dados = dados.assign(**colunas_compactas)
+
+    memoria_depois_mb = medir_memoria_mb(dados)
+    registro_log.info(
+        "Esquema compacto aplicado: %.2f MB -> %.2f MB (%d linhas)",
+        memoria_antes_mb, memoria_depois_mb, len(dados)
+    )
     return dados
 
 def identificar_categoria(texto_fundamento: str) -> str:
@@ -129,75 +356,773 @@ def identificar_categoria(texto_fundamento: str) -> str:
         
     return CATEGORIA_OUTROS
 
-def aplicar_regras_negocio_volei(dados: pd.DataFrame) -> pd.DataFrame:
+def identificar_subtipo(texto_fundamento: str) -> str:
+    """
+    Rótulo curto do fundamento dentro da categoria: o que for "Bom" no levantamento é
+    Acerto; o resto vira o nome limpo ("Levantamento - Dois Toques (Erro)" -> "Dois toques").
+    
+    Args:
+        texto_fundamento (str): Descrição do fundamento.
+        
+    Returns:
+        str: Subtipo exibido nos gráficos.
+    """
+    texto = str(texto_fundamento).strip()
+    if texto.startswith(TEXTO_LEVANTAMENTO) and "Bom" in texto:
+        return ROTULO_ACERTO_LEVANTAMENTO
+    _, separador, detalhe = texto.partition(' - ')
+    return (detalhe if separador else texto).replace(f' {MARCADOR_FUNDAMENTO_ERRO}', '').capitalize()
+
+def codificar_valores(valores: pd.Series) -> tuple:
+    """
+    Códigos inteiros por linha e valores distintos da coluna (os da própria categoria, se
+    `category`). O código -1 indica vazio.
+    """
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        return valores.cat.codes.to_numpy(), valores.cat.categories
+    return pd.factorize(valores)
+
+def construir_taxonomia_fundamentos(valores_fundamento) -> pd.DataFrame:
     """
-    Aplica regras de negócio específicas para corrigir inconsistências na entrada de dados.
+    Índice de taxonomia: todo o trabalho de texto sobre Fundamentos, feito uma vez por
+    valor distinto (dezenas), e nunca por linha.
+    
+    Args:
+        valores_fundamento: Valores distintos de Fundamentos.
+        
+    Returns:
+        pd.DataFrame: Indexado pelo fundamento, com Categoria, Subtipo, Fundamento de Erro
+        e Variação de Ataque.
+    """
+    textos = [str(valor).strip() for valor in valores_fundamento]
+    return pd.DataFrame({
+        COL_CATEGORIA: [identificar_categoria(texto) for texto in textos],
+        COL_SUBTIPO: [identificar_subtipo(texto) for texto in textos],
+        COL_FUNDAMENTO_ERRO: [MARCADOR_FUNDAMENTO_ERRO in texto for texto in textos],
+        COL_VARIACAO_ATAQUE: [texto.startswith(PREFIXO_VARIACAO_ATAQUE) for texto in textos],
+    }, index=pd.Index(valores_fundamento, name=COL_FUNDAMENTOS))
+
+def mapear_taxonomia(
+    fundamentos: pd.Series, atributo: str, taxonomia: pd.DataFrame | None = None,
+    tipo_categoria: pd.CategoricalDtype | None = None
+) -> pd.Series:
+    """
+    Junta um atributo da taxonomia às linhas pelos códigos inteiros da coluna (um gather).
+    
+    Args:
+        fundamentos (pd.Series): Coluna de fundamentos (texto ou `category`).
+        atributo (str): Coluna da taxonomia (ex: Categoria, Subtipo).
+        taxonomia (pd.DataFrame | None): Índice já construído; sem ele, é montado para os
+            valores distintos da própria coluna.
+        tipo_categoria (pd.CategoricalDtype | None): Se dado, o gather é feito sobre os
+            códigos das categorias e a coluna já sai `category` (sem textos por linha).
+        
+    Returns:
+        pd.Series: Atributo de cada linha (vazio para fundamentos vazios ou fora da taxonomia).
+    """
+    codigos, valores_distintos = codificar_valores(fundamentos)
+    if taxonomia is None:
+        taxonomia = construir_taxonomia_fundamentos(valores_distintos)
+    if tipo_categoria is not None:
+        # Código -1 (vazio ou fora das categorias) vira nulo
+        codigos_por_valor = np.append(tipo_categoria.categories.get_indexer(taxonomia[atributo].reindex(valores_distintos)), -1)
+        return pd.Series(
+            pd.Categorical.from_codes(codigos_por_valor[codigos], dtype=tipo_categoria),
+            index=fundamentos.index, name=atributo
+        )
+    atributo_por_valor = taxonomia[atributo].reindex(valores_distintos).to_numpy(dtype=object)
+    # Código -1 (vazio) cai na posição extra do fim
+    atributo_por_valor = np.append(atributo_por_valor, None)
+    return pd.Series(atributo_por_valor[codigos], index=fundamentos.index, name=atributo)
+
+@medir_etapa()
+def aplicar_regras_negocio_volei(dados: pd.DataFrame, regras: tuple = REGRAS_NEGOCIO) -> pd.DataFrame:
+    """
+    Aplica a tabela de regras de negócio para corrigir inconsistências na entrada de dados.
+    As regras são resolvidas só para os valores distintos de Fundamentos; a ação de cada
+    linha sai de uma única indexação (gather) pelos códigos da coluna, e as correções
+    são aplicadas de uma vez, qualquer que seja o número de regras.
     
     Args:
         dados (pd.DataFrame): DataFrame pré-processado.
+        regras (tuple[RegraNegocio, ...]): Regras compiladas (padrão: `REGRAS_NEGOCIO`).
         
     Returns:
         pd.DataFrame: DataFrame com correções lógicas aplicadas.
     """
-    # Regra 1: Levantamento 'Bom' implica 100% de acerto (copia Total para Correta)
-    filtro_lev_bom = dados[COL_FUNDAMENTOS] == CASO_LEVANTAMENTO_BOM
-    dados.loc[filtro_lev_bom, COL_QTD_CORRETA] = dados.loc[filtro_lev_bom, COL_QTD_TOTAL]
-    dados.loc[filtro_lev_bom, COL_QTD_ERRADA] = 0
-
-    # Regra 2: Erros fatais de levantamento implicam 100% de erro
-    filtro_lev_erro = dados[COL_FUNDAMENTOS].isin(CASOS_LEVANTAMENTO_ERRO_FATAL)
-    dados.loc[filtro_lev_erro, COL_QTD_CORRETA] = 0
-    dados.loc[filtro_lev_erro, COL_QTD_ERRADA] = dados.loc[filtro_lev_erro, COL_QTD_TOTAL]
+    if dados.empty:
+        return dados
 
-    # Regra 3: Remover linhas totalizadoras para evitar contagem duplicada
-    # (O usuário informou que 'Levantamento' e 'Ataque' já são a soma das subcategorias)
-    fundamentos_para_remover = [TEXTO_LEVANTAMENTO, PREFIXO_ATAQUE]
-    # Filtra onde o Fundamento NÃO É exatamente igual aos termos totalizadores
-    dados = dados[~dados[COL_FUNDAMENTOS].isin(fundamentos_para_remover)].copy()
+    codigos, valores_distintos = codificar_valores(dados[COL_FUNDAMENTOS])
+    # Código -1 (vazio) cai na última posição, que não tem ação
+    acoes_por_valor = np.append(resolver_acoes_fundamentos(valores_distintos, regras), ACAO_NENHUMA)
+    acoes = acoes_por_valor[codigos]
 
+    forcar_acerto = acoes == ACAO_FORCAR_ACERTO
+    forcar_erro = acoes == ACAO_FORCAR_ERRO
+    if forcar_acerto.any() or forcar_erro.any():
+        total = dados[COL_QTD_TOTAL]
+        dados = dados.assign(**{
+            COL_QTD_CORRETA: dados[COL_QTD_CORRETA].mask(forcar_acerto, total).mask(forcar_erro, 0),
+            COL_QTD_ERRADA: dados[COL_QTD_ERRADA].mask(forcar_acerto, 0).mask(forcar_erro, total),
+        })
 
+    manter = acoes != ACAO_REMOVER_TOTALIZADOR
+    if not manter.all():
+        dados = dados[manter]
     return dados
 
-def calcular_metricas_performance(dados: pd.DataFrame) -> pd.DataFrame:
+def calcular_total_calculado(dados: pd.DataFrame) -> pd.Series:
+    """
+    Soma acertos e erros (pós-regras) para obter o volume real de ações.
+    
+    Args:
+        dados (pd.DataFrame): Dados limpos e corrigidos.
+        
+    Returns:
+        pd.Series: Volume total de cada linha.
+    """
+    return dados[COL_QTD_CORRETA] + dados[COL_QTD_ERRADA]
+
+def calcular_eficiencia(dados: pd.DataFrame) -> pd.Series:
+    """
+    Calcula a eficiência (0.00 a 1.00) com aritmética vetorizada de colunas.
+    Linhas com total zero (ou negativo) recebem 0.0, evitando divisão por zero.
+    
+    Args:
+        dados (pd.DataFrame): Dados que já possuem a coluna de total calculado.
+        
+    Returns:
+        pd.Series: Eficiência de cada linha.
+    """
+    acertos = dados[COL_QTD_CORRETA].to_numpy(dtype=np.float64)
+    totais = dados[COL_TOTAL_CALCULADO].to_numpy(dtype=np.float64)
+    eficiencias = np.zeros(len(dados), dtype=np.float64)
+    np.divide(acertos, totais, out=eficiencias, where=totais > 0)
+    return pd.Series(eficiencias, index=dados.index)
+
+# Métricas derivadas calculadas em ordem, numa única passada (cada uma pode usar as anteriores).
+# Para criar um novo KPI basta registrar aqui a coluna de destino e sua função vetorizada.
+METRICAS_DERIVADAS = {
+    COL_TOTAL_CALCULADO: calcular_total_calculado,
+    COL_EFICIENCIA: calcular_eficiencia,
+}
+
+def categorizar_fundamentos(fundamentos: pd.Series, esquema_compacto: bool = MODO_ESQUEMA_COMPACTO) -> pd.Series:
+    """
+    Lê a categoria de cada linha da taxonomia dos valores distintos (ver
+    `construir_taxonomia_fundamentos`), evitando uma chamada Python por linha.
+    
+    Args:
+        fundamentos (pd.Series): Coluna de fundamentos.
+        esquema_compacto (bool): Se True, devolve a coluna como `category` de conjunto fixo.
+        
+    Returns:
+        pd.Series: Categoria macro de cada linha.
+    """
+    if esquema_compacto:
+        return mapear_taxonomia(fundamentos, COL_CATEGORIA, tipo_categoria=pd.CategoricalDtype(CATEGORIAS_FUNDAMENTO))
+    return mapear_taxonomia(fundamentos, COL_CATEGORIA)
+
+@medir_etapa()
+def calcular_metricas_performance(dados: pd.DataFrame, esquema_compacto: bool = MODO_ESQUEMA_COMPACTO) -> pd.DataFrame:
     """
     Calcula KPIs e métricas derivadas para análise.
     
     Args:
         dados (pd.DataFrame): Dados limpos e corrigidos.
+        esquema_compacto (bool): Se True, a coluna de categoria é criada como `category`.
         
     Returns:
         pd.DataFrame: Dados enriquecidos com eficiência e categorias.
     """
-    # Categorização
-    dados[COL_CATEGORIA] = dados[COL_FUNDAMENTOS].apply(identificar_categoria)
+    # Categorização, depois Volume Total Real (Pós-regras), Eficiência e demais KPIs
+    # registrados: `assign` calcula cada métrica sobre as colunas já criadas antes dela
+    return dados.assign(
+        **{COL_CATEGORIA: lambda dados_parciais: categorizar_fundamentos(dados_parciais[COL_FUNDAMENTOS], esquema_compacto)},
+        **METRICAS_DERIVADAS
+    )
 
-    # Cálculo do Volume Total Real (Pós-regras)
-    dados[COL_TOTAL_CALCULADO] = dados[COL_QTD_CORRETA] + dados[COL_QTD_ERRADA]
+@medir_etapa()
+def calcular_chaves_periodo(dados: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cria chaves inteiras de dia, semana ISO e mês a partir da Data, para que as
+    comparações por período agrupem e filtrem inteiros em vez de formatar datas.
     
-    # Cálculo de Eficiência (0.00 a 1.00)
-    # Evita divisão por zero retornando 0
-    dados[COL_EFICIENCIA] = dados.apply(
-        lambda linha: linha[COL_QTD_CORRETA] / linha[COL_TOTAL_CALCULADO] 
-                      if linha[COL_TOTAL_CALCULADO] > 0 else 0.0, 
-        axis=1
-    )
+    Args:
+        dados (pd.DataFrame): Dados com a coluna de data já convertida.
+        
+    Returns:
+        pd.DataFrame: Dados com as colunas de chave de período (Int32, vazia se sem data).
+    """
+    datas = dados[COL_DATA]
+    calendario_iso = datas.dt.isocalendar()
+    ano = datas.dt.year.astype('Int32')
+    mes = datas.dt.month.astype('Int32')
+
+    return dados.assign(**{
+        COL_CHAVE_DIA: ano * 10000 + mes * 100 + datas.dt.day.astype('Int32'),
+        COL_CHAVE_SEMANA: (calendario_iso['year'] * 100 + calendario_iso['week']).astype('Int32'),
+        COL_CHAVE_MES: ano * 100 + mes,
+    })
+
+def formatar_chave_mes(chave_mes: int) -> str:
+    """Converte a chave AAAAMM no texto 'AAAA-MM' exibido nos seletores."""
+    return f"{chave_mes // 100:04d}-{chave_mes % 100:02d}"
+
+def converter_chave_dia_em_data(chave_dia: int) -> date:
+    """Converte a chave AAAAMMDD de volta para `date`."""
+    return date(chave_dia // 10000, chave_dia // 100 % 100, chave_dia % 100)
+
+def formatar_chave_dia(chave_dia: int) -> str:
+    """Converte a chave AAAAMMDD no texto 'AAAA-MM-DD' exibido nos seletores."""
+    return converter_chave_dia_em_data(chave_dia).isoformat()
+
+def processar_dados_brutos(dados_brutos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Executa as etapas de transformação sobre os dados crus.
+    Limpeza -> Regras de Negócio -> Enriquecimento -> Chaves de Período.
+    Nenhuma etapa altera o DataFrame recebido nem copia colunas que não transforma
+    (copy-on-write do pandas): os dados crus seguem intactos para a impressão digital.
     
+    Args:
+        dados_brutos (pd.DataFrame): Dados crus da planilha.
+        
+    Returns:
+        pd.DataFrame: Dados processados.
+    """
+    dados = limpar_e_padronizar_dados(dados_brutos)
+    dados = aplicar_regras_negocio_volei(dados)
+    dados = calcular_metricas_performance(dados)
+    dados = calcular_chaves_periodo(dados)
+    return dados
+
+def marcar_versao_dados(dados: pd.DataFrame, versao_dados: str) -> pd.DataFrame:
+    """
+    Registra em `dados.attrs` a versão (impressão digital da fonte) do dataset processado,
+    usada como chave barata pelos caches derivados (cubo, índices, gráficos).
+    """
+    dados.attrs[CHAVE_VERSAO_DADOS] = versao_dados
     return dados
 
+def obter_versao_dados(dados: pd.DataFrame) -> str:
+    """Retorna a versão registrada no dataset processado ('' se desconhecida)."""
+    return dados.attrs.get(CHAVE_VERSAO_DADOS, '')
+
+def marcar_instante_leitura(dados: pd.DataFrame, instante_leitura: float | None) -> pd.DataFrame:
+    """Registra em `dados.attrs` quando a fonte foi lida para gerar o dataset de uma fonte."""
+    dados.attrs[CHAVE_INSTANTE_LEITURA] = instante_leitura
+    return dados
+
+def obter_instante_leitura_fonte(dados: pd.DataFrame, identificacao_fonte: str) -> float | None:
+    """Quando a fonte foi lida para gerar o dataset unificado (None se desconhecido)."""
+    return dados.attrs.get(CHAVE_INSTANTES_LEITURA_FONTES, {}).get(identificacao_fonte)
+
+def usar_snapshot(snapshot: SnapshotDados) -> pd.DataFrame:
+    """Dataset do snapshot com a versão, os indicadores de forma e o instante da leitura em `attrs`."""
+    # Importação local: indicadores_forma depende deste módulo
+    from indicadores_forma import marcar_indicadores_forma, obter_indicadores_forma_snapshot
+
+    dados = marcar_versao_dados(snapshot.dados, snapshot.impressao_digital_fonte)
+    dados = marcar_instante_leitura(dados, snapshot.instante_leitura)
+    return marcar_indicadores_forma(dados, obter_indicadores_forma_snapshot(snapshot))
+
+def ordenar_categorias_unidas(coluna: str, categorias) -> list:
+    """Ordena categorias unidas como `converter_para_categoria`: fixas primeiro, demais em ordem alfabética."""
+    categorias_fixas = CATEGORIAS_FIXAS_POR_DIMENSAO.get(coluna)
+    if categorias_fixas is None:
+        return list(categorias)
+    return categorias_fixas + sorted(set(categorias) - set(categorias_fixas))
+
+def uniformizar_categorias(partes: list) -> list:
+    """
+    Dá às colunas `category` de todas as partes o mesmo conjunto de categorias (a união),
+    para que elas não sejam rebaixadas a texto quando as partes forem concatenadas.
+    
+    Args:
+        partes (list[pd.DataFrame]): Partes processadas (blocos, fontes ou snapshot + novas linhas).
+        
+    Returns:
+        list[pd.DataFrame]: Partes com tipos categóricos idênticos.
+    """
+    colunas_categoricas = {
+        coluna for parte in partes for coluna in parte.columns
+        if isinstance(parte[coluna].dtype, pd.CategoricalDtype)
+    }
+    for coluna in colunas_categoricas:
+        categorias_unidas = union_categoricals(
+            [parte[coluna].astype('category').array for parte in partes if coluna in parte.columns]
+        ).categories
+        tipo_unido = pd.CategoricalDtype(ordenar_categorias_unidas(coluna, categorias_unidas))
+        partes = [
+            parte.assign(**{coluna: parte[coluna].astype(tipo_unido)}) if coluna in parte.columns else parte
+            for parte in partes
+        ]
+    return partes
+
+def concatenar_dados_processados(dados_existentes: pd.DataFrame, dados_novos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Anexa linhas processadas ao dataset existente, unindo as categorias das colunas
+    `category` (ver `uniformizar_categorias`).
+    
+    Args:
+        dados_existentes (pd.DataFrame): Dataset processado atual.
+        dados_novos (pd.DataFrame): Linhas recém-processadas.
+        
+    Returns:
+        pd.DataFrame: União dos dois conjuntos, com índice sequencial.
+    """
+    if dados_novos.empty:
+        return dados_existentes
+    if dados_existentes.empty:
+        return dados_novos.reset_index(drop=True)
+
+    return pd.concat(uniformizar_categorias([dados_existentes, dados_novos]), ignore_index=True)
+
+def atualizar_dados_incrementalmente(snapshot: SnapshotDados, fonte_dados):
+    """
+    Lê a fonte, confere que as linhas já ingeridas não mudaram, processa só as linhas
+    novas e as anexa ao snapshot.
+    
+    Args:
+        snapshot (SnapshotDados): Snapshot da fonte, com marca d'água de ingestão.
+        fonte_dados (FonteDados): Fonte que gerou o snapshot.
+        
+    Returns:
+        pd.DataFrame | None: Dataset atualizado, ou None se o histórico foi alterado
+        e é preciso uma ressincronização completa.
+    """
+    # Importação local: indicadores_forma depende deste módulo
+    from indicadores_forma import (
+        calcular_indicadores_forma, combinar_indicadores_forma, marcar_indicadores_forma, obter_indicadores_forma_snapshot
+    )
+
+    estado = snapshot.estado_ingestao
+    dados_brutos, instante_leitura = ler_dados_brutos_fonte(fonte_dados)
+
+    if not historico_esta_intacto(estado, dados_brutos):
+        registro_log.info("Histórico de %s foi alterado: ressincronização completa.", fonte_dados.descrever())
+        return None
+
+    dados_brutos_novos = dados_brutos.iloc[estado.linhas_ingeridas:]
+    if dados_brutos_novos.empty:
+        confirmar_snapshot_atualizado(snapshot)
+        return usar_snapshot(snapshot)
+
+    novo_estado = criar_estado_ingestao(dados_brutos)
+    impressao_digital = calcular_impressao_digital(dados_brutos_novos)
+    dados_novos = processar_dados_brutos(dados_brutos_novos)
+    if MODO_ETL_STREAMING and SAIDA_STREAMING == SAIDA_STREAMING_AGREGADOS:
+        # Importação local: etl_streaming depende deste módulo
+        from etl_streaming import dobrar_agregados
+        dados = dobrar_agregados([snapshot.dados, dados_novos])
+    else:
+        dados = concatenar_dados_processados(snapshot.dados, dados_novos)
+    # Só as linhas novas entram no cálculo; o estado gravado é combinado com elas
+    indicadores_forma = combinar_indicadores_forma(obter_indicadores_forma_snapshot(snapshot), calcular_indicadores_forma(dados_novos))
+
+    impressao_encadeada = encadear_impressao_digital(snapshot.impressao_digital_fonte, impressao_digital)
+    salvar_snapshot(dados, impressao_encadeada, novo_estado, snapshot.caminho, indicadores_forma, instante_leitura)
+    registro_log.info("Ingestão incremental de %s: %d linhas novas processadas.", fonte_dados.descrever(), len(dados_brutos_novos))
+    dados = marcar_instante_leitura(marcar_versao_dados(dados, impressao_encadeada), instante_leitura)
+    return marcar_indicadores_forma(dados, indicadores_forma)
+
+def recarregar_dados_completos(snapshot, fonte_dados, caminho_snapshot) -> pd.DataFrame:
+    """
+    Lê a fonte inteira e só reprocessa se o conteúdo mudou desde o snapshot.
+    
+    Args:
+        snapshot (SnapshotDados | None): Snapshot atual da fonte, se existir.
+        fonte_dados (FonteDados): Fonte a ler.
+        caminho_snapshot (Path): Onde gravar o snapshot da fonte.
+        
+    Returns:
+        pd.DataFrame: Dataset processado.
+    """
+    # Importação local: indicadores_forma depende deste módulo
+    from indicadores_forma import calcular_indicadores_forma, marcar_indicadores_forma
+
+    if MODO_ETL_STREAMING:
+        return recarregar_dados_em_blocos(snapshot, fonte_dados, caminho_snapshot)
+
+    dados_brutos, instante_leitura = ler_dados_brutos_fonte(fonte_dados)
+    impressao_digital = calcular_impressao_digital(dados_brutos)
+    estado_ingestao = criar_estado_ingestao(dados_brutos)
+
+    if snapshot is not None and snapshot.impressao_digital_fonte == impressao_digital:
+        confirmar_snapshot_atualizado(snapshot)
+        return usar_snapshot(snapshot)
+
+    dados = processar_dados_brutos(dados_brutos)
+    indicadores_forma = calcular_indicadores_forma(dados)
+    salvar_snapshot(dados, impressao_digital, estado_ingestao, caminho_snapshot, indicadores_forma, instante_leitura)
+    dados = marcar_instante_leitura(marcar_versao_dados(dados, impressao_digital), instante_leitura)
+    return marcar_indicadores_forma(dados, indicadores_forma)
+
+def recarregar_dados_em_blocos(snapshot, fonte_dados, caminho_snapshot) -> pd.DataFrame:
+    """
+    Variante em streaming de `recarregar_dados_completos`: a fonte é lida e processada em
+    blocos, e a impressão digital é acumulada no caminho. Como ela só é conhecida ao fim,
+    o resultado é descartado se a fonte não mudou desde o snapshot.
+    
+    Args:
+        snapshot (SnapshotDados | None): Snapshot atual da fonte, se existir.
+        fonte_dados (FonteDados): Fonte a ler.
+        caminho_snapshot (Path): Onde gravar o snapshot da fonte.
+        
+    Returns:
+        pd.DataFrame: Linhas processadas ou cubo agregado, conforme `SAIDA_STREAMING`.
+    """
+    # Importações locais: etl_streaming e indicadores_forma dependem deste módulo
+    from etl_streaming import processar_fonte_em_blocos
+    from indicadores_forma import calcular_indicadores_forma, marcar_indicadores_forma
+
+    # A trava de leitura cobre todos os blocos: uma escrita no meio deixaria a leitura sem instante
+    with travar_escritas_fonte(fonte_dados):
+        resultado = processar_fonte_em_blocos(fonte_dados, TAMANHO_BLOCO_STREAMING, SAIDA_STREAMING)
+        instante_leitura = time.time()
+    if snapshot is not None and snapshot.impressao_digital_fonte == resultado.impressao_digital:
+        confirmar_snapshot_atualizado(snapshot)
+        return usar_snapshot(snapshot)
+
+    # O cubo mantém a Data, então os indicadores saem iguais nas duas saídas
+    indicadores_forma = calcular_indicadores_forma(resultado.dados)
+    salvar_snapshot(
+        resultado.dados, resultado.impressao_digital, resultado.estado_ingestao, caminho_snapshot, indicadores_forma, instante_leitura
+    )
+    dados = marcar_instante_leitura(marcar_versao_dados(resultado.dados, resultado.impressao_digital), instante_leitura)
+    return marcar_indicadores_forma(dados, indicadores_forma)
+
+def obter_caminho_snapshot(fonte_dados):
+    """
+    Snapshot da fonte; no streaming só de agregados o arquivo é outro (o conteúdo é o cubo),
+    assim como com regras de negócio carregadas de arquivo.
+    """
+    identificacao = fonte_dados.identificar()
+    if MODO_ETL_STREAMING and SAIDA_STREAMING == SAIDA_STREAMING_AGREGADOS:
+        identificacao = f"{identificacao}_{SAIDA_STREAMING_AGREGADOS}"
+    if CAMINHO_REGRAS_NEGOCIO:
+        # Regras vindas de arquivo podem mudar sem alterar o código: cada tabela tem seu snapshot
+        identificacao = f"{identificacao}_regras_{calcular_assinatura_regras(REGRAS_NEGOCIO)}"
+    return obter_caminho_snapshot_fonte(identificacao)
+
+def calcular_assinatura_configuracao() -> str:
+    """
+    Resume o que define o conteúdo do dataset unificado (fontes, regras de negócio, modo
+    de saída e versão do esquema), para caches fora do processo não servirem dados de
+    outra configuração.
+    """
+    identificacoes = [obter_caminho_snapshot(fonte_dados).name for fonte_dados in obter_fontes_configuradas(NOMES_ABAS_PLANILHA)]
+    return hashlib.sha256(f"{VERSAO_ESQUEMA_SNAPSHOT}|{'|'.join(identificacoes)}".encode()).hexdigest()
+
+def carregar_dados_fonte(fonte_dados) -> pd.DataFrame:
+    """
+    Carrega uma fonte: usa o snapshot dela quando é recente; caso contrário, no modo
+    incremental processa só as linhas acrescentadas; sem marca d'água (ou se o histórico
+    foi editado) executa o pipeline completo.
+    
+    Args:
+        fonte_dados (FonteDados): Aba ou arquivo a carregar.
+        
+    Returns:
+        pd.DataFrame: Dataset processado da fonte, com a versão em `attrs`.
+    """
+    caminho_snapshot = obter_caminho_snapshot(fonte_dados)
+    snapshot = carregar_snapshot(caminho_snapshot)
+    if snapshot is not None and snapshot_esta_recente(snapshot):
+        return usar_snapshot(snapshot)
+
+    if MODO_INGESTAO_INCREMENTAL and snapshot is not None and snapshot.estado_ingestao is not None:
+        dados = atualizar_dados_incrementalmente(snapshot, fonte_dados)
+        if dados is not None:
+            return dados
+
+    return recarregar_dados_completos(snapshot, fonte_dados, caminho_snapshot)
+
+def carregar_fontes_em_paralelo(fontes: list) -> list:
+    """
+    Carrega as fontes em um pool de threads: leitura (E/S de rede/disco) e limpeza de cada
+    uma correm ao mesmo tempo, e o tempo total fica próximo ao da fonte mais lenta.
+    
+    Args:
+        fontes (list[FonteDados]): Fontes a carregar.
+        
+    Returns:
+        list: (fonte, DataFrame ou a exceção que impediu a carga), na ordem das fontes.
+    """
+    # As threads herdam o contexto do script (st.connection) e os registros de desempenho
+    contexto_script = get_script_run_ctx()
+    registros_execucao = capturar_execucao()
+
+    def carregar_na_thread(fonte_dados):
+        add_script_run_ctx(ctx=contexto_script)
+        adotar_execucao(registros_execucao)
+        try:
+            return carregar_dados_fonte(fonte_dados)
+        except Exception as erro:
+            return erro
+
+    with ThreadPoolExecutor(max_workers=min(len(fontes), LIMITE_FONTES_PARALELAS)) as executor:
+        return list(zip(fontes, executor.map(carregar_na_thread, fontes)))
+
+def combinar_versoes_fontes(versoes: list) -> str:
+    """Versão do dataset unificado: muda sempre que a versão de qualquer fonte mudar."""
+    if len(versoes) == 1:
+        return versoes[0]
+    return hashlib.sha256("|".join(versoes).encode()).hexdigest()
+
+def unir_dados_fontes(dados_por_fonte: dict) -> pd.DataFrame:
+    """
+    Empilha os datasets das fontes com a coluna Fonte, unindo as categorias das colunas
+    `category` (ver `uniformizar_categorias`).
+    
+    Args:
+        dados_por_fonte (dict): {identificação da fonte: dataset processado}.
+        
+    Returns:
+        pd.DataFrame: União das fontes, com índice sequencial.
+    """
+    tipo_fonte = pd.CategoricalDtype(list(dados_por_fonte))
+    partes = [
+        dados.assign(**{COL_FONTE: pd.Categorical([identificacao] * len(dados), dtype=tipo_fonte)})
+        for identificacao, dados in dados_por_fonte.items()
+    ]
+    return pd.concat(uniformizar_categorias(partes), ignore_index=True)
+
+def incorporar_linhas_brutas(dados: pd.DataFrame, dados_brutos_novos: pd.DataFrame, identificacao_fonte: str) -> pd.DataFrame:
+    """
+    Processa linhas cruas que ainda não estão na fonte (lançamentos feitos pelo app) e as
+    anexa ao dataset unificado sem recarregar as fontes. A versão encadeia a impressão
+    digital das linhas novas (as mesmas linhas dão sempre a mesma versão) e os indicadores
+    de forma recebem o estado delas.
+    
+    Args:
+        dados (pd.DataFrame): Dataset unificado (ver `montar_dados_processados`).
+        dados_brutos_novos (pd.DataFrame): Linhas no layout da planilha.
+        identificacao_fonte (str): Fonte em que as linhas vão entrar (coluna Fonte).
+        
+    Returns:
+        pd.DataFrame: Dataset com as linhas anexadas (o próprio `dados` se não houver nenhuma).
+    """
+    # Importação local: indicadores_forma depende deste módulo
+    from indicadores_forma import (
+        calcular_indicadores_forma, combinar_indicadores_forma, obter_indicadores_forma, CHAVE_INDICADORES_FORMA
+    )
+
+    if dados.empty or dados_brutos_novos.empty:
+        return dados
+    dados_novos = processar_dados_brutos(dados_brutos_novos)
+    if dados_novos.empty:
+        return dados
+    if COL_FONTE in dados.columns:
+        dados_novos = dados_novos.assign(**{
+            COL_FONTE: pd.Categorical([identificacao_fonte] * len(dados_novos), categories=[identificacao_fonte])
+        })
+
+    dados_unidos = concatenar_dados_processados(dados, dados_novos)
+    # O concat só preserva `attrs` iguais em todas as partes: os do dataset são refeitos
+    dados_unidos.attrs = {
+        **dados.attrs,
+        CHAVE_VERSAO_DADOS: encadear_impressao_digital(obter_versao_dados(dados), calcular_impressao_digital(dados_brutos_novos)),
+        CHAVE_INDICADORES_FORMA: combinar_indicadores_forma(obter_indicadores_forma(dados), calcular_indicadores_forma(dados_novos)),
+    }
+    return dados_unidos
+
+def obter_fontes_ignoradas(dados: pd.DataFrame) -> list:
+    """Mensagens das fontes deixadas de fora na última carga (vazia se todas carregaram)."""
+    return list(dados.attrs.get(CHAVE_FONTES_IGNORADAS, []))
+
+@medir_etapa()
+def montar_dados_processados() -> pd.DataFrame:
+    """
+    Carrega em paralelo cada aba/arquivo configurado (ver `carregar_dados_fonte`) e une
+    os resultados com a coluna Fonte. Uma fonte com falha é registrada no log e em `attrs`
+    (ver `obter_fontes_ignoradas`) e deixada de fora. Não usa a interface do Streamlit,
+    então também roda fora de uma execução do script (ver `atualizacao_dados`).
+    
+    Returns:
+        pd.DataFrame: Dataset unificado, com versão, indicadores de forma e instantes de leitura das fontes em `attrs`.
+        
+    Raises:
+        RuntimeError: Se nenhuma fonte pôde ser carregada.
+    """
+    # Importação local: indicadores_forma depende deste módulo
+    from indicadores_forma import combinar_indicadores_forma, marcar_indicadores_forma, obter_indicadores_forma
+
+    fontes = obter_fontes_configuradas(NOMES_ABAS_PLANILHA)
+    dados_por_fonte = {}
+    fontes_ignoradas = []
+    for fonte_dados, resultado in carregar_fontes_em_paralelo(fontes):
+        if isinstance(resultado, Exception):
+            registro_log.warning("Fonte ignorada: %s", resultado)
+            fontes_ignoradas.append(f"{fonte_dados.descrever()}: {resultado}")
+            continue
+        dados_por_fonte[fonte_dados.identificar()] = resultado
+
+    if not dados_por_fonte:
+        raise RuntimeError("nenhuma fonte de dados pôde ser carregada.")
+
+    versoes = [obter_versao_dados(dados) for dados in dados_por_fonte.values()]
+    indicadores_forma = combinar_indicadores_forma(*[obter_indicadores_forma(dados) for dados in dados_por_fonte.values()])
+    dados_unidos = marcar_versao_dados(unir_dados_fontes(dados_por_fonte), combinar_versoes_fontes(versoes))
+    dados_unidos.attrs[CHAVE_FONTES_IGNORADAS] = fontes_ignoradas
+    dados_unidos.attrs[CHAVE_INSTANTES_LEITURA_FONTES] = {
+        identificacao: dados.attrs.get(CHAVE_INSTANTE_LEITURA) for identificacao, dados in dados_por_fonte.items()
+    }
+    return marcar_indicadores_forma(dados_unidos, indicadores_forma)
+
 def carregar_dados_processados() -> pd.DataFrame:
     """
-    Fachada (Facade) principal para o pipeline de dados.
-    Executa: Extração -> Limpeza -> Regras de Negócio -> Enriquecimento.
+    Fachada (Facade) principal para o pipeline de dados (ver `montar_dados_processados`).
+    Extração -> Limpeza -> Regras de Negócio -> Enriquecimento -> União.
     
     Returns:
-        pd.DataFrame: DataFrame final pronto para consumo do Dashboard.
+        pd.DataFrame: DataFrame final pronto para consumo do Dashboard (vazio em caso de erro).
     """
     try:
-        dados = obter_conexao_e_dados_brutos()
-        dados = limpar_e_padronizar_dados(dados)
-        dados = aplicar_regras_negocio_volei(dados)
-        dados = calcular_metricas_performance(dados)
-        return dados
+        dados = montar_dados_processados()
     except Exception as erro:
         st.error(f"Erro durante o processamento de dados: {erro}")
         return pd.DataFrame()
+    for aviso in obter_fontes_ignoradas(dados):
+        st.warning(f"Fonte ignorada: {aviso}")
+    return dados
+
+def forcar_ressincronizacao_completa():
+    """Descarta snapshots e marcas d'água: a próxima carga relê e reprocessa todas as fontes."""
+    for fonte_dados in obter_fontes_configuradas(NOMES_ABAS_PLANILHA):
+        descartar_snapshot(obter_caminho_snapshot(fonte_dados))
+
+def expirar_snapshot_fonte(fonte_dados):
+    """Faz a próxima carga conferir a fonte (linhas acrescentadas) mesmo com o snapshot recente."""
+    expirar_snapshot(obter_caminho_snapshot(fonte_dados))
+
+# --- Camada de Consultas (SQL embutido) ---
+
+NOME_TABELA_CONSULTAS = 'treinos'
+MEDIDAS_CONSULTA = [COL_QTD_CORRETA, COL_QTD_ERRADA, COL_TOTAL_CALCULADO]
+
+@dataclass
+class FiltrosConsulta:
+    """Filtros da sidebar em forma declarativa; o motor de consultas os traduz para WHERE."""
+    data_inicio: date | None = None
+    data_fim: date | None = None
+    valores_por_coluna: dict = field(default_factory=dict)
+
+def citar_coluna(coluna: str) -> str:
+    """Nome de coluna entre aspas para o SQL (os nomes têm espaços e acentos)."""
+    return '"' + coluna.replace('"', '""') + '"'
+
+def montar_clausula_filtros(filtros, fundamentos: list | None = None) -> tuple:
+    """
+    Traduz os filtros para uma cláusula WHERE parametrizada.
+    
+    Args:
+        filtros (FiltrosConsulta | None): Período e valores selecionados por coluna.
+        fundamentos (list | None): Restringe a estes fundamentos (lista vazia: nenhum).
+        
+    Returns:
+        tuple: (cláusula WHERE, ou '' sem filtros; lista de parâmetros).
+    """
+    condicoes, parametros = [], []
+    if filtros is not None:
+        if filtros.data_inicio is not None:
+            condicoes.append(f"{citar_coluna(COL_DATA)} >= ?")
+            parametros.append(pd.Timestamp(filtros.data_inicio))
+        if filtros.data_fim is not None:
+            # Fim inclusivo: até o último instante do dia
+            condicoes.append(f"{citar_coluna(COL_DATA)} < ?")
+            parametros.append(pd.Timestamp(filtros.data_fim) + pd.Timedelta(days=1))
+        for coluna, valores in filtros.valores_por_coluna.items():
+            if valores:
+                condicoes.append(f"{citar_coluna(coluna)} IN ({', '.join('?' * len(valores))})")
+                parametros.extend(valores)
+    if fundamentos is not None:
+        # Comparação direta com o ENUM: sem converter cada linha para texto
+        if fundamentos:
+            condicoes.append(f"{citar_coluna(COL_FUNDAMENTOS)} IN ({', '.join('?' * len(fundamentos))})")
+            parametros.extend(fundamentos)
+        else:
+            condicoes.append("FALSE")
+
+    clausula = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+    return clausula, parametros
+
+class MotorConsultas:
+    """
+    Dataset (ou cubo) carregado num banco DuckDB em memória: filtros e agregações rodam no
+    motor colunar vetorizado, sem varrer o DataFrame a cada gráfico. Cada consulta usa um
+    cursor próprio, então o motor pode ser compartilhado entre sessões (threads).
+    A taxonomia dos fundamentos do dataset fica pronta junto, para os renderizadores
+    selecionarem fundamentos e rótulos sem operações de texto.
+    """
+
+    def __init__(self, dados: pd.DataFrame):
+        self.conexao = duckdb.connect(':memory:')
+        self.conexao.register('dados_origem', dados)
+        self.conexao.execute(f"CREATE TABLE {NOME_TABELA_CONSULTAS} AS SELECT * FROM dados_origem")
+        self.conexao.unregister('dados_origem')
+        self.colunas = list(dados.columns)
+        valores_fundamento = codificar_valores(dados[COL_FUNDAMENTOS])[1] if COL_FUNDAMENTOS in dados.columns else []
+        self.taxonomia = construir_taxonomia_fundamentos(valores_fundamento)
+
+    def selecionar_fundamentos(self, atributo: str, valor=True) -> list:
+        """Fundamentos cujo atributo da taxonomia tem o valor dado (ex: Variação de Ataque)."""
+        return self.taxonomia.index[self.taxonomia[atributo] == valor].astype(str).tolist()
+
+    def executar(self, sql: str, parametros: list | None = None) -> pd.DataFrame:
+        """Executa uma consulta SQL sobre a tabela `treinos` e devolve o resultado."""
+        cursor = self.conexao.cursor()
+        try:
+            return cursor.execute(sql, parametros or []).df()
+        finally:
+            cursor.close()
+
+    def agregar(self, dimensoes: list, filtros=None, fundamentos: list | None = None) -> pd.DataFrame:
+        """
+        Soma as medidas por dimensões (equivalente a `agregar_cubo`, mas no motor SQL).
+        
+        Args:
+            dimensoes (list): Colunas de agrupamento.
+            filtros (FiltrosConsulta | None): Filtros da sidebar.
+            fundamentos (list | None): Restringe a estes fundamentos (ver `selecionar_fundamentos`).
+            
+        Returns:
+            pd.DataFrame: Uma linha por grupo, ordenada pelas dimensões, com a eficiência.
+        """
+        clausula_where, parametros = montar_clausula_filtros(filtros, fundamentos)
+        colunas_dimensao = ', '.join(citar_coluna(coluna) for coluna in dimensoes)
+        somas = ', '.join(f"SUM({citar_coluna(medida)})::BIGINT AS {citar_coluna(medida)}" for medida in MEDIDAS_CONSULTA)
+        agregado = self.executar(
+            f"SELECT {colunas_dimensao}, {somas} FROM {NOME_TABELA_CONSULTAS} {clausula_where} "
+            f"GROUP BY {colunas_dimensao} ORDER BY {colunas_dimensao}",
+            parametros
+        )
+        agregado[COL_EFICIENCIA] = calcular_eficiencia(agregado)
+        return agregado
+
+    def resumir_totais(self, filtros=None) -> dict:
+        """
+        Totais do recorte filtrado.
+        
+        Returns:
+            dict: linhas, acertos, tentativas e sessoes (datas distintas).
+        """
+        clausula_where, parametros = montar_clausula_filtros(filtros)
+        resumo = self.executar(
+            f"SELECT COUNT(*) AS linhas, "
+            f"COALESCE(SUM({citar_coluna(COL_QTD_CORRETA)}), 0)::BIGINT AS acertos, "
+            f"COALESCE(SUM({citar_coluna(COL_TOTAL_CALCULADO)}), 0)::BIGINT AS tentativas, "
+            f"COUNT(DISTINCT {citar_coluna(COL_DATA)}) AS sessoes "
+            f"FROM {NOME_TABELA_CONSULTAS} {clausula_where}",
+            parametros
+        )
+        return {nome: int(valor) for nome, valor in resumo.iloc[0].items()}
+
+    def listar_valores(self, coluna: str) -> list:
+        """Valores distintos (não nulos) da coluna, em ordem alfabética."""
+        valores = self.executar(
+            f"SELECT DISTINCT CAST({citar_coluna(coluna)} AS VARCHAR) AS valor FROM {NOME_TABELA_CONSULTAS} "
+            f"WHERE {citar_coluna(coluna)} IS NOT NULL ORDER BY valor"
+        )
+        return valores['valor'].tolist()
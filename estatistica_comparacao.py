@@ -0,0 +1,147 @@
+# Incerteza das eficiências nas comparações entre atletas e períodos
+#
+# Uma eficiência de 3/4 e uma de 300/400 exibem o mesmo 75%, mas só a segunda diz algo.
+# Aqui ficam o intervalo de Wilson (calculado para todos os grupos de uma tabela numa
+# única passada vetorizada) e o teste de bootstrap da diferença B − A. Como cada ação é um
+# acerto ou um erro, reamostrar as ações de um grupo equivale a sortear Binomial(total,
+# eficiência observada): todas as reamostragens de todos os grupos saem de uma única
+# chamada ao gerador do NumPy, sem laços em Python.
+import numpy as np
+import pandas as pd
+
+from dashboard_data import COL_QTD_CORRETA, COL_TOTAL_CALCULADO
+
+# Quantil da normal para 95% de confiança
+Z_CONFIANCA_95 = 1.959964
+NIVEL_SIGNIFICANCIA = 0.05
+
+# Sorteios binomiais por teste (somando A e B): o número de reamostragens por grupo
+# diminui quando há muitos grupos, para o tempo do teste ficar constante
+ORCAMENTO_SORTEIOS_BOOTSTRAP = 400_000
+REAMOSTRAGENS_MAXIMAS = 5_000
+REAMOSTRAGENS_MINIMAS = 200
+# Semente fixa: o mesmo estado dos filtros mostra sempre o mesmo resultado entre reruns
+SEMENTE_BOOTSTRAP = 20240601
+
+COL_IC_INFERIOR = 'IC Inferior'
+COL_IC_SUPERIOR = 'IC Superior'
+
+def calcular_intervalo_wilson(acertos, total, z: float = Z_CONFIANCA_95) -> tuple:
+    """
+    Intervalo de confiança de Wilson da proporção de acertos, elemento a elemento.
+    Grupos sem ações recebem o intervalo [0, 1] (nenhuma informação).
+
+    Args:
+        acertos (array-like): Acertos de cada grupo.
+        total (array-like): Ações de cada grupo.
+        z (float): Quantil da normal para o nível de confiança.
+
+    Returns:
+        tuple: (limites inferiores, limites superiores) como np.ndarray.
+    """
+    acertos = np.asarray(acertos, dtype=np.float64)
+    total = np.asarray(total, dtype=np.float64)
+    com_acoes = total > 0
+    total_seguro = np.where(com_acoes, total, 1.0)
+
+    proporcao = acertos / total_seguro
+    z2 = z * z
+    denominador = 1 + z2 / total_seguro
+    centro = (proporcao + z2 / (2 * total_seguro)) / denominador
+    margem = z * np.sqrt(proporcao * (1 - proporcao) / total_seguro + z2 / (4 * total_seguro ** 2)) / denominador
+
+    inferior = np.where(com_acoes, np.clip(centro - margem, 0.0, 1.0), 0.0)
+    superior = np.where(com_acoes, np.clip(centro + margem, 0.0, 1.0), 1.0)
+    return inferior, superior
+
+def adicionar_intervalos_wilson(tabela: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta as colunas de IC 95% (Wilson) a uma tabela agregada com acertos e total."""
+    inferior, superior = calcular_intervalo_wilson(
+        tabela[COL_QTD_CORRETA].fillna(0).to_numpy(), tabela[COL_TOTAL_CALCULADO].fillna(0).to_numpy()
+    )
+    return tabela.assign(**{COL_IC_INFERIOR: inferior, COL_IC_SUPERIOR: superior})
+
+def definir_reamostragens(quantidade_grupos: int) -> int:
+    """Reamostragens por grupo dentro do orçamento de sorteios do teste."""
+    reamostragens = ORCAMENTO_SORTEIOS_BOOTSTRAP // max(2 * quantidade_grupos, 1)
+    return int(np.clip(reamostragens, REAMOSTRAGENS_MINIMAS, REAMOSTRAGENS_MAXIMAS))
+
+def testar_diferenca_bootstrap(acertos_a, total_a, acertos_b, total_b, reamostragens: int | None = None, semente: int = SEMENTE_BOOTSTRAP) -> pd.DataFrame:
+    """
+    Teste de bootstrap da diferença de eficiência (B − A) para vários pares de grupos de uma vez.
+
+    Args:
+        acertos_a, total_a (array-like): Acertos e ações do lado A de cada par.
+        acertos_b, total_b (array-like): Acertos e ações do lado B de cada par.
+        reamostragens (int | None): Reamostragens por par (padrão: pelo orçamento de sorteios).
+        semente (int): Semente do gerador.
+
+    Returns:
+        pd.DataFrame: Por par, 'diferenca', 'ic_inferior' e 'ic_superior' (percentis 2,5% e
+        97,5% da diferença reamostrada), 'valor_p' (bilateral) e 'significativa'. Pares com
+        um lado sem ações ficam com NaN e não significativos.
+    """
+    acertos_a, total_a = np.atleast_1d(acertos_a).astype(np.int64), np.atleast_1d(total_a).astype(np.int64)
+    acertos_b, total_b = np.atleast_1d(acertos_b).astype(np.int64), np.atleast_1d(total_b).astype(np.int64)
+    reamostragens = reamostragens or definir_reamostragens(len(total_a))
+
+    com_acoes = (total_a > 0) & (total_b > 0)
+    total_a_seguro = np.where(total_a > 0, total_a, 1)
+    total_b_seguro = np.where(total_b > 0, total_b, 1)
+    proporcao_a = acertos_a / total_a_seguro
+    proporcao_b = acertos_b / total_b_seguro
+
+    # Matriz (reamostragens × pares): uma linha por reamostragem de todos os pares
+    gerador = np.random.default_rng(semente)
+    reamostras_a = gerador.binomial(total_a, proporcao_a, size=(reamostragens, len(total_a))) / total_a_seguro
+    reamostras_b = gerador.binomial(total_b, proporcao_b, size=(reamostragens, len(total_b))) / total_b_seguro
+    diferencas = reamostras_b - reamostras_a
+
+    ic_inferior, ic_superior = np.percentile(diferencas, [2.5, 97.5], axis=0)
+    valor_p = np.minimum(2 * np.minimum((diferencas <= 0).mean(axis=0), (diferencas >= 0).mean(axis=0)), 1.0)
+
+    resultado = pd.DataFrame({
+        'diferenca': proporcao_b - proporcao_a,
+        'ic_inferior': ic_inferior,
+        'ic_superior': ic_superior,
+        'valor_p': valor_p,
+    })
+    resultado.loc[~com_acoes, :] = np.nan
+    resultado['significativa'] = com_acoes & (resultado['valor_p'] < NIVEL_SIGNIFICANCIA)
+    return resultado
+
+def comparar_eficiencias(dados_a: pd.DataFrame, dados_b: pd.DataFrame) -> dict:
+    """
+    Compara a eficiência total de dois recortes de uma tabela agregada.
+
+    Returns:
+        dict: eficiencia, intervalo de Wilson e total de cada lado ('a'/'b'), e o resultado
+        do teste de bootstrap da diferença ('teste', uma linha de `testar_diferenca_bootstrap`).
+    """
+    totais = {}
+    for lado, dados in (('a', dados_a), ('b', dados_b)):
+        acertos = int(dados[COL_QTD_CORRETA].sum())
+        total = int(dados[COL_TOTAL_CALCULADO].sum())
+        inferior, superior = calcular_intervalo_wilson(acertos, total)
+        totais[lado] = {
+            'acertos': acertos,
+            'total': total,
+            'eficiencia': acertos / total if total else 0.0,
+            'ic': (float(inferior), float(superior)),
+        }
+
+    teste = testar_diferenca_bootstrap(
+        totais['a']['acertos'], totais['a']['total'], totais['b']['acertos'], totais['b']['total']
+    ).iloc[0]
+    return {**totais, 'teste': teste}
+
+def descrever_teste_diferenca(teste: pd.Series) -> str:
+    """Texto curto com o IC 95% da diferença B − A e a conclusão do teste."""
+    if pd.isna(teste['valor_p']):
+        return "Sem ações em um dos lados: diferença não testada."
+    conclusao = "significativa" if teste['significativa'] else "não significativa"
+    texto_valor_p = "p < 0.001" if teste['valor_p'] < 0.001 else f"p = {teste['valor_p']:.3f}"
+    return (
+        f"IC 95% da diferença: {teste['ic_inferior']:+.1%} a {teste['ic_superior']:+.1%}"
+        f" • {conclusao} ({texto_valor_p})"
+    )
@@ -0,0 +1,136 @@
+# ETL em streaming (blocos) para exportações históricas muito grandes
+#
+# A fonte é lida em blocos, e cada bloco passa pelas mesmas etapas do pipeline (limpeza,
+# regras de negócio, métricas e chaves de período). Nunca existe o DataFrame cru inteiro
+# nem as cópias intermediárias de todas as linhas: o pico de memória do processamento
+# acompanha o tamanho do bloco. Há duas saídas:
+#   - 'linhas': os blocos processados (já no esquema compacto) são concatenados ao fim;
+#   - 'agregados': cada bloco vira um cubo parcial, dobrado no acumulado (as medidas são
+#     somas, então a ordem dos blocos não altera o resultado).
+#
+# Uso (mede a carga de um arquivo local):
+#   python etl_streaming.py planilha.csv [linhas|agregados] [tamanho_bloco]
+import resource
+import sys
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from cubo_agregado import DIMENSOES_CUBO, agregar_cubo
+from dashboard_data import (
+    processar_dados_brutos, uniformizar_categorias,
+    SAIDA_STREAMING_LINHAS, SAIDA_STREAMING_AGREGADOS, TAMANHO_BLOCO_STREAMING
+)
+from fontes_dados import criar_fonte_dados
+from ingestao_incremental import EstadoIngestao, iniciar_hash_prefixo, acumular_hash_prefixo, remover_linhas_vazias_finais
+from instrumentacao import medir_etapa
+from snapshot_dados import iniciar_impressao_digital, acumular_impressao_digital
+
+# Quantos cubos parciais acumular antes de dobrá-los num só
+LIMITE_CUBOS_PARCIAIS = 8
+
+@dataclass
+class ResultadoStreaming:
+    """Saída do ETL em blocos, com o necessário para gravar o snapshot da fonte."""
+    dados: pd.DataFrame
+    impressao_digital: str
+    estado_ingestao: EstadoIngestao
+    linhas_brutas: int
+
+def dobrar_agregados(parciais: list) -> pd.DataFrame:
+    """
+    Soma cubos parciais (ou linhas processadas) num único cubo, recalculando a eficiência.
+
+    Args:
+        parciais (list[pd.DataFrame]): Cubos parciais e/ou linhas processadas.
+
+    Returns:
+        pd.DataFrame: Cubo com as medidas somadas por grupo.
+    """
+    parciais = [parcial for parcial in parciais if not parcial.empty]
+    if not parciais:
+        return pd.DataFrame()
+
+    unidos = pd.concat(uniformizar_categorias(parciais), ignore_index=True)
+    dimensoes_presentes = [coluna for coluna in DIMENSOES_CUBO if coluna in unidos.columns]
+    return agregar_cubo(unidos, dimensoes_presentes)
+
+@medir_etapa()
+def processar_fonte_em_blocos(fonte_dados, tamanho_bloco: int = TAMANHO_BLOCO_STREAMING, saida: str = SAIDA_STREAMING_LINHAS) -> ResultadoStreaming:
+    """
+    Lê e processa a fonte bloco a bloco, acumulando impressão digital e marca d'água
+    iguais às da carga completa.
+
+    Args:
+        fonte_dados (FonteDados): Fonte a ler.
+        tamanho_bloco (int): Linhas cruas por bloco.
+        saida (str): 'linhas' (materializa as linhas) ou 'agregados' (só o cubo).
+
+    Returns:
+        ResultadoStreaming: Dados processados, impressão digital e marca d'água.
+
+    Raises:
+        ValueError: Se a saída pedida for desconhecida.
+    """
+    if saida not in (SAIDA_STREAMING_LINHAS, SAIDA_STREAMING_AGREGADOS):
+        raise ValueError(f"Saída de streaming desconhecida: '{saida}'.")
+
+    hash_conteudo = None
+    hash_prefixo = None
+    linhas_brutas = 0
+    linhas_vazias_pendentes = None
+    blocos_processados = []
+
+    for bloco in fonte_dados.ler_dados_brutos_em_blocos(tamanho_bloco):
+        if hash_conteudo is None:
+            hash_conteudo = iniciar_impressao_digital(bloco.columns)
+            hash_prefixo = iniciar_hash_prefixo(bloco.columns)
+
+        # Linhas vazias no fim do bloco só contam se houver conteúdo depois delas
+        if linhas_vazias_pendentes is not None and not linhas_vazias_pendentes.empty:
+            bloco = pd.concat([linhas_vazias_pendentes, bloco], ignore_index=True)
+        conteudo = remover_linhas_vazias_finais(bloco)
+        linhas_vazias_pendentes = bloco.iloc[len(conteudo):]
+        if conteudo.empty:
+            continue
+
+        acumular_impressao_digital(hash_conteudo, conteudo)
+        acumular_hash_prefixo(hash_prefixo, conteudo)
+        linhas_brutas += len(conteudo)
+
+        processado = processar_dados_brutos(conteudo)
+        if saida == SAIDA_STREAMING_AGREGADOS:
+            blocos_processados.append(dobrar_agregados([processado]))
+            if len(blocos_processados) >= LIMITE_CUBOS_PARCIAIS:
+                blocos_processados = [dobrar_agregados(blocos_processados)]
+        else:
+            blocos_processados.append(processado)
+
+    if saida == SAIDA_STREAMING_AGREGADOS:
+        dados = dobrar_agregados(blocos_processados)
+    elif blocos_processados:
+        dados = pd.concat(uniformizar_categorias(blocos_processados), ignore_index=True)
+    else:
+        dados = pd.DataFrame()
+
+    estado_ingestao = EstadoIngestao(
+        linhas_ingeridas=linhas_brutas,
+        hash_prefixo=(hash_prefixo or iniciar_hash_prefixo([])).hexdigest(),
+    )
+    impressao_digital = (hash_conteudo or iniciar_impressao_digital([])).hexdigest()
+    return ResultadoStreaming(dados, impressao_digital, estado_ingestao, linhas_brutas)
+
+if __name__ == "__main__":
+    fonte_medida = criar_fonte_dados('', sys.argv[1])
+    saida_medida = sys.argv[2] if len(sys.argv) > 2 else SAIDA_STREAMING_LINHAS
+    tamanho_bloco_medido = int(sys.argv[3]) if len(sys.argv) > 3 else TAMANHO_BLOCO_STREAMING
+
+    inicio = time.perf_counter()
+    resultado_medido = processar_fonte_em_blocos(fonte_medida, tamanho_bloco_medido, saida_medida)
+    # ru_maxrss é informado em KB no Linux
+    pico_memoria_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{resultado_medido.linhas_brutas:,} linhas cruas -> {len(resultado_medido.dados):,} linhas ({saida_medida}) "
+        f"em {time.perf_counter() - inicio:.2f}s; pico de memória {pico_memoria_mb:.0f} MB"
+    )
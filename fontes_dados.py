@@ -0,0 +1,411 @@
+# Fontes de dados brutos do pipeline
+#
+# Cada fonte entrega os dados crus no layout da aba 'Página1' (mesmas colunas, mesmos
+# textos), de modo que todas alimentam o mesmo ETL. O Google Sheets é apenas uma das
+# implementações; as fontes locais (CSV, XLSX, Parquet e Arrow) permitem rodar o app e
+# o benchmark sem rede. A fonte é escolhida por configuração (variáveis de ambiente).
+# Os destinos são o lado de escrita: acrescentam linhas ao fim da aba do Google Sheets ou
+# do CSV exportado (lançamentos feitos pelo app; ver `lancamento_dados`).
+#
+# Uso (conversão de uma planilha exportada para Arrow, a leitura local mais rápida):
+#   python fontes_dados.py planilha.csv planilha.arrow
+import itertools
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+# O conector do Google Sheets e o openpyxl são importados na primeira leitura da fonte
+# que os usa: juntos pesam mais de meio segundo na partida do app, mesmo com fonte local
+
+TIPO_FONTE_GSHEETS = 'gsheets'
+TIPO_FONTE_CSV = 'csv'
+TIPO_FONTE_XLSX = 'xlsx'
+TIPO_FONTE_PARQUET = 'parquet'
+TIPO_FONTE_ARROW = 'arrow'
+
+# Tipo de fonte inferido pela extensão quando só o caminho é configurado
+TIPOS_FONTE_POR_EXTENSAO = {
+    '.csv': TIPO_FONTE_CSV,
+    '.xlsx': TIPO_FONTE_XLSX,
+    '.parquet': TIPO_FONTE_PARQUET,
+    '.arrow': TIPO_FONTE_ARROW,
+    '.feather': TIPO_FONTE_ARROW,
+}
+
+# Configuração: FONTE_DADOS (gsheets, csv, xlsx, parquet ou arrow), CAMINHO_FONTE_DADOS
+# (vários arquivos separados por os.pathsep) e ABAS_FONTE_DADOS (abas separadas por vírgula)
+TIPO_FONTE_CONFIGURADO = os.environ.get('FONTE_DADOS', '').strip().lower()
+CAMINHOS_FONTE_CONFIGURADOS = [
+    caminho.strip() for caminho in os.environ.get('CAMINHO_FONTE_DADOS', '').split(os.pathsep) if caminho.strip()
+]
+ABAS_FONTE_CONFIGURADAS = [aba.strip() for aba in os.environ.get('ABAS_FONTE_DADOS', '').split(',') if aba.strip()]
+
+# Tipos de fonte em que cada aba é uma fonte separada
+TIPOS_FONTE_COM_ABAS = [TIPO_FONTE_GSHEETS, TIPO_FONTE_XLSX]
+
+# Na planilha (e nas exportações CSV/XLSX) a linha 0 é o título e a linha 1 o cabeçalho
+LINHA_CABECALHO_PLANILHA = 1
+
+class FonteDados:
+    """Interface comum: `ler_dados_brutos` devolve os dados crus da fonte inteira."""
+
+    def ler_dados_brutos(self) -> pd.DataFrame:
+        """
+        Lê os dados crus da fonte.
+
+        Returns:
+            pd.DataFrame: Dados crus no layout da planilha.
+        """
+        raise NotImplementedError
+
+    def ler_dados_brutos_em_blocos(self, tamanho_bloco: int):
+        """
+        Lê os dados crus em blocos de até `tamanho_bloco` linhas (ETL em streaming).
+        Por padrão lê tudo e fatia; as fontes locais sobrescrevem lendo bloco a bloco.
+
+        Yields:
+            pd.DataFrame: Bloco de linhas cruas, na ordem da fonte.
+        """
+        dados_brutos = self.ler_dados_brutos()
+        for inicio in range(0, len(dados_brutos), tamanho_bloco):
+            yield dados_brutos.iloc[inicio:inicio + tamanho_bloco]
+
+    def descrever(self) -> str:
+        """Texto curto usado em logs e mensagens de erro."""
+        return type(self).__name__
+
+    def identificar(self) -> str:
+        """Rótulo da fonte no dataset unificado (coluna Fonte e filtro da sidebar)."""
+        return self.descrever()
+
+@dataclass
+class FonteGoogleSheets(FonteDados):
+    """Aba do Google Sheets lida pela conexão `gsheets` do Streamlit."""
+    nome_aba: str
+
+    def ler_dados_brutos(self) -> pd.DataFrame:
+        from streamlit_gsheets import GSheetsConnection
+
+        conexao = st.connection("gsheets", type=GSheetsConnection)
+        # ttl=0: sem o cache de 1 hora do conector. A validade dos dados já é controlada pelo
+        # snapshot e pelo atualizador, e o cache esconderia as linhas lançadas pelo app
+        return conexao.read(worksheet=self.nome_aba, header=LINHA_CABECALHO_PLANILHA, ttl=0)
+
+    # Em blocos: o conector não pagina a leitura, então a aba é baixada inteira e fatiada
+
+    def descrever(self) -> str:
+        return f"Google Sheets ({self.nome_aba})"
+
+    def identificar(self) -> str:
+        return self.nome_aba
+
+@dataclass
+class FonteCSV(FonteDados):
+    """CSV exportado da planilha (título na primeira linha, cabeçalho na segunda)."""
+    caminho: Path
+
+    def ler_dados_brutos(self) -> pd.DataFrame:
+        return pd.read_csv(self.caminho, header=LINHA_CABECALHO_PLANILHA)
+
+    def ler_dados_brutos_em_blocos(self, tamanho_bloco: int):
+        with pd.read_csv(self.caminho, header=LINHA_CABECALHO_PLANILHA, chunksize=tamanho_bloco) as leitor_blocos:
+            yield from leitor_blocos
+
+    def descrever(self) -> str:
+        return f"CSV ({self.caminho})"
+
+    def identificar(self) -> str:
+        return self.caminho.stem
+
+@dataclass
+class FonteXLSX(FonteDados):
+    """Planilha baixada em .xlsx, lida com o openpyxl."""
+    caminho: Path
+    nome_aba: str
+
+    def ler_dados_brutos(self) -> pd.DataFrame:
+        return pd.read_excel(self.caminho, sheet_name=self.nome_aba, header=LINHA_CABECALHO_PLANILHA, engine='openpyxl')
+
+    def ler_dados_brutos_em_blocos(self, tamanho_bloco: int):
+        import openpyxl
+
+        # Modo somente leitura do openpyxl: as linhas são lidas sob demanda, sem carregar a pasta toda
+        pasta_trabalho = openpyxl.load_workbook(self.caminho, read_only=True, data_only=True)
+        try:
+            linhas = pasta_trabalho[self.nome_aba].iter_rows(min_row=LINHA_CABECALHO_PLANILHA + 1, values_only=True)
+            cabecalho = next(linhas, None)
+            if cabecalho is None:
+                return
+            colunas = [str(nome) if nome is not None else f"Unnamed: {posicao}" for posicao, nome in enumerate(cabecalho)]
+            while True:
+                bloco = list(itertools.islice(linhas, tamanho_bloco))
+                if not bloco:
+                    return
+                yield pd.DataFrame.from_records(bloco, columns=colunas)
+        finally:
+            pasta_trabalho.close()
+
+    def descrever(self) -> str:
+        return f"XLSX ({self.caminho}, aba {self.nome_aba})"
+
+    def identificar(self) -> str:
+        return self.nome_aba
+
+@dataclass
+class FonteParquet(FonteDados):
+    """Arquivo Parquet com as colunas da planilha (sem linha de título)."""
+    caminho: Path
+
+    def ler_dados_brutos(self) -> pd.DataFrame:
+        return pq.read_table(self.caminho, memory_map=True).to_pandas()
+
+    def ler_dados_brutos_em_blocos(self, tamanho_bloco: int):
+        arquivo_parquet = pq.ParquetFile(self.caminho, memory_map=True)
+        for lote in arquivo_parquet.iter_batches(batch_size=tamanho_bloco):
+            yield lote.to_pandas()
+
+    def descrever(self) -> str:
+        return f"Parquet ({self.caminho})"
+
+    def identificar(self) -> str:
+        return self.caminho.stem
+
+@dataclass
+class FonteArrow(FonteDados):
+    """
+    Arquivo Arrow IPC/Feather mapeado em memória: as colunas são lidas direto do
+    page cache do sistema, e na leitura em blocos só a fatia da vez é convertida.
+    Colunas numéricas podem continuar apontando para o mapeamento, por isso o arquivo
+    deve ser substituído atomicamente (como faz `exportar_para_arrow`), nunca sobrescrito.
+    """
+    caminho: Path
+
+    def ler_dados_brutos(self) -> pd.DataFrame:
+        with pa.memory_map(str(self.caminho), 'r') as arquivo_mapeado:
+            return pa.ipc.open_file(arquivo_mapeado).read_all().to_pandas()
+
+    def ler_dados_brutos_em_blocos(self, tamanho_bloco: int):
+        # A tabela mapeada não ocupa memória própria: só cada fatia convertida é materializada
+        with pa.memory_map(str(self.caminho), 'r') as arquivo_mapeado:
+            tabela = pa.ipc.open_file(arquivo_mapeado).read_all()
+            for inicio in range(0, tabela.num_rows, tamanho_bloco):
+                yield tabela.slice(inicio, tamanho_bloco).to_pandas()
+
+    def descrever(self) -> str:
+        return f"Arrow ({self.caminho})"
+
+    def identificar(self) -> str:
+        return self.caminho.stem
+
+def inferir_tipo_fonte(caminho) -> str:
+    """Tipo de fonte pela extensão do arquivo; sem arquivo, Google Sheets."""
+    if not caminho:
+        return TIPO_FONTE_GSHEETS
+    return TIPOS_FONTE_POR_EXTENSAO.get(Path(caminho).suffix.lower(), '')
+
+def criar_fonte_dados(tipo_fonte: str, caminho=None, nome_aba: str = 'Página1') -> FonteDados:
+    """
+    Instancia a fonte de dados pelo tipo; sem tipo, infere pela extensão do caminho.
+
+    Args:
+        tipo_fonte (str): gsheets, csv, xlsx, parquet ou arrow ('' para inferir).
+        caminho (str | Path | None): Arquivo das fontes locais.
+        nome_aba (str): Aba lida no Google Sheets e no XLSX.
+
+    Returns:
+        FonteDados: Fonte pronta para leitura.
+
+    Raises:
+        ValueError: Se o tipo for desconhecido ou faltar o caminho de uma fonte local.
+    """
+    tipo_fonte = tipo_fonte or inferir_tipo_fonte(caminho)
+    if tipo_fonte == TIPO_FONTE_GSHEETS:
+        return FonteGoogleSheets(nome_aba)
+    if not caminho:
+        raise ValueError(f"A fonte '{tipo_fonte}' exige CAMINHO_FONTE_DADOS.")
+
+    caminho = Path(caminho)
+    if tipo_fonte == TIPO_FONTE_CSV:
+        return FonteCSV(caminho)
+    if tipo_fonte == TIPO_FONTE_XLSX:
+        return FonteXLSX(caminho, nome_aba)
+    if tipo_fonte == TIPO_FONTE_PARQUET:
+        return FonteParquet(caminho)
+    if tipo_fonte == TIPO_FONTE_ARROW:
+        return FonteArrow(caminho)
+    raise ValueError(f"Fonte de dados desconhecida: '{tipo_fonte}'.")
+
+def obter_fontes_configuradas(nomes_abas_padrao: list) -> list:
+    """
+    Fontes definidas por FONTE_DADOS / CAMINHO_FONTE_DADOS / ABAS_FONTE_DADOS: uma por
+    arquivo e, no Google Sheets e no XLSX, uma por aba (Google Sheets por padrão).
+
+    Args:
+        nomes_abas_padrao (list): Abas lidas quando ABAS_FONTE_DADOS não está definida.
+
+    Returns:
+        list[FonteDados]: Fontes a carregar, na ordem configurada.
+    """
+    nomes_abas = ABAS_FONTE_CONFIGURADAS or nomes_abas_padrao
+    caminhos = CAMINHOS_FONTE_CONFIGURADOS or [None]
+
+    fontes = []
+    for caminho in caminhos:
+        tipo_fonte = TIPO_FONTE_CONFIGURADO or inferir_tipo_fonte(caminho)
+        abas_da_fonte = nomes_abas if tipo_fonte in TIPOS_FONTE_COM_ABAS else nomes_abas[:1]
+        fontes.extend(criar_fonte_dados(tipo_fonte, caminho, nome_aba) for nome_aba in abas_da_fonte)
+    return fontes
+
+class DestinoDados:
+    """Interface comum de escrita: `anexar_linhas` acrescenta linhas cruas ao fim da fonte."""
+
+    def anexar_linhas(self, dados_brutos: pd.DataFrame):
+        """
+        Acrescenta as linhas na ordem recebida, casando as colunas pelo cabeçalho da fonte.
+
+        Args:
+            dados_brutos (pd.DataFrame): Linhas no layout da planilha.
+
+        Raises:
+            Exception: Se a escrita falhar (nada deve ser considerado gravado).
+        """
+        raise NotImplementedError
+
+    def descrever(self) -> str:
+        """Texto curto usado em logs e mensagens de erro."""
+        return type(self).__name__
+
+def converter_em_valores_planilha(dados_brutos: pd.DataFrame, cabecalho: list) -> list:
+    """Linhas como listas de valores Python na ordem do cabeçalho (colunas ausentes e vazios viram '')."""
+    alinhados = dados_brutos.reindex(columns=cabecalho)
+    return [
+        ['' if pd.isna(valor) else getattr(valor, 'item', lambda: valor)() for valor in linha]
+        for linha in alinhados.itertuples(index=False, name=None)
+    ]
+
+def abrir_planilha_gspread():
+    """
+    Abre pelo gspread a planilha da conexão `gsheets`, com os mesmos secrets do conector
+    (`spreadsheet`, URL ou título, e as credenciais da conta de serviço).
+
+    Raises:
+        RuntimeError: Se a conexão não usa conta de serviço ou não indica a planilha.
+    """
+    import gspread
+
+    configuracao = dict(st.secrets["connections"]["gsheets"])
+    planilha = configuracao.pop("spreadsheet", None)
+    if configuracao.get("type") != "service_account":
+        raise RuntimeError("a escrita na planilha exige uma conta de serviço (type = 'service_account' nos secrets).")
+    if not planilha:
+        raise RuntimeError("informe a planilha (spreadsheet) nos secrets da conexão gsheets.")
+
+    cliente = gspread.service_account_from_dict(configuracao)
+    if planilha.startswith(("http://", "https://")):
+        return cliente.open_by_url(planilha)
+    return cliente.open(planilha)
+
+@dataclass
+class DestinoGoogleSheets(DestinoDados):
+    """Aba do Google Sheets; a escrita exige a conexão `gsheets` com conta de serviço."""
+    nome_aba: str
+
+    def anexar_linhas(self, dados_brutos: pd.DataFrame):
+        # O conector só regrava abas inteiras (`update`): o acréscimo vai pelo gspread
+        aba = abrir_planilha_gspread().worksheet(self.nome_aba)
+        linha_cabecalho = LINHA_CABECALHO_PLANILHA + 1  # O gspread numera as linhas a partir de 1
+        cabecalho = [str(nome).strip() for nome in aba.row_values(linha_cabecalho)]
+        # USER_ENTERED: a planilha interpreta datas e números como se tivessem sido digitados
+        aba.append_rows(
+            converter_em_valores_planilha(dados_brutos, cabecalho),
+            value_input_option='USER_ENTERED', table_range=f"A{linha_cabecalho}"
+        )
+
+    def descrever(self) -> str:
+        return f"Google Sheets ({self.nome_aba})"
+
+@dataclass
+class DestinoCSV(DestinoDados):
+    """CSV exportado da planilha: substituto local do Google Sheets (sem rede, lido pela `FonteCSV`)."""
+    caminho: Path
+
+    def anexar_linhas(self, dados_brutos: pd.DataFrame):
+        cabecalho = pd.read_csv(self.caminho, header=LINHA_CABECALHO_PLANILHA, nrows=0).columns.str.strip()
+        with open(self.caminho, 'rb') as arquivo:
+            # Uma última linha sem quebra (arquivo editado à mão) não pode emendar na primeira nova
+            tamanho = arquivo.seek(0, os.SEEK_END)
+            if tamanho:
+                arquivo.seek(tamanho - 1)
+            termina_em_quebra = not tamanho or arquivo.read(1) == b'\n'
+        with open(self.caminho, 'a', encoding='utf-8', newline='') as arquivo:
+            if not termina_em_quebra:
+                arquivo.write('\n')
+            dados_brutos.reindex(columns=cabecalho).to_csv(arquivo, header=False, index=False)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+    def descrever(self) -> str:
+        return f"CSV ({self.caminho})"
+
+@dataclass
+class DestinoMemoria(DestinoDados):
+    """Destino em memória para testes: guarda os lotes recebidos e pode simular falhas de envio."""
+    falhas_simuladas: int = 0
+    lotes_recebidos: list = field(default_factory=list)
+
+    def anexar_linhas(self, dados_brutos: pd.DataFrame):
+        if self.falhas_simuladas > 0:
+            self.falhas_simuladas -= 1
+            raise ConnectionError("falha simulada no envio")
+        self.lotes_recebidos.append(dados_brutos)
+
+    def descrever(self) -> str:
+        return "Memória"
+
+def criar_destino_dados(fonte_dados: FonteDados) -> DestinoDados | None:
+    """
+    Destino que escreve na mesma aba/arquivo da fonte (as linhas voltam na leitura seguinte).
+
+    Returns:
+        DestinoDados | None: None para as fontes que não aceitam escrita (XLSX, Parquet e Arrow).
+    """
+    if isinstance(fonte_dados, FonteGoogleSheets):
+        return DestinoGoogleSheets(fonte_dados.nome_aba)
+    if isinstance(fonte_dados, FonteCSV):
+        return DestinoCSV(fonte_dados.caminho)
+    return None
+
+def exportar_para_arrow(dados_brutos: pd.DataFrame, caminho_arquivo):
+    """
+    Grava os dados crus em Arrow IPC (Feather v2, sem compressão, para permitir o mapeamento
+    em memória). Colunas de texto misto são gravadas como texto.
+
+    Args:
+        dados_brutos (pd.DataFrame): Dados crus no layout da planilha.
+        caminho_arquivo (str | Path): Arquivo de destino (.arrow ou .feather).
+    """
+    dados_brutos = dados_brutos.copy()
+    for coluna in dados_brutos.columns:
+        if dados_brutos[coluna].dtype == object:
+            dados_brutos[coluna] = dados_brutos[coluna].astype('string')
+    tabela = pa.Table.from_pandas(dados_brutos, preserve_index=False)
+
+    # Grava num temporário e substitui: leitores com o arquivo antigo mapeado não são afetados
+    caminho_arquivo = Path(caminho_arquivo)
+    caminho_temporario = caminho_arquivo.with_name(caminho_arquivo.name + '.tmp')
+    with pa.OSFile(str(caminho_temporario), 'wb') as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    os.replace(caminho_temporario, caminho_arquivo)
+
+if __name__ == "__main__":
+    fonte_origem = criar_fonte_dados('', sys.argv[1])
+    caminho_destino = sys.argv[2] if len(sys.argv) > 2 else str(Path(sys.argv[1]).with_suffix('.arrow'))
+    dados_origem = fonte_origem.ler_dados_brutos()
+    exportar_para_arrow(dados_origem, caminho_destino)
+    print(f"{len(dados_origem):,} linhas de {fonte_origem.descrever()} gravadas em {caminho_destino}")
@@ -0,0 +1,144 @@
+# Gerador de planilhas de treino sintéticas (layout da aba 'Página1')
+#
+# Produz dados crus realistas para medir o comportamento do pipeline com volumes grandes:
+# várias atletas, anos de sessões em ordem cronológica (a planilha é append-only), todos
+# os textos de fundamentos, incluindo os erros fatais de levantamento e as linhas
+# totalizadoras ('Ataque' e 'Levantamento'), e as colunas opcionais Tipo/Atleta.
+#
+# Uso: python gerador_dados_sinteticos.py 100000 planilha_sintetica.csv
+import sys
+
+import numpy as np
+import pandas as pd
+
+from dashboard_data import (
+    COL_DATA, COL_LOCAL, COL_ATLETA, COL_TIPO, COL_FUNDAMENTOS,
+    COL_QTD_CORRETA, COL_QTD_ERRADA, COL_QTD_TOTAL,
+    PREFIXO_ATAQUE, TEXTO_LEVANTAMENTO, CASO_LEVANTAMENTO_BOM, CASOS_LEVANTAMENTO_ERRO_FATAL,
+    TIPO_ESPECIFICO, TIPO_RACHA, TIPO_TORNEIO
+)
+
+VARIACOES_ATAQUE = ['Ataque - Diagonal', 'Ataque - Paralela', 'Ataque - Largada', 'Ataque - Explorada no bloqueio']
+VARIACOES_LEVANTAMENTO = [CASO_LEVANTAMENTO_BOM] + CASOS_LEVANTAMENTO_ERRO_FATAL
+OUTROS_FUNDAMENTOS = [
+    'Saque - Viagem', 'Saque - Flutuante', 'Recepção - Manchete', 'Recepção - Toque',
+    'Defesa', 'Bloqueio'
+]
+
+# Cada sessão de treino registra uma linha por fundamento, mais as duas linhas totalizadoras
+FUNDAMENTOS_POR_SESSAO = OUTROS_FUNDAMENTOS + VARIACOES_ATAQUE + [PREFIXO_ATAQUE] + VARIACOES_LEVANTAMENTO + [TEXTO_LEVANTAMENTO]
+
+LOCAIS_TREINO = ['Praia do Futuro', 'Arena Beira-Mar', 'Quadra do Clube', 'Iracema']
+TIPOS_TREINO = [TIPO_ESPECIFICO, TIPO_RACHA, TIPO_TORNEIO]
+PESOS_TIPOS_TREINO = [0.6, 0.3, 0.1]
+
+TITULO_PLANILHA = 'Controle de Treinos - Vôlei de Praia'
+
+# Frações de células deixadas em branco, como acontece na digitação manual
+FRACAO_TIPO_VAZIO = 0.02
+FRACAO_QUANTIDADE_CORRETA_VAZIA = 0.01
+
+def gerar_datas_sessoes(quantidade_sessoes: int, quantidade_anos: int, gerador: np.random.Generator) -> np.ndarray:
+    """Sorteia as datas das sessões dentro do período e as ordena (planilha cronológica)."""
+    data_final = pd.Timestamp.today().normalize()
+    data_inicial = data_final - pd.DateOffset(years=quantidade_anos)
+    quantidade_dias = (data_final - data_inicial).days
+    deslocamentos = np.sort(gerador.integers(0, quantidade_dias + 1, quantidade_sessoes))
+    return (data_inicial + pd.to_timedelta(deslocamentos, unit='D')).to_numpy()
+
+def sortear_quantidades(atleta_por_linha, indice_fundamento_por_linha, quantidade_atletas, gerador) -> tuple:
+    """
+    Sorteia total e acertos de cada linha, com uma taxa de acerto própria por atleta e fundamento.
+
+    Returns:
+        tuple: (acertos, erros, totais) como arrays de float (permitem células vazias).
+    """
+    taxas_acerto = gerador.beta(5, 4, size=(quantidade_atletas, len(FUNDAMENTOS_POR_SESSAO)))
+    totais = gerador.poisson(8, len(atleta_por_linha)).astype(np.float64)
+    acertos = gerador.binomial(totais.astype(np.int64), taxas_acerto[atleta_por_linha, indice_fundamento_por_linha]).astype(np.float64)
+
+    # Erros fatais de levantamento nunca têm acertos
+    posicoes_erro_fatal = [FUNDAMENTOS_POR_SESSAO.index(caso) for caso in CASOS_LEVANTAMENTO_ERRO_FATAL]
+    acertos[np.isin(indice_fundamento_por_linha, posicoes_erro_fatal)] = 0
+    return acertos, totais - acertos, totais
+
+def preencher_linhas_totalizadoras(sessao_por_linha, fundamentos_por_linha, quantidades: tuple, quantidade_sessoes: int):
+    """Faz as linhas 'Ataque' e 'Levantamento' de cada sessão somarem suas subcategorias."""
+    for texto_total, variacoes in [(PREFIXO_ATAQUE, VARIACOES_ATAQUE), (TEXTO_LEVANTAMENTO, VARIACOES_LEVANTAMENTO)]:
+        linhas_variacao = np.isin(fundamentos_por_linha, variacoes)
+        linhas_total = fundamentos_por_linha == texto_total
+        for quantidade in quantidades:
+            soma_por_sessao = np.bincount(
+                sessao_por_linha[linhas_variacao], weights=quantidade[linhas_variacao], minlength=quantidade_sessoes
+            )
+            quantidade[linhas_total] = soma_por_sessao[sessao_por_linha[linhas_total]]
+
+def gerar_planilha_sintetica(
+    quantidade_linhas: int,
+    quantidade_atletas: int = 12,
+    quantidade_anos: int = 3,
+    incluir_coluna_tipo: bool = True,
+    incluir_coluna_atleta: bool = True,
+    semente: int = 42
+) -> pd.DataFrame:
+    """
+    Gera dados crus no mesmo formato lido de `Página1` (datas em texto DD/MM/AAAA).
+
+    Args:
+        quantidade_linhas (int): Número de linhas da planilha.
+        quantidade_atletas (int): Número de atletas distintas.
+        quantidade_anos (int): Anos de histórico cobertos pelas sessões.
+        incluir_coluna_tipo (bool): Se False, omite a coluna Tipo (planilhas antigas).
+        incluir_coluna_atleta (bool): Se False, omite a coluna Atleta (planilhas antigas).
+        semente (int): Semente do sorteio, para resultados reprodutíveis.
+
+    Returns:
+        pd.DataFrame: Planilha sintética.
+    """
+    gerador = np.random.default_rng(semente)
+    quantidade_sessoes = -(-quantidade_linhas // len(FUNDAMENTOS_POR_SESSAO))
+
+    sessao_por_linha = np.repeat(np.arange(quantidade_sessoes), len(FUNDAMENTOS_POR_SESSAO))[:quantidade_linhas]
+    indice_fundamento_por_linha = np.tile(np.arange(len(FUNDAMENTOS_POR_SESSAO)), quantidade_sessoes)[:quantidade_linhas]
+    fundamentos_por_linha = np.array(FUNDAMENTOS_POR_SESSAO, dtype=object)[indice_fundamento_por_linha]
+
+    atleta_por_sessao = gerador.integers(0, quantidade_atletas, quantidade_sessoes)
+    atleta_por_linha = atleta_por_sessao[sessao_por_linha]
+    quantidades = sortear_quantidades(atleta_por_linha, indice_fundamento_por_linha, quantidade_atletas, gerador)
+    preencher_linhas_totalizadoras(sessao_por_linha, fundamentos_por_linha, quantidades, quantidade_sessoes)
+    acertos, erros, totais = quantidades
+    acertos[gerador.random(quantidade_linhas) < FRACAO_QUANTIDADE_CORRETA_VAZIA] = np.nan
+
+    datas_sessoes = pd.DatetimeIndex(gerar_datas_sessoes(quantidade_sessoes, quantidade_anos, gerador))
+    textos_datas_sessoes = np.asarray(datas_sessoes.strftime('%d/%m/%Y'), dtype=object)
+    locais_sessoes = np.array(LOCAIS_TREINO, dtype=object)[gerador.integers(0, len(LOCAIS_TREINO), quantidade_sessoes)]
+
+    planilha = {
+        COL_DATA: textos_datas_sessoes[sessao_por_linha],
+        COL_LOCAL: locais_sessoes[sessao_por_linha],
+    }
+    if incluir_coluna_atleta:
+        nomes_atletas = np.array([f'Atleta {numero:02d}' for numero in range(1, quantidade_atletas + 1)], dtype=object)
+        planilha[COL_ATLETA] = nomes_atletas[atleta_por_linha]
+    if incluir_coluna_tipo:
+        tipos_sessoes = gerador.choice(np.array(TIPOS_TREINO, dtype=object), quantidade_sessoes, p=PESOS_TIPOS_TREINO)
+        tipos_sessoes[gerador.random(quantidade_sessoes) < FRACAO_TIPO_VAZIO] = None
+        planilha[COL_TIPO] = tipos_sessoes[sessao_por_linha]
+
+    planilha[COL_FUNDAMENTOS] = fundamentos_por_linha
+    planilha[COL_QTD_CORRETA] = acertos
+    planilha[COL_QTD_ERRADA] = erros
+    planilha[COL_QTD_TOTAL] = totais
+    return pd.DataFrame(planilha)
+
+def exportar_planilha_csv(dados_brutos: pd.DataFrame, caminho_arquivo: str):
+    """Grava a planilha em CSV com a linha de título acima do cabeçalho (lida com header=1)."""
+    with open(caminho_arquivo, 'w', encoding='utf-8', newline='') as arquivo:
+        arquivo.write(TITULO_PLANILHA + '\n')
+        dados_brutos.to_csv(arquivo, index=False)
+
+if __name__ == "__main__":
+    quantidade_linhas_desejada = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    caminho_saida = sys.argv[2] if len(sys.argv) > 2 else 'planilha_sintetica.csv'
+    exportar_planilha_csv(gerar_planilha_sintetica(quantidade_linhas_desejada), caminho_saida)
+    print(f"{quantidade_linhas_desejada:,} linhas gravadas em {caminho_saida}")
@@ -0,0 +1,152 @@
+# Indicadores de forma (estado incremental)
+#
+# "Forma atual" por atleta e categoria: eficiência nas últimas SESSOES_JANELA_FORMA sessões
+# (dias com treino) e média exponencial com decaimento pelo tempo decorrido. O estado guarda,
+# por atleta e categoria, as sessões da janela (dia, acertos, total) e as somas de acertos e
+# total ponderadas por 0.5 ** (dias até o dia de referência / meia-vida). Dois estados se
+# combinam de forma exata (janelas unidas por dia, somas trazidas ao mesmo dia de referência),
+# então a ingestão incremental só calcula o estado das linhas novas e o combina com o gravado
+# no snapshot, e o mesmo vale para unir fontes. Linhas de um dia já visto ou retroativas
+# entram corretamente.
+import numpy as np
+import pandas as pd
+
+from dashboard_data import COL_ATLETA, COL_CATEGORIA, COL_DATA, COL_QTD_CORRETA, COL_TOTAL_CALCULADO
+from snapshot_dados import SnapshotDados
+
+SESSOES_JANELA_FORMA = 5
+MEIA_VIDA_FORMA_DIAS = 14
+# Chave em `DataFrame.attrs` com o estado serializado dos indicadores
+CHAVE_INDICADORES_FORMA = 'indicadores_forma'
+
+def resumir_sessoes_forma(dados: pd.DataFrame) -> pd.DataFrame:
+    """
+    Soma acertos e total por Atleta × Categoria × Data (uma sessão), com o dia como inteiro.
+    
+    Args:
+        dados (pd.DataFrame): Linhas processadas ou células do cubo.
+        
+    Returns:
+        pd.DataFrame: Uma linha por sessão, com a coluna 'Dia' (dias desde 1970-01-01).
+    """
+    colunas_necessarias = [COL_ATLETA, COL_CATEGORIA, COL_DATA, COL_QTD_CORRETA, COL_TOTAL_CALCULADO]
+    if dados.empty or any(coluna not in dados.columns for coluna in colunas_necessarias):
+        return pd.DataFrame(columns=colunas_necessarias + ['Dia'])
+
+    com_data = dados[dados[COL_DATA].notna()]
+    sessoes = com_data.groupby([COL_ATLETA, COL_CATEGORIA, COL_DATA], observed=True)[[COL_QTD_CORRETA, COL_TOTAL_CALCULADO]].sum().reset_index()
+    sessoes['Dia'] = sessoes[COL_DATA].to_numpy().astype('datetime64[D]').astype(np.int64)
+    return sessoes
+
+def criar_estado_forma(registros: list) -> dict:
+    """Estado serializável dos indicadores, com os parâmetros usados para calculá-lo."""
+    return {
+        'sessoes_janela': SESSOES_JANELA_FORMA,
+        'meia_vida_dias': MEIA_VIDA_FORMA_DIAS,
+        'registros': registros,
+    }
+
+def estado_forma_e_compativel(estado_forma) -> bool:
+    """Indica se um estado gravado foi calculado com os parâmetros atuais."""
+    return (
+        isinstance(estado_forma, dict)
+        and estado_forma.get('sessoes_janela') == SESSOES_JANELA_FORMA
+        and estado_forma.get('meia_vida_dias') == MEIA_VIDA_FORMA_DIAS
+    )
+
+def calcular_indicadores_forma(dados: pd.DataFrame) -> dict:
+    """
+    Calcula do zero o estado dos indicadores de forma (carga completa ou ressincronização).
+    
+    Args:
+        dados (pd.DataFrame): Linhas processadas ou células do cubo.
+        
+    Returns:
+        dict: Estado serializável (ver `criar_estado_forma`).
+    """
+    sessoes = resumir_sessoes_forma(dados)
+    if sessoes.empty:
+        return criar_estado_forma([])
+
+    chaves = [COL_ATLETA, COL_CATEGORIA]
+    sessoes = sessoes.sort_values('Dia', kind='stable')
+    sessoes['Dia Referencia'] = sessoes.groupby(chaves, observed=True)['Dia'].transform('max')
+    pesos = 0.5 ** ((sessoes['Dia Referencia'] - sessoes['Dia']) / MEIA_VIDA_FORMA_DIAS)
+    sessoes['Acertos Ponderados'] = sessoes[COL_QTD_CORRETA].astype('float64') * pesos
+    sessoes['Total Ponderado'] = sessoes[COL_TOTAL_CALCULADO].astype('float64') * pesos
+
+    somas_ponderadas = sessoes.groupby(chaves, observed=True).agg({
+        'Acertos Ponderados': 'sum', 'Total Ponderado': 'sum', 'Dia Referencia': 'max'
+    })
+    janelas = sessoes.groupby(chaves, observed=True).tail(SESSOES_JANELA_FORMA)
+
+    registros = []
+    for (atleta, categoria), janela in janelas.groupby(chaves, observed=True):
+        somas = somas_ponderadas.loc[(atleta, categoria)]
+        registros.append({
+            'atleta': str(atleta),
+            'categoria': str(categoria),
+            'janela': [
+                [int(dia), int(acertos), int(total)]
+                for dia, acertos, total in zip(janela['Dia'], janela[COL_QTD_CORRETA].fillna(0), janela[COL_TOTAL_CALCULADO].fillna(0))
+            ],
+            'acertos_ponderados': float(somas['Acertos Ponderados']),
+            'total_ponderado': float(somas['Total Ponderado']),
+            'dia_referencia': int(somas['Dia Referencia']),
+        })
+    return criar_estado_forma(registros)
+
+def combinar_registros_forma(registro_a: dict, registro_b: dict) -> dict:
+    """Une dois registros do mesmo atleta e categoria (custo fixo: janela de tamanho N)."""
+    dia_referencia = max(registro_a['dia_referencia'], registro_b['dia_referencia'])
+    fator_a = 0.5 ** ((dia_referencia - registro_a['dia_referencia']) / MEIA_VIDA_FORMA_DIAS)
+    fator_b = 0.5 ** ((dia_referencia - registro_b['dia_referencia']) / MEIA_VIDA_FORMA_DIAS)
+
+    # Sessões do mesmo dia (em blocos ou fontes diferentes) são somadas
+    sessoes_por_dia = {}
+    for dia, acertos, total in registro_a['janela'] + registro_b['janela']:
+        acertos_dia, total_dia = sessoes_por_dia.get(dia, (0, 0))
+        sessoes_por_dia[dia] = (acertos_dia + acertos, total_dia + total)
+    dias_recentes = sorted(sessoes_por_dia)[-SESSOES_JANELA_FORMA:]
+
+    return {
+        'atleta': registro_a['atleta'],
+        'categoria': registro_a['categoria'],
+        'janela': [[dia, *sessoes_por_dia[dia]] for dia in dias_recentes],
+        'acertos_ponderados': registro_a['acertos_ponderados'] * fator_a + registro_b['acertos_ponderados'] * fator_b,
+        'total_ponderado': registro_a['total_ponderado'] * fator_a + registro_b['total_ponderado'] * fator_b,
+        'dia_referencia': dia_referencia,
+    }
+
+def combinar_indicadores_forma(*estados_forma: dict) -> dict:
+    """
+    Combina estados de indicadores (gravado + linhas novas, ou de várias fontes).
+    
+    Args:
+        *estados_forma (dict): Estados serializados, com os parâmetros atuais.
+        
+    Returns:
+        dict: Estado combinado.
+    """
+    registros_por_chave = {}
+    for estado_forma in estados_forma:
+        for registro in estado_forma['registros']:
+            chave = (registro['atleta'], registro['categoria'])
+            registro_atual = registros_por_chave.get(chave)
+            registros_por_chave[chave] = registro if registro_atual is None else combinar_registros_forma(registro_atual, registro)
+    return criar_estado_forma(list(registros_por_chave.values()))
+
+def obter_indicadores_forma_snapshot(snapshot: SnapshotDados) -> dict:
+    """Estado gravado no snapshot; recalculado dos dados se ausente ou de outros parâmetros."""
+    if estado_forma_e_compativel(snapshot.indicadores_forma):
+        return snapshot.indicadores_forma
+    return calcular_indicadores_forma(snapshot.dados)
+
+def marcar_indicadores_forma(dados: pd.DataFrame, estado_forma: dict) -> pd.DataFrame:
+    """Registra em `dados.attrs` o estado dos indicadores de forma do dataset."""
+    dados.attrs[CHAVE_INDICADORES_FORMA] = estado_forma
+    return dados
+
+def obter_indicadores_forma(dados: pd.DataFrame) -> dict:
+    """Retorna o estado dos indicadores de forma registrado no dataset (vazio se ausente)."""
+    return dados.attrs.get(CHAVE_INDICADORES_FORMA) or criar_estado_forma([])
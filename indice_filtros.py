@@ -0,0 +1,132 @@
+# Índice de filtros da barra lateral
+#
+# Construído uma vez por versão do dataset: as linhas ficam ordenadas por data (o período
+# vira uma busca binária) e cada valor de dimensão tem seu mapa de posições (bitmap).
+# Filtrar passa a ser interseção de bitmaps, e as opções de cada widget, com o total de
+# ações, saem do próprio índice sem materializar DataFrames intermediários. Como o índice
+# é montado sobre o cubo, cada posição é uma célula que soma várias linhas: o total de
+# cada opção soma a quantidade de ações das células, e não o número de células.
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from dashboard_data import COL_DATA
+from instrumentacao import medir_etapa
+
+@dataclass
+class IndiceFiltros:
+    """Dataset ordenado por data com um bitmap de posições por valor de cada dimensão."""
+    dados: pd.DataFrame
+    datas: np.ndarray
+    bitmaps_por_dimensao: dict
+    # Quantidade somada por posição nas contagens (None: cada posição conta 1)
+    quantidades: np.ndarray | None = None
+
+def construir_bitmaps_dimensao(valores: pd.Series) -> dict:
+    """
+    Cria um bitmap (array booleano) por valor distinto da coluna, ignorando vazios.
+
+    Args:
+        valores (pd.Series): Coluna de dimensão já na ordem do índice.
+
+    Returns:
+        dict: {valor: np.ndarray[bool]} com os valores em ordem alfabética.
+    """
+    categorias = pd.Categorical(valores)
+    codigos = categorias.codes
+    return {
+        valor: codigos == codigo
+        for codigo, valor in sorted(enumerate(categorias.categories), key=lambda par: str(par[1]))
+    }
+
+@medir_etapa()
+def construir_indice_filtros(dados: pd.DataFrame, colunas_dimensao: list, coluna_quantidade: str | None = None) -> IndiceFiltros:
+    """
+    Ordena os dados por data e pré-calcula os bitmaps das dimensões filtráveis.
+    Linhas sem data válida ficam de fora, como já acontecia no filtro de período.
+
+    Args:
+        dados (pd.DataFrame): Dataset (ou cubo) completo.
+        colunas_dimensao (list): Colunas que terão filtros por valor.
+        coluna_quantidade (str | None): Medida somada nas contagens das opções (ex: o total
+            de ações de cada célula do cubo); sem ela, as opções contam posições.
+
+    Returns:
+        IndiceFiltros: Índice pronto para consultas.
+    """
+    dados_ordenados = dados[dados[COL_DATA].notna()].sort_values(COL_DATA, kind='stable').reset_index(drop=True)
+    bitmaps_por_dimensao = {
+        coluna: construir_bitmaps_dimensao(dados_ordenados[coluna])
+        for coluna in colunas_dimensao if coluna in dados_ordenados.columns
+    }
+    quantidades = None
+    if coluna_quantidade is not None:
+        quantidades = dados_ordenados[coluna_quantidade].fillna(0).to_numpy(dtype=np.int64)
+    return IndiceFiltros(
+        dados=dados_ordenados,
+        datas=dados_ordenados[COL_DATA].to_numpy(),
+        bitmaps_por_dimensao=bitmaps_por_dimensao,
+        quantidades=quantidades,
+    )
+
+class ConsultaFiltros:
+    """
+    Consulta incremental sobre um `IndiceFiltros`: cada restrição apenas atualiza a faixa
+    de datas ou a máscara de posições. Serve só às opções e contagens dos widgets; o recorte
+    dos dados em si é feito pelo `MotorConsultas` (SQL), a partir de `FiltrosConsulta`.
+    """
+
+    def __init__(self, indice: IndiceFiltros):
+        self.indice = indice
+        self.faixa = slice(0, len(indice.dados))
+        self.mascara = np.ones(len(indice.dados), dtype=bool)
+
+    def restringir_datas(self, data_inicio, data_fim):
+        """Limita a consulta ao período [data_inicio, data_fim] por busca binária."""
+        datas = self.indice.datas
+        posicao_inicio = np.searchsorted(datas, np.datetime64(pd.to_datetime(data_inicio)), side='left')
+        posicao_fim = np.searchsorted(datas, np.datetime64(pd.to_datetime(data_fim)), side='right')
+        self.faixa = slice(max(posicao_inicio, self.faixa.start), min(posicao_fim, self.faixa.stop))
+
+    def restringir(self, coluna: str, valores_selecionados: list):
+        """Mantém só as posições cujo valor da coluna está entre os selecionados (união de bitmaps)."""
+        bitmaps = self.indice.bitmaps_por_dimensao.get(coluna)
+        if bitmaps is None or not valores_selecionados:
+            return
+
+        mascara_valores = np.zeros(len(self.mascara), dtype=bool)
+        for valor in valores_selecionados:
+            if valor in bitmaps:
+                mascara_valores |= bitmaps[valor]
+        self.mascara &= mascara_valores
+
+    def contar_opcoes(self, coluna: str) -> dict:
+        """
+        Lista os valores da coluna ainda presentes na consulta, com a quantidade somada
+        (ver `construir_indice_filtros`).
+
+        Returns:
+            dict: {valor: quantidade}, em ordem alfabética, apenas valores com registros.
+        """
+        mascara_faixa = self.mascara[self.faixa]
+        quantidades_faixa = None if self.indice.quantidades is None else self.indice.quantidades[self.faixa]
+        contagens = {}
+        for valor, bitmap in self.indice.bitmaps_por_dimensao.get(coluna, {}).items():
+            selecionadas = bitmap[self.faixa] & mascara_faixa
+            if not selecionadas.any():
+                continue
+            if quantidades_faixa is None:
+                contagens[valor] = int(np.count_nonzero(selecionadas))
+            else:
+                contagens[valor] = int(np.dot(quantidades_faixa, selecionadas))
+        return contagens
+
+    def esta_vazia(self) -> bool:
+        """Indica se nenhum registro atende às restrições atuais."""
+        return not self.mascara[self.faixa].any()
+
+    def obter_limites_datas(self) -> tuple:
+        """Retorna (data mínima, data máxima) dos registros que atendem às restrições."""
+        posicoes = np.flatnonzero(self.mascara[self.faixa]) + self.faixa.start
+        return pd.Timestamp(self.indice.datas[posicoes[0]]), pd.Timestamp(self.indice.datas[posicoes[-1]])
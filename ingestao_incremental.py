@@ -0,0 +1,108 @@
+# Ingestão incremental (append-only) da planilha de treinos
+#
+# A planilha deveria só crescer: técnicos acrescentam linhas ao fim de cada sessão. Guardamos
+# uma marca d'água (quantas linhas brutas já foram processadas e a impressão digital de todas
+# elas) para processar somente as linhas novas. A fonte é lida inteira a cada passada (o
+# Google Sheets baixa a aba toda de qualquer forma) e o prefixo já ingerido é conferido:
+# se qualquer linha dele foi editada ou apagada, é preciso uma ressincronização completa.
+import hashlib
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Multiplicador que combina os hashes das colunas de uma linha (aritmética módulo 2**64)
+PRIMO_HASH_LINHAS = 1_000_003
+
+@dataclass
+class EstadoIngestao:
+    """Marca d'água da ingestão: linhas brutas já processadas e a impressão digital delas."""
+    linhas_ingeridas: int
+    hash_prefixo: str
+
+def calcular_hash_linhas(bloco_bruto: pd.DataFrame) -> np.ndarray:
+    """
+    Hash de 64 bits de cada linha crua que não depende do tipo inferido na leitura: números
+    entram como float (3 e 3.0 dão o mesmo hash), inclusive os escritos como texto numa
+    coluna lida como texto ('3' e 3), e vazios dão sempre o mesmo valor, mesmo numa coluna
+    toda vazia lida como float. Assim o mesmo conteúdo dá o mesmo hash lido inteiro, em
+    blocos (cada bloco do CSV infere os próprios tipos) ou com linhas novas no fim.
+    """
+    hash_linhas = np.zeros(len(bloco_bruto), dtype=np.uint64)
+    for coluna in bloco_bruto.columns:
+        valores = bloco_bruto[coluna]
+        if pd.api.types.is_numeric_dtype(valores) and not pd.api.types.is_bool_dtype(valores):
+            hash_coluna = calcular_hash_numeros(valores.astype('float64'))
+        else:
+            # Textos: hash só dos valores distintos, espalhado pelos códigos (vazio = código -1)
+            codigos, valores_distintos = pd.factorize(valores)
+            hash_distintos = np.append(calcular_hash_textos(np.asarray(valores_distintos, dtype=object)), np.uint64(0))
+            hash_coluna = hash_distintos[codigos]
+        hash_linhas = hash_linhas * np.uint64(PRIMO_HASH_LINHAS) + hash_coluna
+    return hash_linhas
+
+def calcular_hash_numeros(numeros: pd.Series) -> np.ndarray:
+    """Hash de cada número (float64); vazios dão 0."""
+    return np.where(numeros.isna().to_numpy(), np.uint64(0), pd.util.hash_pandas_object(numeros, index=False).to_numpy())
+
+def calcular_hash_textos(valores_distintos: np.ndarray) -> np.ndarray:
+    """Hash de cada valor distinto de uma coluna de texto; os que são números têm o hash do número."""
+    numeros = pd.to_numeric(pd.Series(valores_distintos, dtype=object), errors='coerce').astype('float64')
+    return np.where(numeros.notna().to_numpy(), calcular_hash_numeros(numeros), pd.util.hash_array(valores_distintos))
+
+def iniciar_hash_prefixo(colunas):
+    """Inicia o hash do prefixo pelas colunas; as linhas entram com `acumular_hash_prefixo`."""
+    hash_prefixo = hashlib.sha256()
+    hash_prefixo.update("|".join(str(nome).strip() for nome in colunas).encode())
+    return hash_prefixo
+
+def acumular_hash_prefixo(hash_prefixo, bloco_bruto: pd.DataFrame):
+    """Acrescenta um bloco de linhas (na ordem da fonte) ao hash do prefixo."""
+    hash_prefixo.update(calcular_hash_linhas(bloco_bruto).tobytes())
+
+def calcular_hash_prefixo(dados_brutos: pd.DataFrame) -> str:
+    """Impressão digital de todas as linhas de `dados_brutos`, na ordem."""
+    hash_prefixo = iniciar_hash_prefixo(dados_brutos.columns)
+    acumular_hash_prefixo(hash_prefixo, dados_brutos)
+    return hash_prefixo.hexdigest()
+
+def remover_linhas_vazias_finais(dados_brutos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Descarta as linhas totalmente vazias do fim da planilha, para que a marca d'água
+    aponte sempre para a última linha preenchida.
+    """
+    linhas_preenchidas = dados_brutos.notna().any(axis=1).to_numpy()
+    if not linhas_preenchidas.any():
+        return dados_brutos.iloc[:0]
+    posicao_ultima_preenchida = linhas_preenchidas.nonzero()[0][-1]
+    return dados_brutos.iloc[:posicao_ultima_preenchida + 1]
+
+def criar_estado_ingestao(dados_brutos: pd.DataFrame) -> EstadoIngestao:
+    """
+    Calcula a marca d'água após ingerir todas as linhas de `dados_brutos`.
+
+    Args:
+        dados_brutos (pd.DataFrame): Fonte inteira já ingerida (sem linhas vazias finais).
+
+    Returns:
+        EstadoIngestao: Marca d'água atualizada.
+    """
+    return EstadoIngestao(linhas_ingeridas=len(dados_brutos), hash_prefixo=calcular_hash_prefixo(dados_brutos))
+
+def historico_esta_intacto(estado: EstadoIngestao, dados_brutos: pd.DataFrame) -> bool:
+    """
+    Confere se as linhas já ingeridas continuam iguais na fonte (nenhuma editada, apagada
+    ou inserida no meio).
+
+    Args:
+        estado (EstadoIngestao): Marca d'água salva.
+        dados_brutos (pd.DataFrame): Fonte inteira, lida agora.
+
+    Returns:
+        bool: False se o histórico mudou (exige ressincronização completa).
+    """
+    if estado.linhas_ingeridas == 0:
+        return True
+    if len(dados_brutos) < estado.linhas_ingeridas:
+        return False
+    return calcular_hash_prefixo(dados_brutos.iloc[:estado.linhas_ingeridas]) == estado.hash_prefixo
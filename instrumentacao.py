@@ -0,0 +1,188 @@
+# Instrumentação leve de desempenho (etapas do pipeline e componentes visuais)
+#
+# Cada etapa decorada com `medir_etapa` registra tempo de parede, linhas de entrada/saída
+# e a memória: variação e valor final da memória residente do processo e tamanho do
+# DataFrame produzido. O pico de memória durante a etapa só é medido quando ativado (ver
+# `ativar_medicao_pico`): medi-lo zera o pico do processo inteiro, o que distorce as
+# medições de sessões e threads concorrentes. Os registros ficam disponíveis, por execução
+# do script, para o painel "Performance" da sidebar e vão para um log JSON estruturado
+# (nível NIVEL_LOG_DESEMPENHO; com o padrão WARNING, nada é impresso).
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+COMPONENTE_PIPELINE = 'pipeline'
+COMPONENTE_RENDERIZACAO = 'renderizacao'
+COMPONENTE_CACHE = 'cache'
+
+registro_log = logging.getLogger('desempenho')
+if not registro_log.handlers:
+    manipulador_log = logging.StreamHandler()
+    manipulador_log.setFormatter(logging.Formatter('%(message)s'))
+    registro_log.addHandler(manipulador_log)
+    registro_log.setLevel(os.environ.get('NIVEL_LOG_DESEMPENHO', 'WARNING'))
+    registro_log.propagate = False
+
+# O Streamlit executa cada sessão em sua própria thread: o estado da execução atual é por thread
+estado_execucao = threading.local()
+
+# Medição do pico por etapa, desligada por padrão (ver `ativar_medicao_pico`)
+MODO_MEDICAO_PICO = os.environ.get('MEDIR_PICO_MEMORIA', '') == '1'
+
+# Medições de pico em andamento (de todas as threads): o pico do processo é um só, então
+# antes de zerá-lo o valor atingido é repassado a todas as etapas abertas
+medicoes_pico_ativas = []
+trava_medicoes_pico = threading.Lock()
+
+def medir_memoria_processo_mb():
+    """Memória residente do processo em MB (None se a plataforma não expõe /proc)."""
+    try:
+        with open('/proc/self/statm') as arquivo_statm:
+            paginas_residentes = int(arquivo_statm.read().split()[1])
+        return paginas_residentes * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def ler_pico_memoria_processo_mb():
+    """Pico de memória residente do processo desde o último reinício (VmHWM), em MB."""
+    try:
+        with open('/proc/self/status') as arquivo_status:
+            for linha in arquivo_status:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+def reiniciar_pico_memoria_processo() -> bool:
+    """Faz o pico voltar à memória residente atual (Linux: '5' em /proc/self/clear_refs)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as arquivo_clear_refs:
+            arquivo_clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+def ativar_medicao_pico(ativa: bool = True):
+    """
+    Liga a medição do pico de memória em `medir_etapa`. Só é confiável com uma etapa
+    rodando por vez (ex: `tests/test_memoria_pipeline.py`): cada medição zera o pico do
+    processo inteiro, inclusive o de sessões e threads concorrentes.
+    """
+    global MODO_MEDICAO_PICO
+    MODO_MEDICAO_PICO = ativa
+
+def iniciar_medicao_pico() -> dict:
+    """
+    Abre a medição do pico de memória de uma etapa (sem efeito com a medição desligada).
+    Etapas aninhadas compartilham o pico do processo: cada uma vê o maior valor atingido
+    enquanto estava aberta.
+    """
+    medicao = {'pico_mb': None}
+    if not MODO_MEDICAO_PICO:
+        return medicao
+    with trava_medicoes_pico:
+        pico_atual = ler_pico_memoria_processo_mb()
+        for medicao_aberta in medicoes_pico_ativas:
+            medicao_aberta['pico_mb'] = max(medicao_aberta['pico_mb'] or 0, pico_atual or 0)
+        if reiniciar_pico_memoria_processo():
+            medicoes_pico_ativas.append(medicao)
+    return medicao
+
+def finalizar_medicao_pico(medicao: dict):
+    """Fecha a medição e devolve o pico de memória residente (MB) durante a etapa, ou None."""
+    with trava_medicoes_pico:
+        if medicao not in medicoes_pico_ativas:
+            return None
+        medicoes_pico_ativas.remove(medicao)
+        pico_atual = ler_pico_memoria_processo_mb()
+        if pico_atual is None:
+            return None
+        return round(max(medicao['pico_mb'] or 0, pico_atual), 2)
+
+def medir_memoria_dados_mb(objeto):
+    """Memória ocupada por um DataFrame (incluindo textos), em MB; None para outros objetos."""
+    if isinstance(objeto, pd.DataFrame):
+        return round(objeto.memory_usage(deep=True).sum() / 1024 ** 2, 2)
+    return None
+
+def contar_linhas(objeto):
+    """Número de linhas de um DataFrame (ou de um objeto com atributo `dados`); None caso contrário."""
+    if isinstance(objeto, pd.DataFrame):
+        return len(objeto)
+    if isinstance(getattr(objeto, 'dados', None), pd.DataFrame):
+        return len(objeto.dados)
+    return None
+
+def iniciar_execucao():
+    """Marca o início de uma execução do script: o painel passa a mostrar só os novos registros."""
+    estado_execucao.registros = []
+
+def obter_registros_execucao() -> list:
+    """Registros feitos na execução atual do script (thread atual)."""
+    return list(getattr(estado_execucao, 'registros', []))
+
+def capturar_execucao():
+    """Registros da execução atual, para repassar a threads auxiliares (ver `adotar_execucao`)."""
+    return getattr(estado_execucao, 'registros', None)
+
+def adotar_execucao(registros):
+    """Faz a thread atual registrar na execução capturada por `capturar_execucao`."""
+    if registros is not None:
+        estado_execucao.registros = registros
+
+def registrar_evento(evento: dict):
+    """Guarda o evento na execução atual e o emite como log JSON."""
+    evento = {'instante': round(time.time(), 3), **evento}
+    if hasattr(estado_execucao, 'registros'):
+        estado_execucao.registros.append(evento)
+    registro_log.info(json.dumps(evento, ensure_ascii=False, default=str))
+
+def medir_etapa(componente: str = COMPONENTE_PIPELINE):
+    """
+    Decorador que mede tempo, linhas de entrada/saída e memória da função.
+    As linhas de entrada vêm do primeiro argumento, quando ele é um DataFrame.
+    O pico ('pico_memoria_mb', None se a medição estiver desligada; ver `ativar_medicao_pico`)
+    e a memória ao final ('memoria_residente_mb') são do processo inteiro; 'memoria_saida_mb'
+    é o tamanho do DataFrame devolvido.
+
+    Args:
+        componente (str): Grupo da etapa (pipeline, renderizacao...).
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def funcao_medida(*args, **kwargs):
+            linhas_entrada = contar_linhas(args[0]) if args else None
+            memoria_antes_mb = medir_memoria_processo_mb()
+            medicao_pico = iniciar_medicao_pico()
+            inicio = time.perf_counter()
+            resultado = None
+            try:
+                resultado = funcao(*args, **kwargs)
+                return resultado
+            finally:
+                segundos = time.perf_counter() - inicio
+                pico_memoria_mb = finalizar_medicao_pico(medicao_pico)
+                memoria_depois_mb = medir_memoria_processo_mb()
+                delta_memoria_mb = (
+                    round(memoria_depois_mb - memoria_antes_mb, 2)
+                    if memoria_antes_mb is not None and memoria_depois_mb is not None else None
+                )
+                registrar_evento({
+                    'componente': componente,
+                    'etapa': funcao.__name__,
+                    'segundos': round(segundos, 6),
+                    'linhas_entrada': linhas_entrada,
+                    'linhas_saida': contar_linhas(resultado),
+                    'delta_memoria_mb': delta_memoria_mb,
+                    'pico_memoria_mb': pico_memoria_mb,
+                    'memoria_residente_mb': round(memoria_depois_mb, 2) if memoria_depois_mb is not None else None,
+                    'memoria_saida_mb': medir_memoria_dados_mb(resultado),
+                })
+        return funcao_medida
+    return decorador
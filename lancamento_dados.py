@@ -0,0 +1,396 @@
+# Lançamento de dados pelo app (caminho de escrita)
+#
+# Os técnicos digitavam as contagens direto na planilha e o dashboard só lia. Aqui o
+# formulário do app grava cada lançamento primeiro num buffer local (write-ahead log: um
+# JSON por linha, com fsync antes de confirmar na tela), então registrar não depende da
+# rede. Uma thread de fundo envia os pendentes à fonte em lotes e só os dá por enviados
+# depois que a escrita foi aceita; após uma falha, tenta de novo com espera exponencial.
+# Enquanto as linhas não são lidas da fonte, o atualizador as acrescenta ao dataset
+# servido (complemento; ver `atualizacao_dados`), então o dashboard mostra o lançamento na
+# hora, sem recarregar nada. Escrita e baixa no buffer nunca se cruzam com uma leitura da
+# fonte (ver `dashboard_data.travar_escritas_fonte`), então o instante da leitura, gravado
+# com o dataset, separa sem ambiguidade o que ele já contém do que falta. A entrega é "ao
+# menos uma vez": uma queda entre a escrita na fonte e a baixa no buffer reenvia o lote na
+# próxima partida.
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from atualizacao_dados import expirar_dados_fonte
+from cache_compartilhado import obter_caminho_trava, travar_arquivo
+from dashboard_data import (
+    incorporar_linhas_brutas, obter_instante_leitura_fonte, travar_escritas_fonte, NOMES_ABAS_PLANILHA,
+    COL_DATA, COL_LOCAL, COL_ATLETA, COL_TIPO, COL_FUNDAMENTOS, COL_QTD_CORRETA, COL_QTD_ERRADA, COL_QTD_TOTAL
+)
+from fontes_dados import obter_fontes_configuradas, criar_destino_dados
+from instrumentacao import registrar_evento, COMPONENTE_PIPELINE
+from snapshot_dados import CAMINHO_SNAPSHOT, obter_caminho_snapshot_fonte
+
+# Colunas gravadas na fonte, no layout da planilha
+COLUNAS_LANCAMENTO = [COL_DATA, COL_LOCAL, COL_ATLETA, COL_TIPO, COL_FUNDAMENTOS, COL_QTD_CORRETA, COL_QTD_ERRADA, COL_QTD_TOTAL]
+FORMATO_DATA_PLANILHA = '%d/%m/%Y'
+
+# Buffer local (um arquivo por fonte de destino, ao lado dos snapshots)
+CAMINHO_BUFFER_LANCAMENTOS = Path(os.environ.get(
+    'CAMINHO_BUFFER_LANCAMENTOS', CAMINHO_SNAPSHOT.with_name('lancamentos.jsonl')
+))
+
+# Envio em segundo plano: linhas por escrita na fonte e intervalo entre verificações do buffer
+TAMANHO_LOTE_LANCAMENTOS = int(os.environ.get('TAMANHO_LOTE_LANCAMENTOS', 200))
+INTERVALO_ENVIO_LANCAMENTOS_SEGUNDOS = float(os.environ.get('INTERVALO_ENVIO_LANCAMENTOS_SEGUNDOS', 10))
+# Espera após falhas consecutivas: dobra a cada tentativa, até o máximo
+ESPERA_INICIAL_REENVIO_SEGUNDOS = 5
+ESPERA_MAXIMA_REENVIO_SEGUNDOS = 300
+
+# Os enviados ficam no buffer ao menos por este tempo, e até uma leitura posterior ao envio
+# ser vista: um dataset lido antes do envio (ex: o de outra réplica) ainda precisa deles no
+# complemento (ver `BufferLancamentos.listar_fora_da_fonte`)
+RETENCAO_LANCAMENTOS_ENVIADOS_SEGUNDOS = 15 * 60
+
+registro_log = logging.getLogger(__name__)
+
+def criar_linhas_lancamento(data_treino: date, local: str, atleta: str, tipo, quantidades: pd.DataFrame) -> list:
+    """
+    Valida o formulário e monta uma linha da planilha por fundamento preenchido.
+
+    Args:
+        data_treino (date): Dia do treino.
+        local (str): Local do treino.
+        atleta (str): Atleta avaliada.
+        tipo (str | None): Tipo do treino (vazio usa o padrão da limpeza).
+        quantidades (pd.DataFrame): Colunas Fundamentos, Quantidade correta e Quantidade errada.
+
+    Returns:
+        list[dict]: Linhas com as colunas de `COLUNAS_LANCAMENTO`.
+
+    Raises:
+        ValueError: Se faltar atleta, local ou fundamento, ou se alguma quantidade for inválida.
+    """
+    atleta = (atleta or '').strip()
+    local = (local or '').strip()
+    if not atleta:
+        raise ValueError("Informe a atleta.")
+    if not local:
+        raise ValueError("Informe o local do treino.")
+
+    linhas = []
+    for fundamento, acertos, erros in quantidades[[COL_FUNDAMENTOS, COL_QTD_CORRETA, COL_QTD_ERRADA]].itertuples(index=False, name=None):
+        if pd.isna(fundamento) or not str(fundamento).strip():
+            continue
+        acertos = 0 if pd.isna(acertos) else int(acertos)
+        erros = 0 if pd.isna(erros) else int(erros)
+        if acertos < 0 or erros < 0:
+            raise ValueError(f"{fundamento}: as quantidades não podem ser negativas.")
+        if acertos + erros == 0:
+            raise ValueError(f"{fundamento}: informe ao menos uma ação certa ou errada.")
+        linhas.append({
+            COL_DATA: data_treino.strftime(FORMATO_DATA_PLANILHA),
+            COL_LOCAL: local,
+            COL_ATLETA: atleta,
+            COL_TIPO: tipo or None,
+            COL_FUNDAMENTOS: str(fundamento).strip(),
+            COL_QTD_CORRETA: acertos,
+            COL_QTD_ERRADA: erros,
+            COL_QTD_TOTAL: acertos + erros,
+        })
+    if not linhas:
+        raise ValueError("Preencha ao menos um fundamento.")
+    return linhas
+
+def montar_dados_brutos_lancamentos(registros: list) -> pd.DataFrame:
+    """Linhas dos registros do buffer como dados crus, na ordem em que foram lançadas."""
+    return pd.DataFrame.from_records([registro['linha'] for registro in registros], columns=COLUNAS_LANCAMENTO)
+
+class BufferLancamentos:
+    """
+    Write-ahead log dos lançamentos, seguro entre threads e entre réplicas do app (trava de
+    arquivo). Cada registro guarda a linha e o instante do envio à fonte (None enquanto
+    pendente); o arquivo é regravado (substituição atômica) só para marcar envios.
+    """
+
+    def __init__(self, caminho: Path = CAMINHO_BUFFER_LANCAMENTOS):
+        self.caminho = Path(caminho)
+        # A trava de arquivo não vale entre threads em sistemas sem fcntl
+        self.trava = threading.Lock()
+        # (estado do arquivo, pendentes) da última leitura ou escrita feita por este processo
+        self.contagem_pendentes = None
+
+    @contextmanager
+    def travar(self):
+        """Acesso exclusivo ao arquivo (leitura completa, acréscimo ou regravação)."""
+        caminho_trava = obter_caminho_trava(self.caminho)
+        caminho_trava.parent.mkdir(parents=True, exist_ok=True)
+        with self.trava, open(caminho_trava, 'a') as arquivo_trava:
+            travar_arquivo(arquivo_trava, bloquear=True)
+            yield
+
+    def ler_registros(self) -> list:
+        """Registros do arquivo (chamado com a trava). Uma linha truncada por queda é ignorada."""
+        try:
+            with open(self.caminho, encoding='utf-8') as arquivo:
+                textos = arquivo.readlines()
+        except FileNotFoundError:
+            return []
+
+        registros = []
+        for texto in textos:
+            try:
+                registros.append(json.loads(texto))
+            except json.JSONDecodeError:
+                # Gravação interrompida antes do fsync: o lançamento nunca foi confirmado na tela
+                registro_log.warning("Linha ilegível ignorada no buffer de lançamentos %s", self.caminho)
+        return registros
+
+    def registrar(self, linhas: list) -> list:
+        """
+        Grava as linhas no fim do buffer e só retorna depois do fsync.
+
+        Args:
+            linhas (list[dict]): Linhas no layout da planilha (ver `criar_linhas_lancamento`).
+
+        Returns:
+            list[dict]: Registros gravados.
+        """
+        registros = [
+            {'id': uuid.uuid4().hex, 'registrado_em': time.time(), 'enviado_em': None, 'linha': linha}
+            for linha in linhas
+        ]
+        texto = ''.join(json.dumps(registro, ensure_ascii=False) + '\n' for registro in registros).encode()
+        with self.travar():
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            estado_anterior = self.obter_estado_arquivo()
+            with open(self.caminho, 'a+b') as arquivo:
+                # Uma linha truncada no fim não pode emendar no primeiro registro novo
+                tamanho = arquivo.seek(0, os.SEEK_END)
+                if tamanho:
+                    arquivo.seek(tamanho - 1)
+                    if arquivo.read(1) != b'\n':
+                        texto = b'\n' + texto
+                arquivo.write(texto)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            contagem = self.contagem_pendentes
+            if contagem is not None and contagem[0] == estado_anterior:
+                self.guardar_contagem_pendentes(contagem[1] + len(registros))
+            else:
+                self.contagem_pendentes = None
+        return registros
+
+    def listar_pendentes(self) -> list:
+        """Registros ainda não enviados à fonte, na ordem de lançamento."""
+        with self.travar():
+            pendentes = [registro for registro in self.ler_registros() if registro['enviado_em'] is None]
+            self.guardar_contagem_pendentes(len(pendentes))
+            return pendentes
+
+    def contar_pendentes(self) -> int:
+        """Quantos registros estão pendentes; o arquivo só é relido se mudou desde a última contagem (ex: outra réplica)."""
+        contagem = self.contagem_pendentes
+        if contagem is not None and contagem[0] == self.obter_estado_arquivo():
+            return contagem[1]
+        return len(self.listar_pendentes())
+
+    def obter_estado_arquivo(self):
+        """Identifica o conteúdo atual do arquivo sem lê-lo (inode, tamanho e modificação), ou None se não existe."""
+        try:
+            estado = self.caminho.stat()
+        except FileNotFoundError:
+            return None
+        return estado.st_ino, estado.st_size, estado.st_mtime_ns
+
+    def guardar_contagem_pendentes(self, pendentes: int):
+        """Guarda a contagem junto com o estado do arquivo que ela descreve (chamado com a trava)."""
+        self.contagem_pendentes = (self.obter_estado_arquivo(), pendentes)
+
+    def listar_fora_da_fonte(self, instante_leitura: float | None) -> list:
+        """
+        Registros que uma leitura da fonte feita em `instante_leitura` não trouxe: os
+        pendentes e os enviados depois desse instante (todos, se o instante é desconhecido).
+        """
+        with self.travar():
+            return [
+                registro for registro in self.ler_registros()
+                if registro['enviado_em'] is None or instante_leitura is None or registro['enviado_em'] > instante_leitura
+            ]
+
+    def marcar_enviados(self, ids: set, instante_envio: float, instante_leitura_visto: float | None = None):
+        """
+        Marca os registros como enviados e descarta os enviados há mais tempo que a retenção
+        que uma leitura da fonte (a mais recente vista, `instante_leitura_visto`) já trouxe.
+        """
+        limite_retencao = instante_envio - RETENCAO_LANCAMENTOS_ENVIADOS_SEGUNDOS
+        limite_descarte = min(limite_retencao, instante_leitura_visto) if instante_leitura_visto is not None else None
+        with self.travar():
+            registros = []
+            for registro in self.ler_registros():
+                if registro['id'] in ids:
+                    registro['enviado_em'] = instante_envio
+                if registro['enviado_em'] is None or limite_descarte is None or registro['enviado_em'] >= limite_descarte:
+                    registros.append(registro)
+            self.regravar(registros)
+            self.guardar_contagem_pendentes(sum(registro['enviado_em'] is None for registro in registros))
+
+    def regravar(self, registros: list):
+        """Substitui o arquivo atomicamente (chamado com a trava)."""
+        caminho_temporario = self.caminho.with_suffix(f".{os.getpid()}.tmp")
+        with open(caminho_temporario, 'w', encoding='utf-8') as arquivo:
+            arquivo.writelines(json.dumps(registro, ensure_ascii=False) + '\n' for registro in registros)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(caminho_temporario, self.caminho)
+
+class ServicoLancamentos:
+    """
+    Registra lançamentos no buffer e os envia ao destino numa thread de fundo, em lotes de
+    até `tamanho_lote` linhas. Só uma réplica envia por vez (trava de arquivo); as demais
+    pulam a rodada. `ao_enviar`, se definido, é chamado após cada rodada com envios (ex:
+    pedir uma atualização dos dados, que passam a trazer as linhas da fonte).
+    """
+
+    def __init__(
+        self,
+        fonte_dados,
+        destino,
+        buffer: BufferLancamentos | None = None,
+        tamanho_lote: int = TAMANHO_LOTE_LANCAMENTOS,
+        intervalo_segundos: float = INTERVALO_ENVIO_LANCAMENTOS_SEGUNDOS
+    ):
+        self.fonte_dados = fonte_dados
+        self.destino = destino
+        self.buffer = buffer or BufferLancamentos(
+            obter_caminho_snapshot_fonte(fonte_dados.identificar(), CAMINHO_BUFFER_LANCAMENTOS)
+        )
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_segundos = intervalo_segundos
+        self.ao_enviar = None
+        self.falhas_consecutivas = 0
+        self.ultimo_erro = None
+        self.instante_ultimo_envio = None
+        # Leitura da fonte mais recente que um dataset complementado trouxe
+        self.instante_leitura_visto = None
+        self.trava = threading.Lock()
+        self.pedido_envio = threading.Event()
+        self.thread = None
+
+    def iniciar(self):
+        """Inicia a thread de envio (chamadas repetidas são ignoradas); pendentes de uma execução anterior vão primeiro."""
+        with self.trava:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self.executar_laco, name='envio_lancamentos', daemon=True)
+            self.thread.start()
+        self.pedido_envio.set()
+
+    def registrar(self, linhas: list) -> int:
+        """
+        Grava as linhas no buffer e pede o envio, sem esperar por ele.
+
+        Returns:
+            int: Linhas registradas.
+        """
+        registros = self.buffer.registrar(linhas)
+        self.pedido_envio.set()
+        return len(registros)
+
+    def contar_pendentes(self) -> int:
+        """Lançamentos que ainda não chegaram à fonte."""
+        return self.buffer.contar_pendentes()
+
+    def complementar_dados(self, dados: pd.DataFrame) -> pd.DataFrame:
+        """Complemento do atualizador: acrescenta ao dataset os lançamentos que a leitura da fonte não trouxe."""
+        instante_leitura = obter_instante_leitura_fonte(dados, self.fonte_dados.identificar())
+        if instante_leitura is not None:
+            with self.trava:
+                self.instante_leitura_visto = max(self.instante_leitura_visto or 0, instante_leitura)
+        registros = self.buffer.listar_fora_da_fonte(instante_leitura)
+        if not registros:
+            return dados
+        return incorporar_linhas_brutas(dados, montar_dados_brutos_lancamentos(registros), self.fonte_dados.identificar())
+
+    def calcular_espera(self) -> float:
+        """Intervalo até a próxima rodada: o normal, ou a espera exponencial após falhas."""
+        if self.falhas_consecutivas == 0:
+            return self.intervalo_segundos
+        return min(ESPERA_INICIAL_REENVIO_SEGUNDOS * 2 ** (self.falhas_consecutivas - 1), ESPERA_MAXIMA_REENVIO_SEGUNDOS)
+
+    def enviar_pendentes(self) -> int:
+        """
+        Envia os pendentes em lotes até esvaziar o buffer ou uma escrita falhar (o lote que
+        falhou continua pendente para a próxima rodada).
+
+        Returns:
+            int: Linhas enviadas nesta rodada.
+        """
+        enviados = 0
+        caminho_trava_envio = obter_caminho_trava(self.buffer.caminho.with_name(f"{self.buffer.caminho.name}.envio"))
+        caminho_trava_envio.parent.mkdir(parents=True, exist_ok=True)
+        with open(caminho_trava_envio, 'a') as arquivo_trava:
+            if not travar_arquivo(arquivo_trava, bloquear=False):
+                return 0
+            while lote := self.buffer.listar_pendentes()[:self.tamanho_lote]:
+                inicio = time.perf_counter()
+                # Nenhuma leitura da fonte vê o lote escrito e ainda pendente no buffer
+                with travar_escritas_fonte(self.fonte_dados, exclusiva=True):
+                    try:
+                        self.destino.anexar_linhas(montar_dados_brutos_lancamentos(lote))
+                    except Exception as erro:
+                        registro_log.warning("Envio de %d lançamento(s) para %s falhou: %s", len(lote), self.destino.descrever(), erro)
+                        with self.trava:
+                            self.falhas_consecutivas += 1
+                            self.ultimo_erro = erro
+                        self.registrar_envio('falha', inicio, len(lote))
+                        break
+
+                    expirar_dados_fonte(self.fonte_dados)
+                    self.buffer.marcar_enviados({registro['id'] for registro in lote}, time.time(), self.instante_leitura_visto)
+                with self.trava:
+                    self.falhas_consecutivas = 0
+                    self.ultimo_erro = None
+                    self.instante_ultimo_envio = time.time()
+                enviados += len(lote)
+                self.registrar_envio('sucesso', inicio, len(lote))
+
+        if enviados and self.ao_enviar is not None:
+            self.ao_enviar()
+        return enviados
+
+    def executar_laco(self):
+        """Corpo da thread: envia a cada intervalo (ou espera de reenvio) ou assim que há um lançamento novo."""
+        while True:
+            self.pedido_envio.wait(timeout=self.calcular_espera())
+            self.pedido_envio.clear()
+            try:
+                self.enviar_pendentes()
+            except Exception as erro:
+                # Falha fora da escrita (ex: disco do buffer): os pendentes seguem no arquivo
+                registro_log.warning("Rodada de envio de lançamentos interrompida: %s", erro)
+
+    def registrar_envio(self, resultado: str, inicio: float, linhas: int):
+        registrar_evento({
+            'componente': COMPONENTE_PIPELINE,
+            'etapa': 'envio_lancamentos',
+            'segundos': round(time.perf_counter() - inicio, 6),
+            'linhas_saida': linhas,
+            'resultado': resultado,
+        })
+
+def criar_servico_lancamentos() -> ServicoLancamentos | None:
+    """
+    Serviço de lançamentos para a primeira fonte configurada.
+
+    Returns:
+        ServicoLancamentos | None: None se a fonte não aceita escrita (XLSX, Parquet, Arrow).
+    """
+    fonte_dados = obter_fontes_configuradas(NOMES_ABAS_PLANILHA)[0]
+    destino = criar_destino_dados(fonte_dados)
+    if destino is None:
+        return None
+    return ServicoLancamentos(fonte_dados, destino)
@@ -0,0 +1,235 @@
+# Preparação de dados dos componentes visuais (sem chamadas ao Streamlit)
+#
+# As funções `preparar_*` recebem o motor de consultas SQL e os filtros da sidebar: o
+# recorte e a agregação rodam no DuckDB, e cada uma devolve exatamente o que o
+# renderizador correspondente exibe. As demais trabalham sobre as tabelas pequenas de
+# agregados por período. Mantê-las separadas das chamadas `st.*` permite medi-las no
+# benchmark e reutilizá-las fora do app.
+import numpy as np
+import pandas as pd
+
+from cubo_agregado import agregar_cubo
+from estatistica_comparacao import adicionar_intervalos_wilson, testar_diferenca_bootstrap
+from dashboard_data import (
+    mapear_taxonomia,
+    COL_ATLETA, COL_CATEGORIA, COL_FUNDAMENTOS, COL_QTD_CORRETA, COL_TOTAL_CALCULADO,
+    COL_CHAVE_DIA, COL_DATA, COL_EFICIENCIA, COL_SUBTIPO, COL_VARIACAO_ATAQUE, TEXTO_LEVANTAMENTO,
+    ROTULO_ACERTO_LEVANTAMENTO
+)
+
+# Ordem de apresentação das categorias nos cards
+MAPA_PRIORIDADE_CATEGORIAS = {'Saque': 1, 'Recepção': 2, 'Levantamento': 3, 'Ataque': 4}
+
+# Pontos enviados ao navegador por categoria na série diária (independe do tamanho do histórico)
+LIMITE_PONTOS_SERIE_DIARIA = 300
+
+def preparar_kpis_globais(motor_consultas, filtros=None) -> dict:
+    """
+    Calcula as métricas de topo do dashboard individual.
+
+    Returns:
+        dict: percentual_eficiencia, total_tentativas, total_acertos e total_sessoes.
+    """
+    totais = motor_consultas.resumir_totais(filtros)
+    total_tentativas = totais['tentativas']
+    total_acertos = totais['acertos']
+
+    # Previne divisão por zero
+    percentual_eficiencia = (total_acertos / total_tentativas * 100) if total_tentativas > 0 else 0
+    return {
+        'percentual_eficiencia': percentual_eficiencia,
+        'total_tentativas': total_tentativas,
+        'total_acertos': total_acertos,
+        'total_sessoes': totais['sessoes'],
+    }
+
+def preparar_metricas_por_categoria(motor_consultas, filtros=None) -> pd.DataFrame:
+    """Agrega acertos, total e eficiência por categoria, na ordem de apresentação dos cards."""
+    metricas_agrupadas = motor_consultas.agregar([COL_CATEGORIA], filtros)
+    metricas_agrupadas['Prioridade'] = metricas_agrupadas[COL_CATEGORIA].map(MAPA_PRIORIDADE_CATEGORIAS).astype(float).fillna(99)
+    return metricas_agrupadas.sort_values('Prioridade')
+
+def preparar_forma_por_categoria(indicadores_forma: dict, atleta) -> dict:
+    """
+    Lê, do estado dos indicadores de forma, a forma atual de um atleta em cada categoria.
+
+    Args:
+        indicadores_forma (dict): Estado serializado (ver `calcular_indicadores_forma`).
+        atleta: Atleta do dashboard individual.
+
+    Returns:
+        dict: {categoria: {'eficiencia_janela', 'sessoes_janela', 'eficiencia_ewma'}}.
+    """
+    forma_por_categoria = {}
+    for registro in indicadores_forma.get('registros', []):
+        if registro['atleta'] != str(atleta):
+            continue
+        acertos_janela = sum(acertos for _, acertos, _ in registro['janela'])
+        total_janela = sum(total for _, _, total in registro['janela'])
+        forma_por_categoria[registro['categoria']] = {
+            'eficiencia_janela': acertos_janela / total_janela if total_janela else 0.0,
+            'sessoes_janela': len(registro['janela']),
+            'eficiencia_ewma': registro['acertos_ponderados'] / registro['total_ponderado'] if registro['total_ponderado'] else 0.0,
+        }
+    return forma_por_categoria
+
+def preparar_resumo_ataque(motor_consultas, filtros=None) -> pd.DataFrame:
+    """Agrega volume e eficiência por variação de ataque (vazio se não houver ataques)."""
+    variacoes_ataque = motor_consultas.selecionar_fundamentos(COL_VARIACAO_ATAQUE)
+    return motor_consultas.agregar([COL_FUNDAMENTOS], filtros, fundamentos=variacoes_ataque)
+
+def preparar_resumo_levantamento(motor_consultas, filtros=None) -> pd.DataFrame:
+    """
+    Soma o volume de levantamentos por tipo detalhado (acerto ou causa do erro).
+
+    Returns:
+        pd.DataFrame: Colunas 'Tipo Detalhado' e 'Total Calculado' (vazio sem levantamentos).
+    """
+    levantamentos = motor_consultas.selecionar_fundamentos(COL_CATEGORIA, TEXTO_LEVANTAMENTO)
+    resumo_fundamentos = motor_consultas.agregar([COL_FUNDAMENTOS], filtros, fundamentos=levantamentos)
+    # O rótulo (acerto ou causa do erro) vem da taxonomia, pelos códigos dos fundamentos
+    resumo_fundamentos['Tipo Detalhado'] = mapear_taxonomia(resumo_fundamentos[COL_FUNDAMENTOS], COL_SUBTIPO, motor_consultas.taxonomia)
+    return resumo_fundamentos.groupby('Tipo Detalhado')[COL_TOTAL_CALCULADO].sum().reset_index()
+
+def preparar_insight_levantamento(resumo_levantamento: pd.DataFrame) -> dict | None:
+    """
+    Identifica o principal erro de levantamento e a orientação de treino correspondente.
+
+    Args:
+        resumo_levantamento (pd.DataFrame): Saída de `preparar_resumo_levantamento`.
+
+    Returns:
+        dict | None: tipo_erro, quantidade, percentual_erros (participação entre os erros)
+        e alerta ((natureza, texto) ou None). None se não houver erros registrados.
+    """
+    # Filtra apenas os erros para dar o insight do vilão
+    apenas_erros = resumo_levantamento[resumo_levantamento['Tipo Detalhado'] != ROTULO_ACERTO_LEVANTAMENTO]
+    if apenas_erros.empty:
+        return None
+
+    maior_erro = apenas_erros.loc[apenas_erros[COL_TOTAL_CALCULADO].idxmax()]
+    quantidade_erro = maior_erro[COL_TOTAL_CALCULADO]
+    tipo_erro = maior_erro['Tipo Detalhado']
+
+    tipo_erro_lower = tipo_erro.lower()
+    alerta = None
+    if "dois toque" in tipo_erro_lower or "condução" in tipo_erro_lower:
+        alerta = ('Técnica', "Cuidado com o contato na bola. Treine o 'toque' isolado.")
+    elif "bola não permite" in tipo_erro_lower:
+        alerta = ('Tática', "Melhore o deslocamento para chegar equilibrado.")
+
+    return {
+        'tipo_erro': tipo_erro,
+        'quantidade': int(quantidade_erro),
+        'percentual_erros': quantidade_erro / apenas_erros[COL_TOTAL_CALCULADO].sum() * 100,
+        'alerta': alerta,
+    }
+
+def construir_agregados_periodo(motor_consultas, coluna_chave_periodo: str, detalhar_fundamentos: bool = False) -> pd.DataFrame:
+    """Tabela Atleta × Período × Categoria (opcionalmente × Fundamentos) usada na comparação."""
+    dimensoes = [COL_ATLETA, coluna_chave_periodo, COL_CATEGORIA]
+    if detalhar_fundamentos:
+        dimensoes.append(COL_FUNDAMENTOS)
+    # Intervalos de Wilson de todos os grupos numa única passada vetorizada
+    return adicionar_intervalos_wilson(motor_consultas.agregar(dimensoes))
+
+def filtrar_agregado_periodo(agregados: pd.DataFrame, atleta, coluna_chave_periodo=None, chave_periodo=None) -> pd.DataFrame:
+    """Seleciona, na tabela de agregados por período, as linhas de um atleta (e período)."""
+    mascara = agregados[COL_ATLETA] == atleta
+    if coluna_chave_periodo is not None:
+        mascara &= agregados[coluna_chave_periodo] == chave_periodo
+    return agregados[mascara]
+
+def preparar_dados_grafico_categoria(dados: pd.DataFrame, rotulo_serie: str) -> pd.DataFrame:
+    """Eficiência por categoria (com IC de Wilson) rotulada com o atleta/período, para os gráficos de barras."""
+    agrupado = adicionar_intervalos_wilson(agregar_cubo(dados, [COL_CATEGORIA]))
+    agrupado[COL_ATLETA] = rotulo_serie
+    return agrupado
+
+def comparar_por_categoria(dados_a: pd.DataFrame, dados_b: pd.DataFrame) -> pd.DataFrame:
+    """
+    Testa a diferença de eficiência B − A em cada categoria, todas no mesmo bootstrap.
+
+    Returns:
+        pd.DataFrame: Categoria e as colunas de `testar_diferenca_bootstrap`.
+    """
+    medidas = [COL_CATEGORIA, COL_QTD_CORRETA, COL_TOTAL_CALCULADO]
+    por_categoria = pd.merge(
+        agregar_cubo(dados_a, [COL_CATEGORIA])[medidas], agregar_cubo(dados_b, [COL_CATEGORIA])[medidas],
+        on=COL_CATEGORIA, how='outer', suffixes=(' A', ' B')
+    )
+    if por_categoria.empty:
+        return por_categoria
+
+    contagens = por_categoria.drop(columns=COL_CATEGORIA).fillna(0)
+    teste = testar_diferenca_bootstrap(
+        contagens[f'{COL_QTD_CORRETA} A'], contagens[f'{COL_TOTAL_CALCULADO} A'],
+        contagens[f'{COL_QTD_CORRETA} B'], contagens[f'{COL_TOTAL_CALCULADO} B']
+    )
+    return pd.concat([por_categoria[[COL_CATEGORIA]].reset_index(drop=True), teste], axis=1)
+
+def selecionar_pontos_lttb(eixo_x: np.ndarray, eixo_y: np.ndarray, limite_pontos: int) -> np.ndarray:
+    """
+    Escolhe os pontos de uma série pelo Largest-Triangle-Three-Buckets: o primeiro e o último
+    são mantidos e, em cada balde intermediário, fica o ponto que forma o maior triângulo com
+    o ponto escolhido antes e a média do balde seguinte (preserva picos e vales).
+
+    Args:
+        eixo_x (np.ndarray): Valores numéricos crescentes do eixo X.
+        eixo_y (np.ndarray): Valores do eixo Y.
+        limite_pontos (int): Quantidade máxima de pontos devolvidos.
+
+    Returns:
+        np.ndarray: Posições dos pontos mantidos, em ordem (todas, se já couberem no limite).
+    """
+    quantidade = len(eixo_x)
+    if limite_pontos >= quantidade or limite_pontos < 3:
+        return np.arange(quantidade)
+
+    # limite_pontos - 2 baldes entre o primeiro e o último ponto
+    bordas_baldes = np.linspace(1, quantidade - 1, limite_pontos - 1).astype(np.int64)
+    posicoes = np.empty(limite_pontos, dtype=np.int64)
+    posicoes[0], posicoes[-1] = 0, quantidade - 1
+
+    escolhido = 0
+    for numero_balde in range(limite_pontos - 2):
+        inicio, fim = bordas_baldes[numero_balde], bordas_baldes[numero_balde + 1]
+        fim_seguinte = bordas_baldes[numero_balde + 2] if numero_balde + 2 < len(bordas_baldes) else quantidade
+        media_x = eixo_x[fim:fim_seguinte].mean()
+        media_y = eixo_y[fim:fim_seguinte].mean()
+
+        # Dobro da área do triângulo (escolhido, candidato, média do próximo balde)
+        areas = np.abs(
+            (eixo_x[escolhido] - media_x) * (eixo_y[inicio:fim] - eixo_y[escolhido])
+            - (eixo_x[escolhido] - eixo_x[inicio:fim]) * (media_y - eixo_y[escolhido])
+        )
+        escolhido = inicio + int(np.argmax(areas))
+        posicoes[numero_balde + 1] = escolhido
+    return posicoes
+
+def preparar_serie_eficiencia_diaria(agregados_diarios: pd.DataFrame, atleta, limite_pontos: int = LIMITE_PONTOS_SERIE_DIARIA) -> pd.DataFrame:
+    """
+    Eficiência diária de um atleta por categoria, reduzida por LTTB a no máximo
+    `limite_pontos` dias por categoria.
+
+    Args:
+        agregados_diarios (pd.DataFrame): Tabela Atleta × Dia × Categoria (× Fundamentos).
+        atleta: Atleta da série.
+        limite_pontos (int): Pontos mantidos por categoria.
+
+    Returns:
+        pd.DataFrame: Data, Categoria, medidas e Eficiencia, ordenado por categoria e data.
+    """
+    dados_atleta = filtrar_agregado_periodo(agregados_diarios, atleta)
+    serie = agregar_cubo(dados_atleta[dados_atleta[COL_CHAVE_DIA].notna()], [COL_CATEGORIA, COL_CHAVE_DIA])
+    if serie.empty:
+        return serie
+
+    serie[COL_DATA] = pd.to_datetime(serie[COL_CHAVE_DIA].astype('int64').astype(str), format='%Y%m%d')
+    partes = []
+    for _, serie_categoria in serie.groupby(COL_CATEGORIA, observed=True, sort=False):
+        serie_categoria = serie_categoria.sort_values(COL_CHAVE_DIA)
+        dias = serie_categoria[COL_DATA].to_numpy().astype('datetime64[D]').astype(np.float64)
+        posicoes = selecionar_pontos_lttb(dias, serie_categoria[COL_EFICIENCIA].to_numpy(dtype=np.float64), limite_pontos)
+        partes.append(serie_categoria.iloc[posicoes])
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,102 @@
+# Motor de regras de negócio (tabela declarativa)
+#
+# A tabela `REGRAS_NEGOCIO_VOLEI` (configuracoes.py) ou um JSON no mesmo formato é validada
+# e compilada uma vez na importação. Cada valor distinto de fundamento recebe a ação da
+# primeira regra que casar (nome exato ou expressão regular); a aplicação às linhas fica em
+# `dashboard_data.aplicar_regras_negocio_volei`.
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from configuracoes import REGRAS_NEGOCIO_VOLEI
+
+ACAO_NENHUMA = 0
+ACAO_FORCAR_ACERTO = 1
+ACAO_FORCAR_ERRO = 2
+ACAO_REMOVER_TOTALIZADOR = 3
+CODIGOS_ACAO_REGRA = {
+    'forcar_acerto': ACAO_FORCAR_ACERTO,
+    'forcar_erro': ACAO_FORCAR_ERRO,
+    'remover_totalizador': ACAO_REMOVER_TOTALIZADOR,
+}
+
+# JSON opcional com a tabela de regras (no formato de `REGRAS_NEGOCIO_VOLEI`, em configuracoes.py)
+CAMINHO_REGRAS_NEGOCIO = os.environ.get('CAMINHO_REGRAS_NEGOCIO')
+
+@dataclass(frozen=True)
+class RegraNegocio:
+    """Regra compilada: casa fundamentos por nome exato ou expressão regular."""
+    fundamentos: frozenset
+    padrao: re.Pattern | None
+    codigo_acao: int
+
+    def casa(self, fundamento: str) -> bool:
+        return fundamento in self.fundamentos or (self.padrao is not None and self.padrao.search(fundamento) is not None)
+
+def compilar_regras_negocio(tabela_regras: list) -> tuple:
+    """
+    Valida a tabela declarativa de regras e pré-compila os padrões.
+    
+    Args:
+        tabela_regras (list[dict]): Regras com 'fundamento' (texto ou lista) e/ou
+            'padrao' (expressão regular), e 'acao'.
+        
+    Returns:
+        tuple[RegraNegocio, ...]: Regras compiladas, na ordem de prioridade.
+        
+    Raises:
+        ValueError: Se uma regra tiver ação desconhecida ou nenhum critério.
+    """
+    regras = []
+    for regra in tabela_regras:
+        if regra.get('acao') not in CODIGOS_ACAO_REGRA:
+            raise ValueError(f"Ação de regra desconhecida: {regra.get('acao')!r}.")
+        fundamentos = regra.get('fundamento', [])
+        if isinstance(fundamentos, str):
+            fundamentos = [fundamentos]
+        if not fundamentos and not regra.get('padrao'):
+            raise ValueError(f"Regra sem 'fundamento' nem 'padrao': {regra!r}.")
+        regras.append(RegraNegocio(
+            fundamentos=frozenset(fundamentos),
+            padrao=re.compile(regra['padrao']) if regra.get('padrao') else None,
+            codigo_acao=CODIGOS_ACAO_REGRA[regra['acao']],
+        ))
+    return tuple(regras)
+
+def carregar_regras_negocio(caminho_regras: str | None = CAMINHO_REGRAS_NEGOCIO) -> tuple:
+    """Compila a tabela do arquivo JSON indicado ou, sem ele, a de `configuracoes.py`."""
+    if caminho_regras:
+        with open(caminho_regras, encoding='utf-8') as arquivo_regras:
+            return compilar_regras_negocio(json.load(arquivo_regras))
+    return compilar_regras_negocio(REGRAS_NEGOCIO_VOLEI)
+
+REGRAS_NEGOCIO = carregar_regras_negocio()
+
+def calcular_assinatura_regras(regras: tuple) -> str:
+    """Hash curto da tabela compilada, para distinguir dados processados com regras diferentes."""
+    # Fundamentos ordenados: a ordem de um frozenset muda de um processo para outro
+    descricao = [(sorted(regra.fundamentos), regra.padrao and regra.padrao.pattern, regra.codigo_acao) for regra in regras]
+    return hashlib.sha256(repr(descricao).encode()).hexdigest()[:12]
+
+def resolver_acoes_fundamentos(valores_fundamento, regras: tuple) -> np.ndarray:
+    """
+    Decide a ação de cada valor distinto de fundamento (a primeira regra que casar vence).
+    
+    Args:
+        valores_fundamento: Valores distintos (ex: categorias da coluna).
+        regras (tuple[RegraNegocio, ...]): Regras compiladas.
+        
+    Returns:
+        np.ndarray: Código de ação por valor, na mesma ordem.
+    """
+    acoes = np.full(len(valores_fundamento), ACAO_NENHUMA, dtype=np.int8)
+    for posicao, valor in enumerate(valores_fundamento):
+        for regra in regras:
+            if regra.casa(str(valor)):
+                acoes[posicao] = regra.codigo_acao
+                break
+    return acoes
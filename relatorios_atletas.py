@@ -0,0 +1,373 @@
+# Relatórios individuais em HTML estático, gerados sem o Streamlit
+#
+# Gera um relatório por atleta e período (semana ISO, mês ou histórico completo) com os
+# mesmos números e gráficos do dashboard individual: KPIs, cards por categoria, raio-X do
+# levantamento e quadrante de ataque. A preparação dos dados é a dos componentes do app
+# (`preparacao_visualizacoes` e `construcao_graficos`); aqui só muda a saída.
+#
+# O dataset é carregado uma vez (mesmas fontes e pipeline do app) e o cubo de agregação é
+# gravado num arquivo Arrow temporário que os processos do pool mapeiam em memória sem
+# cópia (ver `cache_compartilhado`). Cada processo monta o próprio motor de consultas uma
+# vez e gera os relatórios que receber, então o lote escala com os núcleos disponíveis.
+#
+# Uso:
+#   python relatorios_atletas.py                                   (última semana, todos os atletas)
+#   python relatorios_atletas.py --periodo mes --ultimos 3
+#   python relatorios_atletas.py --periodo tudo --processos 4 --saida relatorios/
+import argparse
+import html
+import os
+import re
+import tempfile
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from atualizacao_dados import carregar_dados
+from cache_compartilhado import ler_dataset_compartilhado, gravar_dataset_compartilhado
+from cubo_agregado import construir_cubo_agregado
+from dashboard_data import (
+    obter_versao_dados, formatar_chave_mes, MotorConsultas, FiltrosConsulta,
+    COL_ATLETA, COL_CATEGORIA, COL_EFICIENCIA, COL_CHAVE_SEMANA, COL_CHAVE_MES
+)
+from indicadores_forma import obter_indicadores_forma, CHAVE_INDICADORES_FORMA
+from preparacao_visualizacoes import (
+    preparar_kpis_globais, preparar_metricas_por_categoria, preparar_forma_por_categoria,
+    preparar_insight_levantamento
+)
+from construcao_graficos import (
+    obter_cor_por_eficiencia, obter_texto_status, construir_grafico_quadrante_ataque,
+    construir_grafico_levantamento
+)
+from configuracoes import CRITERIOS_AVALIACAO
+
+PASTA_RELATORIOS_PADRAO = Path('relatorios')
+PERIODO_SEMANA, PERIODO_MES, PERIODO_TUDO = 'semana', 'mes', 'tudo'
+COLUNA_CHAVE_POR_PERIODO = {PERIODO_SEMANA: COL_CHAVE_SEMANA, PERIODO_MES: COL_CHAVE_MES}
+CHAVE_HISTORICO_COMPLETO = 0
+
+# plotly.js gravado uma vez na pasta de saída: os relatórios abrem sem internet
+NOME_ARQUIVO_PLOTLYJS = 'plotly.min.js'
+PLOTLYJS_ARQUIVO, PLOTLYJS_CDN = 'arquivo', 'cdn'
+
+# Um motor DuckDB por processo do pool, montado na inicialização do processo
+_motor_processo = None
+_indicadores_forma_processo = None
+
+@dataclass(frozen=True)
+class TarefaRelatorio:
+    """Um relatório do lote: atleta, período (chave AAAASS/AAAAMM, ou 0 para o histórico) e arquivo de saída."""
+    atleta: str
+    periodo: str
+    chave_periodo: int
+    caminho_saida: Path
+    referencia_plotlyjs: str
+
+def calcular_intervalo_periodo(periodo: str, chave_periodo: int) -> tuple:
+    """
+    Datas inicial e final (inclusivas) de uma chave de período.
+
+    Returns:
+        tuple: (data_inicio, data_fim), ou (None, None) para o histórico completo.
+    """
+    if periodo == PERIODO_SEMANA:
+        inicio = date.fromisocalendar(chave_periodo // 100, chave_periodo % 100, 1)
+        return inicio, inicio + timedelta(days=6)
+    if periodo == PERIODO_MES:
+        inicio = date(chave_periodo // 100, chave_periodo % 100, 1)
+        return inicio, (pd.Timestamp(inicio) + pd.offsets.MonthEnd(0)).date()
+    return None, None
+
+def formatar_periodo(periodo: str, chave_periodo: int) -> str:
+    """Título do período exibido no relatório e no índice."""
+    if periodo == PERIODO_SEMANA:
+        inicio, fim = calcular_intervalo_periodo(periodo, chave_periodo)
+        return f"Semana {chave_periodo % 100:02d}/{chave_periodo // 100} ({inicio:%d/%m} a {fim:%d/%m})"
+    if periodo == PERIODO_MES:
+        return formatar_chave_mes(chave_periodo)
+    return "Histórico completo"
+
+def normalizar_nome_arquivo(texto: str) -> str:
+    """Nome de arquivo seguro (sem acentos, espaços ou barras) para o atleta ou período."""
+    sem_acentos = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^A-Za-z0-9]+', '_', sem_acentos).strip('_') or 'sem_nome'
+
+def listar_tarefas(cubo: pd.DataFrame, periodo: str, ultimos: int, pasta_saida: Path, modo_plotlyjs: str, atletas: list | None = None) -> list:
+    """
+    Monta o lote: cada atleta com ações em cada um dos últimos períodos do dataset.
+
+    Args:
+        cubo (pd.DataFrame): Cubo de agregação do dataset.
+        periodo (str): 'semana', 'mes' ou 'tudo'.
+        ultimos (int): Quantidade de períodos mais recentes.
+        pasta_saida (Path): Pasta raiz dos relatórios.
+        modo_plotlyjs (str): 'arquivo' (plotly.js local) ou 'cdn'.
+        atletas (list | None): Restringe o lote a estes atletas (os períodos continuam os do dataset).
+    """
+    if periodo == PERIODO_TUDO:
+        pares = pd.DataFrame({COL_ATLETA: cubo[COL_ATLETA].dropna().unique(), 'chave': CHAVE_HISTORICO_COMPLETO})
+    else:
+        pares = cubo[[COL_ATLETA, COLUNA_CHAVE_POR_PERIODO[periodo]]].dropna().drop_duplicates()
+        pares.columns = [COL_ATLETA, 'chave']
+        chaves_recentes = sorted(pares['chave'].unique())[-ultimos:]
+        pares = pares[pares['chave'].isin(chaves_recentes)]
+    if atletas:
+        pares = pares[pares[COL_ATLETA].astype(str).isin(atletas)]
+
+    # Relatórios da pasta do período referenciam o plotly.js da raiz
+    referencia_plotlyjs = f"../{NOME_ARQUIVO_PLOTLYJS}" if modo_plotlyjs == PLOTLYJS_ARQUIVO else PLOTLYJS_CDN
+    tarefas = []
+    for atleta, chave_periodo in sorted(pares.itertuples(index=False, name=None), key=lambda par: (par[1], str(par[0]))):
+        chave_periodo = int(chave_periodo)
+        pasta_periodo = pasta_saida / (f"{periodo}_{chave_periodo}" if periodo != PERIODO_TUDO else periodo)
+        tarefas.append(TarefaRelatorio(
+            str(atleta), periodo, chave_periodo,
+            pasta_periodo / f"{normalizar_nome_arquivo(atleta)}.html", referencia_plotlyjs
+        ))
+    return tarefas
+
+def iniciar_processo(caminho_cubo: Path, assinatura: str):
+    """
+    Inicializador de cada processo do pool: mapeia o cubo publicado pelo processo principal
+    e monta o motor de consultas uma vez.
+    """
+    global _motor_processo, _indicadores_forma_processo
+    cubo = ler_dataset_compartilhado(caminho_cubo, assinatura)
+    if cubo is None:
+        raise RuntimeError(f"Cubo do lote de relatórios não encontrado em {caminho_cubo}")
+    _motor_processo = MotorConsultas(cubo)
+    # Um processo por núcleo: cada motor usa uma thread para não disputar os mesmos núcleos
+    _motor_processo.conexao.execute("SET threads TO 1")
+    _indicadores_forma_processo = obter_indicadores_forma(cubo)
+
+def renderizar_figura_html(figura, identificador: str) -> str:
+    """
+    Fragmento HTML da figura; o plotly.js é carregado uma vez no cabeçalho da página.
+    O identificador fixo do elemento deixa o arquivo igual entre execuções com os mesmos dados.
+    """
+    return figura.to_html(full_html=False, include_plotlyjs=False, div_id=identificador, config={'displaylogo': False})
+
+def montar_secao_kpis(kpis: dict) -> str:
+    itens = [
+        ("Eficiência Geral", f"{kpis['percentual_eficiencia']:.1f}%"),
+        ("Total de Ações", kpis['total_tentativas']),
+        ("Acertos Totais", kpis['total_acertos']),
+        ("Sessões de Treino", kpis['total_sessoes']),
+    ]
+    return "<div class='grade'>" + "".join(
+        f"<div class='cartao'><div class='rotulo'>{rotulo}</div><div class='valor'>{valor}</div></div>"
+        for rotulo, valor in itens
+    ) + "</div>"
+
+def montar_secao_categorias(metricas: pd.DataFrame, forma_por_categoria: dict) -> str:
+    """Cards por categoria, como em `renderizar_metricas_por_categoria`."""
+    cartoes = []
+    for _, linha in metricas.iterrows():
+        eficiencia_atual = linha[COL_EFICIENCIA]
+        nome_categoria = linha[COL_CATEGORIA]
+        texto_ajuda = CRITERIOS_AVALIACAO.get(nome_categoria, "Sem critérios definidos.").replace('**', '')
+        texto_forma = ''
+        forma_atual = forma_por_categoria.get(nome_categoria)
+        if forma_atual:
+            texto_forma = (
+                f"<div class='legenda'>Forma: {forma_atual['eficiencia_janela']:.0%} nas últimas "
+                f"{forma_atual['sessoes_janela']} sessões • tendência {forma_atual['eficiencia_ewma']:.0%}</div>"
+            )
+        cartoes.append(
+            f"<div class='cartao' title='{html.escape(texto_ajuda, quote=True)}'>"
+            f"<div class='faixa' style='background-color: {obter_cor_por_eficiencia(eficiencia_atual)}'></div>"
+            f"<div class='rotulo'>{html.escape(str(nome_categoria))}</div>"
+            f"<div class='valor'>{eficiencia_atual:.1%}</div>"
+            f"<div class='legenda'><b>{obter_texto_status(eficiencia_atual)}</b> • "
+            f"{int(linha['Quantidade correta'])}/{int(linha['Total Calculado'])} acertos</div>"
+            f"{texto_forma}</div>"
+        )
+    return "<h2>Desempenho por Categoria</h2><div class='grade'>" + "".join(cartoes) + "</div>"
+
+def montar_secao_levantamento(resumo_levantamento: pd.DataFrame, grafico_rosca) -> str:
+    """Raio-X do levantamento: gráfico de rosca e o principal erro, como no app."""
+    titulo = "<h2>Raio-X do Levantamento: Análise de Causas</h2>"
+    if resumo_levantamento.empty or grafico_rosca is None:
+        return titulo + "<p class='aviso'>Sem dados de levantamento para análise detalhada.</p>"
+
+    insight = preparar_insight_levantamento(resumo_levantamento)
+    if insight is None:
+        texto_insight = "<p>🌟 Desempenho perfeito! Nenhum erro registrado.</p>"
+    else:
+        texto_insight = (
+            f"<p>🛑 <b>Principal Erro:</b> {html.escape(insight['tipo_erro'])}</p>"
+            f"<p>Soma <b>{insight['quantidade']}</b> falhas ({insight['percentual_erros']:.0f}% dos erros).</p>"
+        )
+        if insight['alerta'] is not None:
+            natureza, texto_alerta = insight['alerta']
+            texto_insight += f"<p class='aviso'>⚠️ <b>{natureza}:</b> {html.escape(texto_alerta)}</p>"
+    return (
+        f"{titulo}<div class='linha'><div class='grafico'>{renderizar_figura_html(grafico_rosca, 'grafico_levantamento')}</div>"
+        f"<div class='lateral'><h3>Insights</h3>{texto_insight}</div></div>"
+    )
+
+def montar_secao_ataque(grafico_dispersao) -> str:
+    titulo = "<h2>Análise Tática de Ataque (Quadrante Mágico)</h2>"
+    if grafico_dispersao is None:
+        return titulo + "<p class='aviso'>Não há dados suficientes de ataque para gerar o quadrante.</p>"
+    return titulo + renderizar_figura_html(grafico_dispersao, 'grafico_ataque')
+
+def montar_pagina(titulo: str, corpo: str, referencia_plotlyjs: str | None = None) -> str:
+    """Página HTML completa com o estilo comum aos relatórios e ao índice."""
+    script_plotly = ''
+    if referencia_plotlyjs == PLOTLYJS_CDN:
+        from plotly.offline import get_plotlyjs_version
+        script_plotly = f"<script src='https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js' charset='utf-8'></script>"
+    elif referencia_plotlyjs:
+        script_plotly = f"<script src='{referencia_plotlyjs}' charset='utf-8'></script>"
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{html.escape(titulo)}</title>
+{script_plotly}
+<style>
+body {{ font-family: sans-serif; margin: 2rem auto; max-width: 1100px; color: #222; }}
+.grade {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem; }}
+.cartao {{ border: 1px solid #ddd; border-radius: 8px; padding: 0.8rem; }}
+.faixa {{ height: 4px; border-radius: 4px; margin-bottom: 8px; }}
+.rotulo {{ font-size: 0.9rem; color: #555; }}
+.valor {{ font-size: 1.8rem; font-weight: bold; }}
+.legenda {{ font-size: 0.8rem; color: #666; margin-top: 0.3rem; }}
+.linha {{ display: flex; gap: 1rem; }}
+.grafico {{ flex: 2; }}
+.lateral {{ flex: 1; }}
+.aviso {{ background: #fff6db; padding: 0.5rem; border-radius: 6px; }}
+</style>
+</head>
+<body>
+{corpo}
+</body>
+</html>
+"""
+
+def gerar_relatorio(tarefa: TarefaRelatorio) -> tuple:
+    """
+    Gera e grava o relatório de um atleta num período (roda nos processos do pool).
+
+    Returns:
+        tuple: (tarefa, segundos gastos).
+    """
+    inicio = time.perf_counter()
+    data_inicio, data_fim = calcular_intervalo_periodo(tarefa.periodo, tarefa.chave_periodo)
+    filtros = FiltrosConsulta(data_inicio=data_inicio, data_fim=data_fim, valores_por_coluna={COL_ATLETA: [tarefa.atleta]})
+
+    kpis = preparar_kpis_globais(_motor_processo, filtros)
+    metricas = preparar_metricas_por_categoria(_motor_processo, filtros)
+    # A forma considera todo o histórico do atleta, como nos cards do app
+    forma_por_categoria = preparar_forma_por_categoria(_indicadores_forma_processo, tarefa.atleta)
+    resumo_levantamento, grafico_rosca = construir_grafico_levantamento(_motor_processo, filtros)
+    grafico_dispersao = construir_grafico_quadrante_ataque(_motor_processo, filtros)
+
+    titulo_periodo = formatar_periodo(tarefa.periodo, tarefa.chave_periodo)
+    corpo = "".join([
+        f"<h1>🏐 {html.escape(tarefa.atleta)}</h1><p class='legenda'>{html.escape(titulo_periodo)}</p>",
+        montar_secao_kpis(kpis),
+        montar_secao_categorias(metricas, forma_por_categoria),
+        montar_secao_levantamento(resumo_levantamento, grafico_rosca),
+        montar_secao_ataque(grafico_dispersao),
+    ])
+    tarefa.caminho_saida.parent.mkdir(parents=True, exist_ok=True)
+    tarefa.caminho_saida.write_text(
+        montar_pagina(f"{tarefa.atleta} — {titulo_periodo}", corpo, tarefa.referencia_plotlyjs), encoding='utf-8'
+    )
+    return tarefa, time.perf_counter() - inicio
+
+def gravar_indice(tarefas: list, pasta_saida: Path, versao_dados: str):
+    """Página inicial com os links de todos os relatórios, agrupados por período."""
+    secoes = []
+    for (periodo, chave_periodo), grupo in pd.DataFrame(
+        [(tarefa.periodo, tarefa.chave_periodo, tarefa) for tarefa in tarefas], columns=['periodo', 'chave', 'tarefa']
+    ).groupby(['periodo', 'chave'], sort=True):
+        links = "".join(
+            f"<li><a href='{tarefa.caminho_saida.relative_to(pasta_saida).as_posix()}'>{html.escape(tarefa.atleta)}</a></li>"
+            for tarefa in grupo['tarefa']
+        )
+        secoes.append(f"<h2>{html.escape(formatar_periodo(periodo, chave_periodo))}</h2><ul>{links}</ul>")
+    corpo = f"<h1>Relatórios de Desempenho</h1><p class='legenda'>Versão dos dados: {html.escape(versao_dados)}</p>" + "".join(reversed(secoes))
+    (pasta_saida / 'index.html').write_text(montar_pagina("Relatórios de Desempenho", corpo), encoding='utf-8')
+
+def gravar_plotlyjs(pasta_saida: Path):
+    """Grava o plotly.js na pasta de saída (uma cópia para todos os relatórios)."""
+    from plotly.offline import get_plotlyjs
+    (pasta_saida / NOME_ARQUIVO_PLOTLYJS).write_text(get_plotlyjs(), encoding='utf-8')
+
+def executar_lote(tarefas: list, caminho_cubo: Path, assinatura: str, processos: int) -> list:
+    """
+    Gera os relatórios em `processos` processos (no próprio processo quando é 1).
+
+    Returns:
+        list: (tarefa, segundos) de cada relatório, na ordem das tarefas.
+    """
+    if processos <= 1:
+        iniciar_processo(caminho_cubo, assinatura)
+        return [gerar_relatorio(tarefa) for tarefa in tarefas]
+
+    # Lotes de tarefas por envio: menos idas e vindas entre processos sem desbalancear o fim
+    tarefas_por_envio = max(1, len(tarefas) // (processos * 4))
+    with ProcessPoolExecutor(max_workers=processos, initializer=iniciar_processo, initargs=(caminho_cubo, assinatura)) as executor:
+        return list(executor.map(gerar_relatorio, tarefas, chunksize=tarefas_por_envio))
+
+def interpretar_argumentos():
+    parser = argparse.ArgumentParser(description="Gera relatórios HTML de desempenho por atleta e período.")
+    parser.add_argument('--periodo', choices=[PERIODO_SEMANA, PERIODO_MES, PERIODO_TUDO], default=PERIODO_SEMANA)
+    parser.add_argument('--ultimos', type=int, default=1, help="Quantidade de períodos mais recentes (ignorado com 'tudo').")
+    parser.add_argument('--atletas', nargs='+', help="Restringe o lote a estes atletas (padrão: todos).")
+    parser.add_argument('--saida', type=Path, default=PASTA_RELATORIOS_PADRAO, help="Pasta dos relatórios.")
+    parser.add_argument('--processos', type=int, default=os.cpu_count() or 1, help="Processos do pool (padrão: núcleos disponíveis).")
+    parser.add_argument('--plotlyjs', choices=[PLOTLYJS_ARQUIVO, PLOTLYJS_CDN], default=PLOTLYJS_ARQUIVO,
+                        help="'arquivo' grava o plotly.js junto (abre sem internet); 'cdn' o carrega da web.")
+    parser.add_argument('--ressincronizar', action='store_true', help="Refaz o dataset a partir das fontes antes do lote.")
+    return parser.parse_args()
+
+def executar_relatorios() -> int:
+    argumentos = interpretar_argumentos()
+    inicio = time.perf_counter()
+
+    dados = carregar_dados(forcar=argumentos.ressincronizar)
+    if dados.empty:
+        print("Nenhum dado carregado: verifique a configuração das fontes (FONTE_DADOS, CAMINHO_FONTE_DADOS).")
+        return 1
+    versao_dados = obter_versao_dados(dados)
+    cubo = construir_cubo_agregado(dados)
+    # O cubo leva o estado dos indicadores de forma para os processos do pool
+    cubo.attrs[CHAVE_INDICADORES_FORMA] = obter_indicadores_forma(dados)
+
+    tarefas = listar_tarefas(
+        cubo, argumentos.periodo, argumentos.ultimos, argumentos.saida, argumentos.plotlyjs, argumentos.atletas
+    )
+    if not tarefas:
+        print("Nenhum atleta com ações nos períodos pedidos.")
+        return 1
+
+    argumentos.saida.mkdir(parents=True, exist_ok=True)
+    if argumentos.plotlyjs == PLOTLYJS_ARQUIVO:
+        gravar_plotlyjs(argumentos.saida)
+
+    processos = max(1, min(argumentos.processos, len(tarefas)))
+    with tempfile.TemporaryDirectory(prefix='relatorios_') as pasta_temporaria:
+        # Um único arquivo para o lote inteiro: todos os processos leem a mesma versão do cubo
+        caminho_cubo = Path(pasta_temporaria) / 'cubo.arrow'
+        gravar_dataset_compartilhado(cubo.reset_index(drop=True), caminho_cubo, versao_dados, versao_dados)
+        resultados = executar_lote(tarefas, caminho_cubo, versao_dados, processos)
+
+    gravar_indice(tarefas, argumentos.saida, versao_dados)
+    segundos_relatorios = sum(segundos for _, segundos in resultados)
+    print(
+        f"{len(resultados)} relatórios em {argumentos.saida}/ com {processos} processo(s): "
+        f"{time.perf_counter() - inicio:.1f}s no total, {segundos_relatorios / len(resultados):.2f}s por relatório"
+    )
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(executar_relatorios())
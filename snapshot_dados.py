@@ -0,0 +1,184 @@
+# Snapshot local (Parquet) do dataset processado
+#
+# Guarda o resultado do ETL em disco, junto com um carimbo de versão do esquema e a
+# impressão digital da fonte bruta, para que reinícios e expirações de cache não
+# precisem baixar a planilha e reprocessar tudo de novo.
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ingestao_incremental import EstadoIngestao, calcular_hash_linhas
+
+# Incrementar sempre que o ETL mudar a forma/tipos do dataset processado
+VERSAO_ESQUEMA_SNAPSHOT = 4
+
+CAMINHO_SNAPSHOT = Path(os.environ.get("CAMINHO_SNAPSHOT_DADOS", ".cache_dados/dados_processados.parquet"))
+
+# Dentro desta janela o snapshot é servido sem consultar a fonte (mesmo TTL do cache do app)
+IDADE_MAXIMA_SNAPSHOT_SEGUNDOS = 60
+
+CHAVE_METADADOS_SNAPSHOT = b"snapshot_dados"
+
+registro_log = logging.getLogger(__name__)
+
+@dataclass
+class SnapshotDados:
+    """Dataset processado lido do disco e os metadados gravados com ele."""
+    dados: pd.DataFrame
+    versao_esquema: int
+    impressao_digital_fonte: str
+    caminho: Path
+    estado_ingestao: EstadoIngestao | None = None
+    indicadores_forma: dict | None = None
+    instante_leitura: float | None = None
+
+def calcular_impressao_digital(dados_brutos: pd.DataFrame) -> str:
+    """
+    Gera um hash estável do conteúdo bruto (colunas e valores) da fonte.
+
+    Args:
+        dados_brutos (pd.DataFrame): Dados crus, antes de qualquer limpeza.
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal.
+    """
+    hash_conteudo = iniciar_impressao_digital(dados_brutos.columns)
+    acumular_impressao_digital(hash_conteudo, dados_brutos)
+    return hash_conteudo.hexdigest()
+
+def iniciar_impressao_digital(colunas):
+    """Inicia o hash da fonte pelas colunas; as linhas entram com `acumular_impressao_digital`."""
+    hash_conteudo = hashlib.sha256()
+    hash_conteudo.update("|".join(map(str, colunas)).encode())
+    return hash_conteudo
+
+def acumular_impressao_digital(hash_conteudo, bloco_bruto: pd.DataFrame):
+    """
+    Acrescenta um bloco de linhas ao hash. O hash de cada linha independe das demais e dos
+    tipos inferidos no bloco (ver `calcular_hash_linhas`), então acumular bloco a bloco dá
+    o mesmo resultado de `calcular_impressao_digital` na fonte inteira.
+    """
+    hash_conteudo.update(calcular_hash_linhas(bloco_bruto).tobytes())
+
+def encadear_impressao_digital(impressao_anterior: str, impressao_bloco_novo: str) -> str:
+    """Combina a impressão digital acumulada com a de um bloco anexado (ingestão incremental)."""
+    return hashlib.sha256(f"{impressao_anterior}+{impressao_bloco_novo}".encode()).hexdigest()
+
+def salvar_snapshot(
+    dados: pd.DataFrame,
+    impressao_digital_fonte: str,
+    estado_ingestao: EstadoIngestao | None = None,
+    caminho: Path = CAMINHO_SNAPSHOT,
+    indicadores_forma: dict | None = None,
+    instante_leitura: float | None = None
+):
+    """
+    Grava o dataset processado em Parquet de forma atômica (arquivo temporário + rename).
+    Falhas de escrita são apenas registradas: o snapshot é uma otimização, não uma dependência.
+
+    Args:
+        dados (pd.DataFrame): Dataset processado.
+        impressao_digital_fonte (str): Hash da fonte bruta que gerou estes dados.
+        estado_ingestao (EstadoIngestao | None): Marca d'água da ingestão incremental.
+        caminho (Path): Destino do arquivo.
+        indicadores_forma (dict | None): Estado serializado dos indicadores de forma,
+            atualizado junto com os dados na ingestão incremental.
+        instante_leitura (float | None): Quando a fonte foi lida para gerar estes dados.
+    """
+    metadados = {
+        "versao_esquema": VERSAO_ESQUEMA_SNAPSHOT,
+        "impressao_digital_fonte": impressao_digital_fonte,
+        "estado_ingestao": asdict(estado_ingestao) if estado_ingestao else None,
+        "indicadores_forma": indicadores_forma,
+        "instante_leitura": instante_leitura,
+    }
+    try:
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        tabela = pa.Table.from_pandas(dados, preserve_index=False)
+        metadados_tabela = {**(tabela.schema.metadata or {}), CHAVE_METADADOS_SNAPSHOT: json.dumps(metadados).encode()}
+        tabela = tabela.replace_schema_metadata(metadados_tabela)
+
+        caminho_temporario = caminho.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(tabela, caminho_temporario)
+        os.replace(caminho_temporario, caminho)
+    except Exception as erro:
+        registro_log.warning("Não foi possível salvar o snapshot em %s: %s", caminho, erro)
+
+def obter_caminho_snapshot_fonte(identificacao_fonte: str, caminho_base: Path = CAMINHO_SNAPSHOT) -> Path:
+    """
+    Caminho do snapshot de uma fonte (aba ou arquivo): cada fonte tem o seu, com a própria
+    marca d'água, para ser atualizada de forma independente das demais.
+    """
+    sufixo_fonte = re.sub(r'\W+', '_', identificacao_fonte).strip('_') or 'fonte'
+    return caminho_base.with_name(f"{caminho_base.stem}_{sufixo_fonte}{caminho_base.suffix}")
+
+def carregar_snapshot(caminho: Path = CAMINHO_SNAPSHOT):
+    """
+    Lê o snapshot do disco, descartando arquivos ilegíveis ou de outra versão de esquema.
+
+    Args:
+        caminho (Path): Arquivo do snapshot.
+
+    Returns:
+        SnapshotDados | None: Snapshot válido ou None se não houver um utilizável.
+    """
+    if not caminho.exists():
+        return None
+
+    try:
+        tabela = pq.read_table(caminho)
+        metadados = json.loads(tabela.schema.metadata[CHAVE_METADADOS_SNAPSHOT])
+    except Exception as erro:
+        registro_log.warning("Snapshot ilegível em %s, será reconstruído: %s", caminho, erro)
+        return None
+
+    if metadados.get("versao_esquema") != VERSAO_ESQUEMA_SNAPSHOT:
+        return None
+
+    estado_ingestao = metadados.get("estado_ingestao")
+    return SnapshotDados(
+        dados=tabela.to_pandas(),
+        versao_esquema=metadados["versao_esquema"],
+        impressao_digital_fonte=metadados["impressao_digital_fonte"],
+        caminho=caminho,
+        estado_ingestao=EstadoIngestao(**estado_ingestao) if estado_ingestao else None,
+        indicadores_forma=metadados.get("indicadores_forma"),
+        instante_leitura=metadados.get("instante_leitura"),
+    )
+
+def snapshot_esta_recente(snapshot: SnapshotDados, idade_maxima_segundos: float = IDADE_MAXIMA_SNAPSHOT_SEGUNDOS) -> bool:
+    """Indica se o snapshot foi gravado ou confirmado contra a fonte há pouco tempo."""
+    idade_segundos = time.time() - snapshot.caminho.stat().st_mtime
+    return idade_segundos <= idade_maxima_segundos
+
+def descartar_snapshot(caminho: Path = CAMINHO_SNAPSHOT):
+    """Apaga o snapshot, forçando a próxima carga a reprocessar toda a fonte."""
+    caminho.unlink(missing_ok=True)
+
+def expirar_snapshot(caminho: Path = CAMINHO_SNAPSHOT):
+    """
+    Marca o arquivo como antigo sem apagá-lo: a próxima carga confere a fonte (pelo caminho
+    incremental, com a marca d'água preservada) em vez de servir o snapshot.
+    """
+    try:
+        os.utime(caminho, (0, 0))
+    except FileNotFoundError:
+        pass
+    except OSError as erro:
+        registro_log.warning("Não foi possível expirar o snapshot %s: %s", caminho, erro)
+
+def confirmar_snapshot_atualizado(snapshot: SnapshotDados):
+    """Marca o snapshot como conferido agora (a fonte não mudou), sem regravar o arquivo."""
+    try:
+        os.utime(snapshot.caminho)
+    except OSError as erro:
+        registro_log.warning("Não foi possível renovar o snapshot %s: %s", snapshot.caminho, erro)
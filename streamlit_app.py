@@ -1,11 +1,50 @@
 # Forced update for GitHub sync
+import time
+from datetime import date
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from dashboard_data import carregar_dados_processados, COL_TIPO, COL_ATLETA
+from dashboard_data import (
+    obter_fontes_ignoradas, obter_versao_dados,
+    formatar_chave_mes, formatar_chave_dia, MotorConsultas, FiltrosConsulta,
+    COL_TIPO, COL_ATLETA, COL_CHAVE_DIA, COL_CHAVE_MES, COL_FONTE, COL_LOCAL, COL_CATEGORIA, COL_FUNDAMENTOS,
+    COL_QTD_CORRETA, COL_QTD_ERRADA, COL_TOTAL_CALCULADO, TIPOS_TREINO
+)
+from cubo_agregado import construir_cubo_agregado
+from indicadores_forma import obter_indicadores_forma
+from preparacao_visualizacoes import (
+    preparar_kpis_globais, preparar_metricas_por_categoria, preparar_insight_levantamento,
+    construir_agregados_periodo, filtrar_agregado_periodo, preparar_forma_por_categoria,
+    comparar_por_categoria
+)
+from construcao_graficos import (
+    obter_cor_por_eficiencia, obter_texto_status, construir_grafico_quadrante_ataque,
+    construir_grafico_levantamento, construir_grafico_comparacao, construir_grafico_serie_diaria
+)
+from estatistica_comparacao import comparar_eficiencias, descrever_teste_diferenca
+from indice_filtros import construir_indice_filtros, ConsultaFiltros
+from cache_figuras import CacheFiguras, calcular_chave_figura
+from atualizacao_dados import AtualizadorDados
+from lancamento_dados import criar_servico_lancamentos, criar_linhas_lancamento
+from instrumentacao import (
+    medir_etapa, iniciar_execucao, obter_registros_execucao,
+    COMPONENTE_RENDERIZACAO, COMPONENTE_CACHE
+)
 # Importação das configurações (constantes) evitando "magic strings/numbers" no código
-from configuracoes import ESTILOS_CSS, CORES_CATEGORIAS, CRITERIOS_AVALIACAO
+from configuracoes import ESTILOS_CSS, CRITERIOS_AVALIACAO
+
+# Dimensões com filtro por valor na sidebar (e o atleta do dashboard individual)
+COLUNAS_FILTRAVEIS = [COL_ATLETA, COL_FONTE, COL_TIPO, COL_LOCAL, COL_CATEGORIA, COL_FUNDAMENTOS]
+
+# Renderização sob demanda: as abas guardam qual está aberta e trocar de aba refaz a
+# execução, então só o corpo da aba aberta prepara dados e monta gráficos. Com False,
+# todas as abas rodam a cada execução (comportamento padrão do `st.tabs`). Os widgets
+# dentro das abas usam `persist_state="session"` para manter a seleção com a aba fechada.
+MODO_RENDERIZACAO_SOB_DEMANDA = True
+
+# Aba de lançamento: o app grava novos treinos (buffer local + envio em segundo plano à
+# fonte; ver `lancamento_dados`). Só aparece quando a fonte aceita escrita.
+MODO_LANCAMENTO_DADOS = True
 
 # --- Configurações e Estilos ---
 
@@ -24,30 +63,130 @@ def aplicar_estilos_visuais():
 
 # --- Camada de Dados ---
 
-@st.cache_data(ttl=60)
-def obter_dados_com_cache():
-    """Wrapper para carregar dados com cache do Streamlit."""
-    return carregar_dados_processados()
+@st.cache_resource
+def obter_servico_lancamentos():
+    """
+    Serviço de lançamentos compartilhado entre sessões (uma thread de envio por processo),
+    ou None se o modo está desligado ou a fonte não aceita escrita.
+    """
+    if not MODO_LANCAMENTO_DADOS:
+        return None
+    servico = criar_servico_lancamentos()
+    if servico is not None:
+        servico.iniciar()
+    return servico
+
+@st.cache_resource
+def obter_atualizador_dados():
+    """
+    Atualizador do dataset compartilhado entre sessões: uma thread de fundo refaz os dados
+    e cada execução lê a última versão pronta, sem esperar pela fonte. Os lançamentos ainda
+    fora da fonte entram como complemento de cada versão.
+    """
+    servico_lancamentos = obter_servico_lancamentos()
+    if servico_lancamentos is None:
+        atualizador = AtualizadorDados()
+    else:
+        atualizador = AtualizadorDados(complemento=servico_lancamentos.complementar_dados)
+        # Depois de um envio, a próxima versão já traz as linhas da fonte
+        servico_lancamentos.ao_enviar = atualizador.solicitar_atualizacao
+    atualizador.iniciar()
+    return atualizador
+
+def renderizar_estado_dados(atualizador, dados_processados, servico_lancamentos=None):
+    """Avisa na sidebar a hora dos dados exibidos, falhas da última atualização, fontes ignoradas e envios pendentes."""
+    if atualizador.instante_dados is not None:
+        st.sidebar.caption(f"Dados atualizados às {time.strftime('%H:%M:%S', time.localtime(atualizador.instante_dados))}")
+    if atualizador.ultimo_erro is not None:
+        st.sidebar.warning(f"A última atualização falhou ({atualizador.ultimo_erro}); exibindo a versão anterior.")
+    for aviso in obter_fontes_ignoradas(dados_processados):
+        st.sidebar.warning(f"Fonte ignorada: {aviso}")
+    if servico_lancamentos is not None and servico_lancamentos.ultimo_erro is not None:
+        st.sidebar.warning(
+            f"Envio de lançamentos falhou ({servico_lancamentos.ultimo_erro}); "
+            f"{servico_lancamentos.contar_pendentes()} linha(s) aguardando nova tentativa."
+        )
+
+@st.cache_data(max_entries=2)
+def obter_cubo_com_cache(versao_dados, _dados_completos):
+    """
+    Cubo de agregação calculado uma vez por versão do dataset.
+    O prefixo `_` evita que o Streamlit faça hash do DataFrame inteiro a cada rerun.
+    """
+    return construir_cubo_agregado(_dados_completos)
+
+@st.cache_resource(max_entries=2)
+def obter_indice_filtros_com_cache(versao_dados, _cubo_dados):
+    """
+    Índice de filtros construído uma vez por versão do dataset.
+    Fica em `cache_resource` (objeto compartilhado, sem cópia por rerun): é somente leitura.
+    """
+    return construir_indice_filtros(_cubo_dados, COLUNAS_FILTRAVEIS, COL_TOTAL_CALCULADO)
+
+@st.cache_resource(max_entries=2)
+def obter_motor_consultas_com_cache(versao_dados, _cubo_dados):
+    """
+    Motor de consultas SQL (DuckDB) carregado uma vez por versão do dataset.
+    Compartilhado entre sessões: cada consulta abre o próprio cursor.
+    """
+    return MotorConsultas(_cubo_dados)
+
+@st.cache_resource
+def obter_cache_figuras():
+    """Cache LRU de figuras Plotly, compartilhado entre sessões (a chave já inclui a versão dos dados)."""
+    return CacheFiguras()
+
+@st.cache_data(max_entries=6)
+def obter_agregados_periodo_com_cache(versao_dados, coluna_chave_periodo, detalhar_fundamentos, _motor_consultas):
+    """
+    Tabela Atleta × Período × Categoria (opcionalmente × Fundamentos) memoizada por versão
+    do dataset. Trocar de mês ou dia na comparação só filtra esta tabela pequena.
+    """
+    return construir_agregados_periodo(_motor_consultas, coluna_chave_periodo, detalhar_fundamentos)
+
+# --- Abas ---
+
+def abrir_abas(rotulos, chave):
+    """Cria as abas; no modo sob demanda, elas acompanham a aba aberta (ver `aba_esta_aberta`)."""
+    if MODO_RENDERIZACAO_SOB_DEMANDA:
+        return st.tabs(rotulos, key=chave, on_change="rerun")
+    return st.tabs(rotulos)
+
+def aba_esta_aberta(aba) -> bool:
+    """Se o corpo da aba deve rodar: só a aba aberta no modo sob demanda, todas fora dele."""
+    return aba.open is not False
 
 # --- Camada de Filtros (Barra Lateral) ---
 
-def aplicar_filtros_laterais(dados_completo):
+def formatar_opcao_com_contagem(contagens_opcoes):
+    """Cria o `format_func` que exibe cada opção do widget com o total de ações dela."""
+    return lambda opcao: f"{opcao} ({contagens_opcoes[opcao]})" if opcao in contagens_opcoes else str(opcao)
+
+def aplicar_filtros_laterais(indice_filtros, atleta_selecionado=None):
     """
-    Controla todos os filtros da sidebar e retorna o subconjunto de dados filtrado.
+    Controla todos os filtros da sidebar e retorna os filtros escolhidos (ou None se nenhum
+    registro os atende). As opções dos widgets saem do índice de filtros; o recorte em si
+    é aplicado pelo motor de consultas em cada componente.
     """
     st.sidebar.header("Filtros")
 
-    # Botão de reset
-    if st.sidebar.button("🔄 Atualizar e Limpar Cache"):
-        st.cache_data.clear()
-        st.rerun()
+    # Reprocessa as fontes em segundo plano: a versão atual segue na tela até a nova ficar pronta
+    if st.sidebar.button("🔄 Atualizar Dados"):
+        obter_atualizador_dados().solicitar_atualizacao(ressincronizar=True)
+        st.toast("Atualização solicitada: os dados novos aparecem assim que estiverem prontos.")
+
+    # Os widgets têm `key` fixa: assim a mudança das contagens nos rótulos não reinicia a seleção
+    consulta = ConsultaFiltros(indice_filtros)
+    filtros = FiltrosConsulta()
+    if atleta_selecionado is not None:
+        consulta.restringir(COL_ATLETA, [atleta_selecionado])
+        filtros.valores_por_coluna[COL_ATLETA] = [atleta_selecionado]
 
-    if dados_completo.empty:
-        return dados_completo
+    if consulta.esta_vazia():
+        return None
 
     # 1. Filtro de Data
-    data_minima_disponivel = dados_completo['Data'].min()
-    data_maxima_disponivel = dados_completo['Data'].max()
+    data_minima_disponivel, data_maxima_disponivel = consulta.obter_limites_datas()
     
     intervalo_selecionado = st.sidebar.date_input(
         "Período de Análise",
@@ -63,103 +202,102 @@ def aplicar_filtros_laterais(dados_completo):
         data_inicio = intervalo_selecionado[0]
         data_fim = intervalo_selecionado[0]
 
-    mascara_periodo = (dados_completo['Data'] >= pd.to_datetime(data_inicio)) & (dados_completo['Data'] <= pd.to_datetime(data_fim))
-    dados_filtrados = dados_completo.loc[mascara_periodo]
+    consulta.restringir_datas(data_inicio, data_fim)
+    filtros.data_inicio, filtros.data_fim = data_inicio, data_fim
+
+    # 1.2 Filtro de Fonte (aba/dupla/temporada) - só faz sentido com mais de uma fonte
+    contagem_fontes = consulta.contar_opcoes(COL_FONTE)
+    if len(contagem_fontes) > 1:
+        fontes_selecionadas = st.sidebar.multiselect(
+            "Fonte (Aba)",
+            list(contagem_fontes),
+            format_func=formatar_opcao_com_contagem(contagem_fontes),
+            key="filtro_fontes",
+            placeholder="Selecione abas (Ex: Temporada 2024)..."
+        )
+        consulta.restringir(COL_FONTE, fontes_selecionadas)
+        filtros.valores_por_coluna[COL_FONTE] = fontes_selecionadas
 
     # 1.5 Filtro de Contexto (Tipo) - Novo!
-    tipos_disponiveis = sorted(dados_filtrados[COL_TIPO].unique().tolist())
+    contagem_tipos = consulta.contar_opcoes(COL_TIPO)
     tipos_selecionados = st.sidebar.multiselect(
         "Contexto do Treino",
-        tipos_disponiveis,
+        list(contagem_tipos),
+        format_func=formatar_opcao_com_contagem(contagem_tipos),
+        key="filtro_tipos",
         placeholder="Selecione tipos (Ex: Racha, Específico)..."
     )
-
-    if tipos_selecionados:
-        dados_filtrados = dados_filtrados[dados_filtrados[COL_TIPO].isin(tipos_selecionados)]
+    consulta.restringir(COL_TIPO, tipos_selecionados)
+    filtros.valores_por_coluna[COL_TIPO] = tipos_selecionados
 
     # 2. Filtro de Local
-    locais_disponiveis = sorted(dados_filtrados['Local'].unique().tolist())
-    local_escolhido = st.sidebar.selectbox("Local de Treino", ["Todos"] + locais_disponiveis)
+    contagem_locais = consulta.contar_opcoes(COL_LOCAL)
+    local_escolhido = st.sidebar.selectbox(
+        "Local de Treino",
+        ["Todos"] + list(contagem_locais),
+        format_func=formatar_opcao_com_contagem(contagem_locais),
+        key="filtro_local"
+    )
 
     if local_escolhido != "Todos":
-        dados_filtrados = dados_filtrados[dados_filtrados['Local'] == local_escolhido]
+        consulta.restringir(COL_LOCAL, [local_escolhido])
+        filtros.valores_por_coluna[COL_LOCAL] = [local_escolhido]
 
     st.sidebar.markdown("---")
     st.sidebar.subheader("Seleção de Fundamentos")
 
     # 3. Filtro de Categoria (Alto Nível)
-    categorias_disponiveis = sorted(dados_filtrados['Categoria'].unique().tolist())
+    contagem_categorias = consulta.contar_opcoes(COL_CATEGORIA)
     categorias_selecionadas = st.sidebar.multiselect(
         "Categorias",
-        categorias_disponiveis,
+        list(contagem_categorias),
+        format_func=formatar_opcao_com_contagem(contagem_categorias),
+        key="filtro_categorias",
         placeholder="Selecione para filtrar..."
     )
-
-    if categorias_selecionadas:
-        dados_filtrados = dados_filtrados[dados_filtrados['Categoria'].isin(categorias_selecionadas)]
+    consulta.restringir(COL_CATEGORIA, categorias_selecionadas)
+    filtros.valores_por_coluna[COL_CATEGORIA] = categorias_selecionadas
 
     # 4. Filtro de Detalhe (Baixo Nível)
-    detalhes_disponiveis = sorted(dados_filtrados['Fundamentos'].unique().tolist())
+    contagem_detalhes = consulta.contar_opcoes(COL_FUNDAMENTOS)
     detalhes_selecionados = st.sidebar.multiselect(
         "Tipos Específicos", 
-        detalhes_disponiveis,
+        list(contagem_detalhes),
+        format_func=formatar_opcao_com_contagem(contagem_detalhes),
+        key="filtro_fundamentos",
         placeholder="Ex: Ataque - Diagonal..."
     )
+    consulta.restringir(COL_FUNDAMENTOS, detalhes_selecionados)
+    filtros.valores_por_coluna[COL_FUNDAMENTOS] = detalhes_selecionados
 
-    if detalhes_selecionados:
-        dados_filtrados = dados_filtrados[dados_filtrados['Fundamentos'].isin(detalhes_selecionados)]
-
-    return dados_filtrados
-
-# --- Helpers de Visualização ---
-
-def obter_cor_por_eficiencia(valor_eficiencia):
-    """Retorna código Hex da cor baseado na eficiência."""
-    if valor_eficiencia >= 0.70: return '#2ecc71' # Verde Excelente
-    if valor_eficiencia >= 0.50: return '#f1c40f' # Amarelo Atenção
-    return '#e74c3c' # Vermelho Crítico
-
-def obter_texto_status(valor_eficiencia):
-    """Retorna label de texto baseado na eficiência."""
-    if valor_eficiencia >= 0.70: return 'Excelente'
-    if valor_eficiencia >= 0.50: return 'Atenção'
-    return 'Crítico'
+    return None if consulta.esta_vazia() else filtros
 
 # --- Componentes Visuais ---
 
-def renderizar_kpis_globais(dados):
+@medir_etapa(COMPONENTE_RENDERIZACAO)
+def renderizar_kpis_globais(motor_consultas, filtros):
     """Exibe métricas de topo (KPIs)."""
     coluna_eficiencia, coluna_tentativas, coluna_acertos, coluna_sessoes = st.columns(4)
     
-    total_tentativas = dados['Total Calculado'].sum()
-    total_acertos = dados['Quantidade correta'].sum()
-    
-    # Previne divisão por zero
-    percentual_eficiencia = (total_acertos / total_tentativas * 100) if total_tentativas > 0 else 0
-    total_sessoes_unicas = dados['Data'].nunique()
+    kpis = preparar_kpis_globais(motor_consultas, filtros)
     
-    coluna_eficiencia.metric("Eficiência Geral", f"{percentual_eficiencia:.1f}%")
-    coluna_tentativas.metric("Total de Ações", int(total_tentativas))
-    coluna_acertos.metric("Acertos Totais", int(total_acertos))
-    coluna_sessoes.metric("Sessões de Treino", total_sessoes_unicas)
+    coluna_eficiencia.metric("Eficiência Geral", f"{kpis['percentual_eficiencia']:.1f}%")
+    coluna_tentativas.metric("Total de Ações", kpis['total_tentativas'])
+    coluna_acertos.metric("Acertos Totais", kpis['total_acertos'])
+    coluna_sessoes.metric("Sessões de Treino", kpis['total_sessoes'])
     
     st.markdown("---")
 
-def renderizar_metricas_por_categoria(dados):
-    """Cards detalhados por categoria de fundamento."""
+@medir_etapa(COMPONENTE_RENDERIZACAO)
+def renderizar_metricas_por_categoria(motor_consultas, filtros, forma_por_categoria=None):
+    """
+    Cards detalhados por categoria de fundamento. A forma atual (últimas sessões e média
+    exponencial) vem do estado incremental e considera todo o histórico do atleta.
+    """
     st.subheader("Desempenho por Categoria")
     
-    metricas_agrupadas = dados.groupby('Categoria').agg({
-        'Quantidade correta': 'sum',
-        'Total Calculado': 'sum'
-    }).reset_index()
-    
-    metricas_agrupadas['Eficiencia'] = metricas_agrupadas['Quantidade correta'] / metricas_agrupadas['Total Calculado']
-    
-    # Definição de ordem de apresentação
-    mapa_prioridade = {'Saque': 1, 'Recepção': 2, 'Levantamento': 3, 'Ataque': 4}
-    metricas_agrupadas['Prioridade'] = metricas_agrupadas['Categoria'].map(mapa_prioridade).fillna(99)
-    metricas_agrupadas = metricas_agrupadas.sort_values('Prioridade')
+    # Agregado por categoria, já na ordem de apresentação
+    metricas_agrupadas = preparar_metricas_por_categoria(motor_consultas, filtros)
     
     container_colunas = st.columns(len(metricas_agrupadas))
     
@@ -183,146 +321,55 @@ def renderizar_metricas_por_categoria(dados):
                 help=texto_ajuda
             )
             st.caption(f"**{status_texto}** • {int(linha['Total Calculado'])}/{int(linha['Quantidade correta'])} acertos")
+            
+            forma_atual = (forma_por_categoria or {}).get(nome_categoria)
+            if forma_atual:
+                st.caption(
+                    f"Forma: {forma_atual['eficiencia_janela']:.0%} nas últimas {forma_atual['sessoes_janela']} sessões"
+                    f" • tendência {forma_atual['eficiencia_ewma']:.0%}"
+                )
 
     st.markdown("---")
 
-def renderizar_quadrante_ataque(dados):
+@medir_etapa(COMPONENTE_RENDERIZACAO)
+def renderizar_quadrante_ataque(motor_consultas, filtros, versao_dados):
     """Gráfico de dispersão para análise tática de ataques."""
     st.subheader("Análise Tática de Ataque (Quadrante Mágico)")
     
-    # Filtra apenas variações de ataque
-    dados_somente_ataque = dados[dados['Fundamentos'].str.startswith('Ataque -')]
+    # Só refaz agregação e figura quando a versão dos dados ou os filtros mudam
+    grafico_dispersao = obter_cache_figuras().obter_ou_construir(
+        'quadrante_ataque',
+        calcular_chave_figura('quadrante_ataque', versao_dados, filtros),
+        lambda: construir_grafico_quadrante_ataque(motor_consultas, filtros)
+    )
     
-    if dados_somente_ataque.empty:
+    if grafico_dispersao is None:
         st.info("Não há dados suficientes de ataque para gerar o quadrante.")
         return
-
-    resumo_ataque = dados_somente_ataque.groupby('Fundamentos').agg({
-        'Quantidade correta': 'sum',
-        'Total Calculado': 'sum'
-    }).reset_index()
-    
-    resumo_ataque['Eficiencia'] = resumo_ataque['Quantidade correta'] / resumo_ataque['Total Calculado']
-    
-    volume_medio = resumo_ataque['Total Calculado'].mean()
-    meta_eficiencia_percentual = 0.60 
-    
-    grafico_dispersao = px.scatter(
-        resumo_ataque,
-        x='Total Calculado',
-        y='Eficiencia',
-        # text='Fundamentos', # Removido para limpar a visualização
-        size='Total Calculado',
-        hover_data=['Fundamentos', 'Quantidade correta'],
-        color='Eficiencia',
-        color_continuous_scale='RdYlGn',
-        title="Relação Volume vs Eficiência",
-        labels={'Eficiencia': 'Eficiência (%)'}
-    )
-
-    grafico_dispersao.update_traces(
-        hovertemplate="<br>".join([
-            "Fundamento: %{customdata[0]}",
-            "Total Calculado: %{x}",
-            "Quantidade correta: %{customdata[1]}",
-            "Eficiência: %{y:.0%}"
-        ]) + "<extra></extra>"
-    )
-    
-    # Linhas de referência (Quadrantes)
-    grafico_dispersao.add_hline(y=meta_eficiencia_percentual, line_dash="dash", line_color="white", annotation_text="Meta")
-    grafico_dispersao.add_vline(x=volume_medio, line_dash="dash", line_color="white", annotation_text="Volume Médio")
-
-    # Formatação da barra de cores para porcentagem
-    grafico_dispersao.update_layout(coloraxis_colorbar=dict(tickformat='.0%'))
-    
-    # Anotações dos quadrantes
-    max_x, min_x = resumo_ataque['Total Calculado'].max(), resumo_ataque['Total Calculado'].min()
-    
-    # Lista de tuplas com configuração das anotações
-    # Ajuste de Y para evitar sobreposição (acima de 100% e abaixo de 0%)
-    offset_superior = 1.10
-    offset_inferior = -0.10
-    
-    config_quadrantes = [
-        (max_x, offset_superior, "💎 SEGURANÇA", "#2ecc71"),
-        (min_x, offset_superior, "🚀 POTENCIAL", "#3498db"),
-        (max_x, offset_inferior, "⚠️ RISCO", "#e74c3c"),
-        (min_x, offset_inferior, "🗑️ DESCARTE", "#7f8c8d")
-    ]
-    
-    for pos_x, pos_y, rotulo, cor in config_quadrantes:
-        grafico_dispersao.add_annotation(x=pos_x, y=pos_y, text=rotulo, showarrow=False, font=dict(color=cor, size=14))
-
-    # Formatação da barra de cores para porcentagem
-    grafico_dispersao.update_layout(
-        coloraxis_colorbar=dict(tickformat='.0%'),
-        xaxis_title="Volume (Repetições)",
-        yaxis_title="Eficiência (%)",
-        yaxis_tickformat='.0%',
-        # Expande o eixo Y para caber as anotações deslocadas
-        yaxis=dict(range=[-0.15, 1.15]), 
-        height=500
-    )
     
     st.plotly_chart(grafico_dispersao, use_container_width=True)
 
-def renderizar_analise_detalhada_levantamento(dados):
+@medir_etapa(COMPONENTE_RENDERIZACAO)
+def renderizar_analise_detalhada_levantamento(motor_consultas, filtros, versao_dados):
     """
     Gráfico de Rosca (Donut) focado na causa dos erros de levantamento.
     Solicitado pelo usuário para identificar problemas técnicos vs táticos.
     """
     st.subheader("Raio-X do Levantamento: Análise de Causas")
 
-    # 1. Filtrar apenas levantamentos
-    # O filtro deve pegar tudo que começa com "Levantamento"
-    dados_lev = dados[dados['Fundamentos'].str.startswith('Levantamento')].copy()
+    resumo_geral, grafico_rosca = obter_cache_figuras().obter_ou_construir(
+        'levantamento',
+        calcular_chave_figura('levantamento', versao_dados, filtros),
+        lambda: construir_grafico_levantamento(motor_consultas, filtros)
+    )
 
-    if dados_lev.empty:
+    if resumo_geral.empty:
         st.info("Sem dados de levantamento para análise detalhada.")
         return
-
-    # 2. Identificar Tipos (Sucessos e Erros)
-    # Vamos classificar tudo: O que for "Bom" é Acerto, o resto é o nome do erro.
-    
-    def classificar_tipo(nome_fundamento):
-        if "Bom" in nome_fundamento:
-            return "✅ Acerto (Bola Boa)"
-        else:
-            # Limpa o nome do erro: "Levantamento - Dois Toques (Erro)" -> "Dois Toques"
-            return nome_fundamento.replace('Levantamento - ', '').replace(' (Erro)', '').capitalize()
-
-    dados_lev['Tipo Detalhado'] = dados_lev['Fundamentos'].apply(classificar_tipo)
     
-    # 3. Agrupar por Tipo Detalhado
-    resumo_geral = dados_lev.groupby('Tipo Detalhado')['Total Calculado'].sum().reset_index()
-    
-    total_acoes = resumo_geral['Total Calculado'].sum()
-    
-    if total_acoes == 0:
+    if grafico_rosca is None:
         st.warning("Sem dados de levantamento.")
         return
-
-    # 4. Gráfico de Rosca (Donut)
-    # Define cores para garantir que Acerto seja verde
-    grafico_rosca = px.pie(
-        resumo_geral,
-        values='Total Calculado',
-        names='Tipo Detalhado',
-        title=f"Distribuição Total: {int(total_acoes)} Ações",
-        hole=0.4,
-        color='Tipo Detalhado',
-        # Mapa de cores explícito para destacar o acerto e diferenciar erros
-        color_discrete_map={
-            "✅ Acerto (Bola Boa)": "#2ecc71", # Verde
-            "Dois toque": "#e74c3c",           # Vermelho
-            "Condução": "#e67e22",             # Laranja
-            "Bola não permite ataque": "#f1c40f" # Amarelo
-        } 
-    )
-    
-    grafico_rosca.update_traces(textposition='inside', textinfo='percent+label+value')
-    grafico_rosca.update_layout(showlegend=True)
     
     col1, col2 = st.columns([2, 1])
     
@@ -332,244 +379,392 @@ def renderizar_analise_detalhada_levantamento(dados):
     with col2:
         st.markdown("#### Insights")
         
-        # Filtra apenas os erros para dar o insight do vilão
-        apenas_erros = resumo_geral[resumo_geral['Tipo Detalhado'] != "✅ Acerto (Bola Boa)"]
+        insight = preparar_insight_levantamento(resumo_geral)
         
-        if not apenas_erros.empty:
-            maior_erro = apenas_erros.loc[apenas_erros['Total Calculado'].idxmax()]
-            qtd_erro = maior_erro['Total Calculado']
-            pct_erro_relativo = (qtd_erro / apenas_erros['Total Calculado'].sum()) * 100
-            
-            st.write(f"🛑 **Principal Erro:** {maior_erro['Tipo Detalhado']}")
-            st.write(f"Soma **{int(qtd_erro)}** falhas.")
+        if insight is not None:
+            st.write(f"🛑 **Principal Erro:** {insight['tipo_erro']}")
+            st.write(f"Soma **{insight['quantidade']}** falhas.")
             
-            tipo_erro_lower = maior_erro['Tipo Detalhado'].lower()
-            if "dois toque" in tipo_erro_lower or "condução" in tipo_erro_lower:
-                st.warning("⚠️ **Técnica:** Cuidado com o contato na bola. Treine o 'toque' isolado.")
-            elif "bola não permite" in tipo_erro_lower:
-                st.warning("⚠️ **Tática:** Melhore o deslocamento para chegar equilibrado.")
+            if insight['alerta'] is not None:
+                natureza, texto_alerta = insight['alerta']
+                st.warning(f"⚠️ **{natureza}:** {texto_alerta}")
         else:
             st.success("🌟 Desempenho perfeito! Nenhum erro registrado.")
 
+def formatar_ajuda_intervalo(lado_comparacao):
+    """Texto de ajuda com o IC 95% (Wilson) de um lado da comparação."""
+    inferior, superior = lado_comparacao['ic']
+    return f"IC 95% (Wilson): {inferior:.1%} a {superior:.1%} em {lado_comparacao['total']} ações."
+
+def descrever_diferencas_por_categoria(teste_por_categoria):
+    """Resume quais categorias têm diferença estatisticamente significativa entre A e B."""
+    significativas = teste_por_categoria[teste_por_categoria['significativa']] if not teste_por_categoria.empty else teste_por_categoria
+    if significativas.empty:
+        return "Nenhuma diferença por categoria é estatisticamente significativa (bootstrap, 95%)."
+    return "Diferenças significativas (B − A): " + ", ".join(
+        f"{linha[COL_CATEGORIA]} {linha['diferenca']:+.0%}" for _, linha in significativas.iterrows()
+    )
 
-
-    
-
-
-
-
-
-def renderizar_area_comparacao(dados):
-    """Área dedicada a comparações entre atletas e períodos."""
+@medir_etapa(COMPONENTE_RENDERIZACAO)
+def renderizar_area_comparacao(motor_consultas, versao_dados):
+    """
+    Área dedicada a comparações entre atletas e períodos.
+    Lê apenas as tabelas memoizadas de agregados por período (consultadas no motor SQL).
+    """
     st.markdown("## ⚔️ Modo Comparação")
 
-    if COL_ATLETA not in dados.columns:
+    if COL_ATLETA not in motor_consultas.colunas:
         st.error("Dados de atletas não encontrados na planilha.")
         return
 
-    # Garante que a coluna de atleta seja string
-    dados[COL_ATLETA] = dados[COL_ATLETA].astype(str)
-    atletas_disponiveis = sorted(dados[COL_ATLETA].unique().tolist())
+    atletas_disponiveis = motor_consultas.listar_valores(COL_ATLETA)
     
     if not atletas_disponiveis:
         st.warning("Nenhum atleta encontrado nos dados.")
         return
 
-    # Abas internas da comparação
-    tab_geral, tab_mensal, tab_diario = st.tabs(["📊 Histórico Completo", "📅 Evolução Mensal", "📆 Evolução Diária"])
+    # Tenta selecionar um segundo atleta diferente, se houver
+    idx_b = 1 if len(atletas_disponiveis) > 1 else 0
 
-    # --- 1. Comparação Histórica Geral ---
-    with tab_geral:
-        st.caption("Comparação de todo o histórico disponível.")
-        c1, c2 = st.columns(2)
-        
-        atleta_a = c1.selectbox("Atleta A", atletas_disponiveis, index=0, key="comp_geral_a")
-        # Tenta selecionar um segundo atleta diferente, se houver
-        idx_b = 1 if len(atletas_disponiveis) > 1 else 0
-        atleta_b = c2.selectbox("Atleta B", atletas_disponiveis, index=idx_b, key="comp_geral_b")
-
-        if atleta_a and atleta_b:
-            dados_a = dados[dados[COL_ATLETA] == atleta_a]
-            dados_b = dados[dados[COL_ATLETA] == atleta_b]
-            
-            # Helper interno de eficiência
-            def calc_eff(df):
-                total = df['Total Calculado'].sum()
-                if total == 0: return 0.0
-                return df['Quantidade correta'].sum() / total
-
-            eff_a = calc_eff(dados_a)
-            eff_b = calc_eff(dados_b)
-            
-            c1.metric(f"Eficiência Global {atleta_a}", f"{eff_a:.1%}")
-            c2.metric(f"Eficiência Global {atleta_b}", f"{eff_b:.1%}", delta=f"{(eff_b - eff_a):.1%}")
+    # Abas internas da comparação; cada uma consulta a própria tabela de períodos
+    # (memoizada) só quando é executada
+    tab_geral, tab_mensal, tab_diario = abrir_abas(["📊 Histórico Completo", "📅 Evolução Mensal", "📆 Evolução Diária"], "aba_comparacao")
 
-            st.markdown("---")
-            st.markdown("#### Confronto por Categoria")
-            
-            def preparar_dados_grafico(df, nome_atleta):
-                grp = df.groupby('Categoria').agg({'Quantidade correta': 'sum', 'Total Calculado': 'sum'}).reset_index()
-                grp['Eficiencia'] = grp['Quantidade correta'] / grp['Total Calculado']
-                grp['Atleta'] = nome_atleta
-                return grp
-
-            df_grafico = pd.concat([
-                preparar_dados_grafico(dados_a, atleta_a),
-                preparar_dados_grafico(dados_b, atleta_b)
-            ])
-            
-            if not df_grafico.empty:
-                fig = px.bar(
-                    df_grafico, x='Categoria', y='Eficiencia', color='Atleta',
-                    barmode='group', text_auto='.0%', title="Eficiência por Fundamento"
-                )
-                fig.update_yaxes(tickformat='.0%')
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("Sem dados suficientes para gráfico.")
+    # --- 1. Comparação Histórica Geral ---
+    if aba_esta_aberta(tab_geral):
+        with tab_geral:
+            agregados_mensais = obter_agregados_periodo_com_cache(versao_dados, COL_CHAVE_MES, False, motor_consultas)
+            renderizar_comparacao_historica(agregados_mensais, atletas_disponiveis, idx_b, versao_dados)
 
     # --- 2. Comparação Mensal ---
-    with tab_mensal:
-        st.caption("Compare o desempenho entre meses diferentes (mesmo atleta ou atletas diferentes).")
-        # Cria coluna auxiliar de Mês/Ano apenas para o selectbox
-        dados['MesAno_Str'] = dados['Data'].dt.strftime('%Y-%m')
-        meses_disponiveis = sorted(dados['MesAno_Str'].unique().tolist(), reverse=True)
-        
-        c1, c2 = st.columns(2)
-        
-        with c1:
-            st.markdown("###### 🟦 Cenário A")
-            atleta_m_a = st.selectbox("Atleta", atletas_disponiveis, key="comp_mes_a_atl")
-            mes_m_a = st.selectbox("Mês", meses_disponiveis, key="comp_mes_a_mes")
-        
-        with c2:
-            st.markdown("###### 🟥 Cenário B")
-            atleta_m_b = st.selectbox("Atleta", atletas_disponiveis, index=idx_b, key="comp_mes_b_atl")
-            # Tenta pegar o mês anterior ou o mesmo se só tiver um
-            idx_mes_b = 1 if len(meses_disponiveis) > 1 else 0
-            mes_m_b = st.selectbox("Mês", meses_disponiveis, index=idx_mes_b, key="comp_mes_b_mes")
-
-        # Filtra e Compara
-        dados_a = dados[(dados[COL_ATLETA] == atleta_m_a) & (dados['MesAno_Str'] == mes_m_a)]
-        dados_b = dados[(dados[COL_ATLETA] == atleta_m_b) & (dados['MesAno_Str'] == mes_m_b)]
-        
-        eff_a = calc_eff(dados_a)
-        eff_b = calc_eff(dados_b)
-        
-        kpi1, kpi2, kpi3 = st.columns(3)
-        kpi1.metric(f"{atleta_m_a} ({mes_m_a})", f"{eff_a:.1%}")
-        kpi2.metric("Diferença (B - A)", f"{(eff_b - eff_a):.1%}")
-        kpi3.metric(f"{atleta_m_b} ({mes_m_b})", f"{eff_b:.1%}")
-
-        if not dados_a.empty or not dados_b.empty:
-            df_grafico_mes = pd.concat([
-                preparar_dados_grafico(dados_a, f"{atleta_m_a} ({mes_m_a})"),
-                preparar_dados_grafico(dados_b, f"{atleta_m_b} ({mes_m_b})")
-            ])
-            fig_mes = px.bar(
-                df_grafico_mes, x='Categoria', y='Eficiencia', color='Atleta',
-                barmode='group', text_auto='.0%'
+    if aba_esta_aberta(tab_mensal):
+        with tab_mensal:
+            agregados_mensais = obter_agregados_periodo_com_cache(versao_dados, COL_CHAVE_MES, False, motor_consultas)
+            renderizar_comparacao_mensal(agregados_mensais, atletas_disponiveis, idx_b, versao_dados)
+
+    # --- 3. Comparação Diária ---
+    if aba_esta_aberta(tab_diario):
+        with tab_diario:
+            agregados_diarios = obter_agregados_periodo_com_cache(versao_dados, COL_CHAVE_DIA, True, motor_consultas)
+            renderizar_comparacao_diaria(agregados_diarios, atletas_disponiveis, idx_b, versao_dados)
+
+def renderizar_comparacao_historica(agregados_mensais, atletas_disponiveis, idx_b, versao_dados):
+    """Aba de comparação de todo o histórico entre dois atletas."""
+    st.caption("Comparação de todo o histórico disponível.")
+    c1, c2 = st.columns(2)
+
+    atleta_a = c1.selectbox("Atleta A", atletas_disponiveis, index=0, key="comp_geral_a", persist_state="session")
+    atleta_b = c2.selectbox("Atleta B", atletas_disponiveis, index=idx_b, key="comp_geral_b", persist_state="session")
+
+    if atleta_a and atleta_b:
+        dados_a = filtrar_agregado_periodo(agregados_mensais, atleta_a)
+        dados_b = filtrar_agregado_periodo(agregados_mensais, atleta_b)
+
+        comparacao = comparar_eficiencias(dados_a, dados_b)
+        teste = comparacao['teste']
+
+        c1.metric(f"Eficiência Global {atleta_a}", f"{comparacao['a']['eficiencia']:.1%}", help=formatar_ajuda_intervalo(comparacao['a']))
+        c2.metric(
+            f"Eficiência Global {atleta_b}", f"{comparacao['b']['eficiencia']:.1%}",
+            # Diferença sem significância estatística aparece em cinza
+            delta=f"{(comparacao['b']['eficiencia'] - comparacao['a']['eficiencia']):.1%}",
+            delta_color="normal" if teste['significativa'] else "off",
+            help=formatar_ajuda_intervalo(comparacao['b'])
+        )
+        st.caption(descrever_teste_diferenca(teste))
+
+        st.markdown("---")
+        st.markdown("#### Confronto por Categoria")
+
+        fig = obter_cache_figuras().obter_ou_construir(
+            'comparacao_geral',
+            calcular_chave_figura('comparacao_geral', versao_dados, atleta_a, atleta_b),
+            lambda: construir_grafico_comparacao(
+                dados_a, atleta_a, dados_b, atleta_b, title="Eficiência por Fundamento"
             )
-            fig_mes.update_yaxes(tickformat='.0%')
-            st.plotly_chart(fig_mes, use_container_width=True)
+        )
+
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(descrever_diferencas_por_categoria(comparar_por_categoria(dados_a, dados_b)))
         else:
-            st.warning("Sem dados para os filtros selecionados.")
+            st.info("Sem dados suficientes para gráfico.")
+
+def renderizar_comparacao_mensal(agregados_mensais, atletas_disponiveis, idx_b, versao_dados):
+    """Aba de comparação entre dois meses (mesmo atleta ou atletas diferentes)."""
+    st.caption("Compare o desempenho entre meses diferentes (mesmo atleta ou atletas diferentes).")
+    meses_disponiveis = sorted(agregados_mensais[COL_CHAVE_MES].dropna().unique().tolist(), reverse=True)
+
+    c1, c2 = st.columns(2)
+
+    with c1:
+        st.markdown("###### 🟦 Cenário A")
+        atleta_m_a = st.selectbox("Atleta", atletas_disponiveis, key="comp_mes_a_atl", persist_state="session")
+        mes_m_a = st.selectbox("Mês", meses_disponiveis, format_func=formatar_chave_mes, key="comp_mes_a_mes", persist_state="session")
+
+    with c2:
+        st.markdown("###### 🟥 Cenário B")
+        atleta_m_b = st.selectbox("Atleta", atletas_disponiveis, index=idx_b, key="comp_mes_b_atl", persist_state="session")
+        # Tenta pegar o mês anterior ou o mesmo se só tiver um
+        idx_mes_b = 1 if len(meses_disponiveis) > 1 else 0
+        mes_m_b = st.selectbox("Mês", meses_disponiveis, index=idx_mes_b, format_func=formatar_chave_mes, key="comp_mes_b_mes", persist_state="session")
+
+    # Filtra e Compara
+    dados_a = filtrar_agregado_periodo(agregados_mensais, atleta_m_a, COL_CHAVE_MES, mes_m_a)
+    dados_b = filtrar_agregado_periodo(agregados_mensais, atleta_m_b, COL_CHAVE_MES, mes_m_b)
+    rotulo_mes_a = formatar_chave_mes(mes_m_a)
+    rotulo_mes_b = formatar_chave_mes(mes_m_b)
+
+    comparacao = comparar_eficiencias(dados_a, dados_b)
+    eff_a, eff_b = comparacao['a']['eficiencia'], comparacao['b']['eficiencia']
+
+    kpi1, kpi2, kpi3 = st.columns(3)
+    kpi1.metric(f"{atleta_m_a} ({rotulo_mes_a})", f"{eff_a:.1%}", help=formatar_ajuda_intervalo(comparacao['a']))
+    kpi2.metric("Diferença (B - A)", f"{(eff_b - eff_a):.1%}", help=descrever_teste_diferenca(comparacao['teste']))
+    kpi3.metric(f"{atleta_m_b} ({rotulo_mes_b})", f"{eff_b:.1%}", help=formatar_ajuda_intervalo(comparacao['b']))
+    st.caption(descrever_teste_diferenca(comparacao['teste']))
+
+    if not dados_a.empty or not dados_b.empty:
+        fig_mes = obter_cache_figuras().obter_ou_construir(
+            'comparacao_mensal',
+            calcular_chave_figura('comparacao_mensal', versao_dados, atleta_m_a, mes_m_a, atleta_m_b, mes_m_b),
+            lambda: construir_grafico_comparacao(
+                dados_a, f"{atleta_m_a} ({rotulo_mes_a})", dados_b, f"{atleta_m_b} ({rotulo_mes_b})"
+            )
+        )
+        st.plotly_chart(fig_mes, use_container_width=True)
+    else:
+        st.warning("Sem dados para os filtros selecionados.")
+
+def renderizar_comparacao_diaria(agregados_diarios, atletas_disponiveis, idx_b, versao_dados):
+    """Aba de evolução diária e comparação entre dois dias."""
+    st.caption("Comparação detalhada dia a dia.")
+
+    st.markdown("#### Evolução da Eficiência")
+    atleta_serie = st.selectbox("Atleta", atletas_disponiveis, key="serie_diaria_atl", persist_state="session")
+    fig_serie = obter_cache_figuras().obter_ou_construir(
+        'serie_diaria',
+        calcular_chave_figura('serie_diaria', versao_dados, atleta_serie),
+        lambda: construir_grafico_serie_diaria(agregados_diarios, atleta_serie)
+    )
+    if fig_serie is not None:
+        st.plotly_chart(fig_serie, use_container_width=True)
+    else:
+        st.info("Sem treinos com data para este atleta.")
 
-    # --- 3. Comparação Diária ---
-    with tab_diario:
-        st.caption("Comparação detalhada dia a dia.")
-        datas_disponiveis = sorted(dados['Data'].dt.date.unique().tolist(), reverse=True)
-        
-        c1, c2 = st.columns(2)
-        with c1:
-            st.markdown("###### 🟦 Dia A")
-            atleta_d_a = st.selectbox("Atleta", atletas_disponiveis, key="comp_dia_a_atl")
-            dia_a = st.selectbox("Data", datas_disponiveis, key="comp_dia_a_dt")
-        with c2:
-            st.markdown("###### 🟥 Dia B")
-            atleta_d_b = st.selectbox("Atleta", atletas_disponiveis, index=idx_b, key="comp_dia_b_atl")
-            idx_dia_b = 1 if len(datas_disponiveis) > 1 else 0
-            dia_b = st.selectbox("Data", datas_disponiveis, index=idx_dia_b, key="comp_dia_b_dt")
-
-        dados_a = dados[(dados[COL_ATLETA] == atleta_d_a) & (dados['Data'].dt.date == dia_a)]
-        dados_b = dados[(dados[COL_ATLETA] == atleta_d_b) & (dados['Data'].dt.date == dia_b)]
-
-        eff_a = calc_eff(dados_a)
-        eff_b = calc_eff(dados_b)
-
-        kpi_d1, kpi_d2, kpi_d3 = st.columns(3)
-        kpi_d1.metric(f"Eficiência A", f"{eff_a:.1%}")
-        kpi_d2.metric("Delta", f"{(eff_b - eff_a):.1%}")
-        kpi_d3.metric(f"Eficiência B", f"{eff_b:.1%}")
-
-        st.markdown("#### Detalhes")
-        # Exibe tabelas lado a lado
-        tc1, tc2 = st.columns(2)
-        colunas_ver = ['Fundamentos', 'Quantidade correta', 'Total Calculado']
-        with tc1:
-            st.dataframe(dados_a[colunas_ver], use_container_width=True, hide_index=True)
-        with tc2:
-            st.dataframe(dados_b[colunas_ver], use_container_width=True, hide_index=True)
+    st.markdown("---")
+    datas_disponiveis = sorted(agregados_diarios[COL_CHAVE_DIA].dropna().unique().tolist(), reverse=True)
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("###### 🟦 Dia A")
+        atleta_d_a = st.selectbox("Atleta", atletas_disponiveis, key="comp_dia_a_atl", persist_state="session")
+        dia_a = st.selectbox("Data", datas_disponiveis, format_func=formatar_chave_dia, key="comp_dia_a_dt", persist_state="session")
+    with c2:
+        st.markdown("###### 🟥 Dia B")
+        atleta_d_b = st.selectbox("Atleta", atletas_disponiveis, index=idx_b, key="comp_dia_b_atl", persist_state="session")
+        idx_dia_b = 1 if len(datas_disponiveis) > 1 else 0
+        dia_b = st.selectbox("Data", datas_disponiveis, index=idx_dia_b, format_func=formatar_chave_dia, key="comp_dia_b_dt", persist_state="session")
+
+    dados_a = filtrar_agregado_periodo(agregados_diarios, atleta_d_a, COL_CHAVE_DIA, dia_a)
+    dados_b = filtrar_agregado_periodo(agregados_diarios, atleta_d_b, COL_CHAVE_DIA, dia_b)
+
+    comparacao = comparar_eficiencias(dados_a, dados_b)
+    eff_a, eff_b = comparacao['a']['eficiencia'], comparacao['b']['eficiencia']
+
+    kpi_d1, kpi_d2, kpi_d3 = st.columns(3)
+    kpi_d1.metric(f"Eficiência A", f"{eff_a:.1%}", help=formatar_ajuda_intervalo(comparacao['a']))
+    kpi_d2.metric("Delta", f"{(eff_b - eff_a):.1%}", help=descrever_teste_diferenca(comparacao['teste']))
+    kpi_d3.metric(f"Eficiência B", f"{eff_b:.1%}", help=formatar_ajuda_intervalo(comparacao['b']))
+    st.caption(descrever_teste_diferenca(comparacao['teste']))
+
+    st.markdown("#### Detalhes")
+    # Exibe tabelas lado a lado
+    tc1, tc2 = st.columns(2)
+    colunas_ver = ['Fundamentos', 'Quantidade correta', 'Total Calculado']
+    with tc1:
+        st.dataframe(dados_a[colunas_ver], use_container_width=True, hide_index=True)
+    with tc2:
+        st.dataframe(dados_b[colunas_ver], use_container_width=True, hide_index=True)
+
+# --- Lançamento de Treinos ---
+
+def listar_valores_existentes(dados, coluna) -> list:
+    """Valores já usados numa coluna, em ordem alfabética (opções dos campos do formulário)."""
+    if coluna not in dados.columns:
+        return []
+    return sorted(map(str, dados[coluna].dropna().unique()))
+
+def renderizar_lancamento_dados(servico_lancamentos, atualizador_dados, dados_carregados, atletas, atleta_padrao):
+    """
+    Formulário de lançamento de um treino (uma linha por fundamento). O registro vai para o
+    buffer local e entra no dashboard na hora; o envio à fonte segue em segundo plano.
+    """
+    st.subheader("📝 Lançamento de Treino")
+    st.caption(
+        f"Destino: {servico_lancamentos.destino.descrever()}. O lançamento aparece no dashboard "
+        "assim que é registrado e é enviado à planilha em segundo plano."
+    )
+    mensagem = st.session_state.pop("mensagem_lancamento", None)
+    if mensagem:
+        st.success(mensagem)
+
+    with st.form("formulario_lancamento"):
+        c1, c2, c3, c4 = st.columns(4)
+        data_treino = c1.date_input("Data", value=date.today(), format="DD/MM/YYYY")
+        locais = listar_valores_existentes(dados_carregados, COL_LOCAL)
+        local = c2.selectbox("Local", locais, index=None, accept_new_options=True, placeholder="Escolha ou digite")
+        atleta = c3.selectbox(
+            "Atleta", atletas, index=atletas.index(atleta_padrao) if atleta_padrao in atletas else None,
+            accept_new_options=True, placeholder="Escolha ou digite"
+        )
+        tipo = c4.selectbox("Tipo", TIPOS_TREINO)
+
+        quantidades = st.data_editor(
+            pd.DataFrame({
+                COL_FUNDAMENTOS: pd.Series(dtype=object),
+                COL_QTD_CORRETA: pd.Series(dtype='Int64'),
+                COL_QTD_ERRADA: pd.Series(dtype='Int64'),
+            }),
+            column_config={
+                COL_FUNDAMENTOS: st.column_config.SelectboxColumn(
+                    options=listar_valores_existentes(dados_carregados, COL_FUNDAMENTOS), required=True
+                ),
+                COL_QTD_CORRETA: st.column_config.NumberColumn(min_value=0, step=1, default=0),
+                COL_QTD_ERRADA: st.column_config.NumberColumn(min_value=0, step=1, default=0),
+            },
+            num_rows="dynamic", hide_index=True, use_container_width=True, key="quantidades_lancamento"
+        )
+        registrar = st.form_submit_button("Registrar lançamento", type="primary")
+
+    pendentes = servico_lancamentos.contar_pendentes()
+    if servico_lancamentos.ultimo_erro is not None:
+        st.warning(
+            f"O envio à planilha falhou ({servico_lancamentos.ultimo_erro}). {pendentes} linha(s) seguem "
+            "guardadas localmente e serão reenviadas automaticamente."
+        )
+    elif pendentes:
+        st.info(f"{pendentes} linha(s) aguardando envio à planilha.")
+
+    if not registrar:
+        return
+    try:
+        linhas = criar_linhas_lancamento(data_treino, local, atleta, tipo, quantidades)
+    except ValueError as erro:
+        st.error(str(erro))
+        return
+
+    registradas = servico_lancamentos.registrar(linhas)
+    atualizador_dados.aplicar_complemento()
+    st.session_state["mensagem_lancamento"] = f"{registradas} linha(s) registradas para {atleta.strip()} em {data_treino:%d/%m/%Y}."
+    st.rerun()
+
+# --- Painel de Performance ---
+
+def renderizar_painel_performance():
+    """Painel opcional da sidebar com os tempos, linhas e memória da execução atual."""
+    st.sidebar.markdown("---")
+    if not st.sidebar.checkbox("⏱️ Performance", key="exibir_painel_performance"):
+        return
+
+    registros = pd.DataFrame(obter_registros_execucao())
+    if registros.empty:
+        st.sidebar.caption("Nenhuma etapa medida nesta execução.")
+        return
+
+    acessos_cache = registros[registros['componente'] == COMPONENTE_CACHE]
+    for _, acesso in acessos_cache.iterrows():
+        st.sidebar.caption(f"Cache `{acesso['etapa']}`: **{acesso['resultado_cache']}** ({acesso['segundos']:.3f}s)")
+
+    etapas = registros[registros['componente'] != COMPONENTE_CACHE]
+    colunas_exibidas = ['componente', 'etapa', 'segundos', 'linhas_entrada', 'linhas_saida', 'delta_memoria_mb', 'memoria_residente_mb']
+    st.sidebar.dataframe(etapas[colunas_exibidas], use_container_width=True, hide_index=True)
 
 # --- Função Principal (Ponto de Entrada) ---
 
 
 def main():
+    iniciar_execucao()
     configurar_pagina_inicial()
     aplicar_estilos_visuais()
     
     st.title("🏐 Análise de Desempenho - Vôlei de Praia")
     st.markdown("### Dashboard Profissional de Monitoramento de Treinos")
     
-    dados_carregados = obter_dados_com_cache()
+    # Última versão pronta do dataset; só a primeira carga do processo espera pela fonte
+    atualizador_dados = obter_atualizador_dados()
+    servico_lancamentos = obter_servico_lancamentos()
+    dados_processados = atualizador_dados.obter_dados()
     
-    if dados_carregados.empty:
-        st.error("Não foi possível carregar os dados. Verifique a fonte de dados.")
+    if dados_processados.empty:
+        st.error(f"Não foi possível carregar os dados. Verifique a fonte de dados. ({atualizador_dados.ultimo_erro})")
         st.stop()
 
+    renderizar_estado_dados(atualizador_dados, dados_processados, servico_lancamentos)
+
+    versao_dados = obter_versao_dados(dados_processados)
+
+    # Os componentes leem do cubo agregado (mesmas colunas, muito menos linhas)
+    dados_carregados = obter_cubo_com_cache(versao_dados, dados_processados)
+    # Filtros e agregações dos componentes rodam no motor SQL carregado com o cubo
+    motor_consultas = obter_motor_consultas_com_cache(versao_dados, dados_carregados)
+
+    # Filtro de Atleta para o Dashboard Individual
+    # A sidebar é montada fora das abas: continua visível (e com a seleção preservada)
+    # mesmo quando só a aba de comparação é executada
+    try:
+        atletas = sorted(dados_carregados[COL_ATLETA].astype(str).unique().tolist())
+    except KeyError:
+        atletas = ["Eu"]
+        
+    if not atletas:
+         atletas = ["Eu"]
+    
+    atleta_principal = "Eu" if "Eu" in atletas else atletas[0]
+    
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 👤 Configuração Pessoal")
+    meu_atleta = st.sidebar.selectbox("Visualizar dados de:", atletas, index=atletas.index(atleta_principal) if atleta_principal in atletas else 0)
+    
+    # Filtra dados para o dashboard individual
+    # Se a coluna atleta não exitir (retrocompatibilidade), considera tudo como 'Eu'
+    atleta_filtrado = meu_atleta if COL_ATLETA in dados_carregados.columns else None
+    
+    # Aplica filtros laterais apenas nos dados do atleta selecionado
+    indice_filtros = obter_indice_filtros_com_cache(versao_dados, dados_carregados)
+    filtros_selecionados = aplicar_filtros_laterais(indice_filtros, atleta_filtrado)
+
     # --- Estrutura de Abas Principal ---
     # Cria abas para separar visão individual de comparação
-    aba_dashboard, aba_comparacao = st.tabs(["📊 Dashboard Individual", "⚔️ Comparação & Análise"])
+    rotulos_abas = ["📊 Dashboard Individual", "⚔️ Comparação & Análise"]
+    if servico_lancamentos is not None:
+        rotulos_abas.append("📝 Lançamento")
+    aba_dashboard, aba_comparacao, *abas_extras = abrir_abas(rotulos_abas, "aba_principal")
 
     # --- ABA 1: Dashboard Individual ---
-    with aba_dashboard:
-        # Filtro de Atleta para o Dashboard Individual
-        try:
-            atletas = sorted(dados_carregados[COL_ATLETA].astype(str).unique().tolist())
-        except KeyError:
-            atletas = ["Eu"]
-            
-        if not atletas:
-             atletas = ["Eu"]
-        
-        atleta_principal = "Eu" if "Eu" in atletas else atletas[0]
-        
-        st.sidebar.markdown("---")
-        st.sidebar.markdown("### 👤 Configuração Pessoal")
-        meu_atleta = st.sidebar.selectbox("Visualizar dados de:", atletas, index=atletas.index(atleta_principal) if atleta_principal in atletas else 0)
-        
-        # Filtra dados para o dashboard individual
-        # Se a coluna atleta não exitir (retrocompatibilidade), considera tudo como 'Eu'
-        if COL_ATLETA in dados_carregados.columns:
-            dados_meu_atleta = dados_carregados[dados_carregados[COL_ATLETA] == meu_atleta]
-        else:
-            dados_meu_atleta = dados_carregados
-        
-        # Aplica filtros laterais apenas nos dados do atleta selecionado
-        dados_para_exibicao = aplicar_filtros_laterais(dados_meu_atleta)
-        
-        if dados_para_exibicao.empty:
-             st.info(f"Sem dados para {meu_atleta} com os filtros atuais.")
-        else:
-            renderizar_kpis_globais(dados_para_exibicao)
-            renderizar_metricas_por_categoria(dados_para_exibicao)
-            renderizar_analise_detalhada_levantamento(dados_para_exibicao)
-            renderizar_quadrante_ataque(dados_para_exibicao)
+    if aba_esta_aberta(aba_dashboard):
+        with aba_dashboard:
+            if filtros_selecionados is None:
+                 st.info(f"Sem dados para {meu_atleta} com os filtros atuais.")
+            else:
+                renderizar_kpis_globais(motor_consultas, filtros_selecionados)
+                forma_por_categoria = preparar_forma_por_categoria(obter_indicadores_forma(dados_processados), meu_atleta)
+                renderizar_metricas_por_categoria(motor_consultas, filtros_selecionados, forma_por_categoria)
+                renderizar_analise_detalhada_levantamento(motor_consultas, filtros_selecionados, versao_dados)
+                renderizar_quadrante_ataque(motor_consultas, filtros_selecionados, versao_dados)
 
     # --- ABA 2: Comparação ---
-    with aba_comparacao:
-        # Passamos os dados COMPLETOS (sem filtro de sidebar) para a área de comparação ter liberdade
-        renderizar_area_comparacao(dados_carregados)
+    if aba_esta_aberta(aba_comparacao):
+        with aba_comparacao:
+            # Passamos os dados COMPLETOS (sem filtro de sidebar) para a área de comparação ter liberdade
+            renderizar_area_comparacao(motor_consultas, versao_dados)
+
+    # --- ABA 3: Lançamento ---
+    if abas_extras and aba_esta_aberta(abas_extras[0]):
+        with abas_extras[0]:
+            renderizar_lancamento_dados(servico_lancamentos, atualizador_dados, dados_carregados, atletas, meu_atleta)
+
+    renderizar_painel_performance()
 
 
 
@@ -0,0 +1,67 @@
+# Dataset compartilhado: gravado em Arrow IPC e remontado sem cópia, volta com os mesmos
+# valores e tipos pandas (categorias com vazios, inteiros anuláveis com e sem nulos, datas)
+# e com os `attrs` gravados.
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache_compartilhado import gravar_dataset_compartilhado, ler_dataset_compartilhado
+from dashboard_data import processar_dados_brutos, marcar_versao_dados
+from gerador_dados_sinteticos import gerar_planilha_sintetica
+
+ASSINATURA = 'fontes|regras'
+
+@pytest.fixture
+def caminho_dataset(tmp_path):
+    """Arquivo compartilhado dentro de `tmp_path`."""
+    return tmp_path / 'dataset_compartilhado.arrow'
+
+def gravar_e_ler(dados: pd.DataFrame, caminho_dataset) -> pd.DataFrame:
+    gravar_dataset_compartilhado(dados, caminho_dataset, ASSINATURA, 'v1')
+    return ler_dataset_compartilhado(caminho_dataset, ASSINATURA)
+
+def test_tipos_e_valores_voltam_iguais(caminho_dataset):
+    dados = pd.DataFrame({
+        'categoria_com_vazios': pd.Categorical(['Saque', None, 'Ataque', 'Saque', None], categories=['Ataque', 'Saque', 'Outros']),
+        'categoria_sem_vazios': pd.Categorical(['A', 'B', 'A', 'B', 'A']),
+        'int16_com_nulos': pd.array([1, None, 3, None, 5], dtype='Int16'),
+        'int16_sem_nulos': pd.array([1, 2, 3, 4, 5], dtype='Int16'),
+        'int32_com_nulos': pd.array([None, 70_000, 0, -1, None], dtype='Int32'),
+        'float_com_nan': [0.5, np.nan, 1.0, 0.25, np.nan],
+        'data': pd.to_datetime(['2024-03-01', '2024-03-02', '2024-03-02', '2025-01-31', '2024-12-31']),
+        'data_com_vazios': pd.to_datetime(['2024-03-01', None, '2024-03-02', None, '2024-12-31']),
+        'chave_dia': np.array([20240301, 20240302, 20240302, 20250131, 20241231], dtype=np.int32),
+        'texto': ['a', 'b', None, 'd', 'e'],
+    })
+
+    lidos = gravar_e_ler(dados, caminho_dataset)
+
+    pd.testing.assert_frame_equal(lidos, dados)
+
+def test_dataset_processado_volta_igual_com_attrs(caminho_dataset):
+    dados = marcar_versao_dados(processar_dados_brutos(gerar_planilha_sintetica(2_000)), 'v1')
+    dados = dados.reset_index(drop=True)
+
+    lidos = gravar_e_ler(dados, caminho_dataset)
+
+    pd.testing.assert_frame_equal(lidos, dados)
+    assert lidos.attrs == dados.attrs
+
+def test_colunas_apontam_para_o_arquivo_mapeado(caminho_dataset):
+    dados = pd.DataFrame({
+        'categoria': pd.Categorical(['Saque', 'Ataque', 'Saque']),
+        'data': pd.to_datetime(['2024-03-01', '2024-03-02', '2024-03-03']),
+    })
+
+    lidos = gravar_e_ler(dados, caminho_dataset)
+
+    # Buffers do mapeamento são somente leitura: uma cópia seria gravável
+    assert not lidos['categoria'].array.codes.flags.writeable
+    assert not lidos['data'].to_numpy().flags.writeable
+
+def test_outra_assinatura_invalida_o_arquivo(caminho_dataset):
+    dados = pd.DataFrame({'quantidade': pd.array([1, None], dtype='Int16')})
+    gravar_dataset_compartilhado(dados, caminho_dataset, ASSINATURA, 'v1')
+
+    assert ler_dataset_compartilhado(caminho_dataset, 'outra') is None
+    assert ler_dataset_compartilhado(caminho_dataset.with_name('ausente.arrow'), ASSINATURA) is None
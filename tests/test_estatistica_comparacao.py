@@ -0,0 +1,88 @@
+# Incerteza das eficiências: limites de Wilson conferidos com valores publicados (inclusive
+# grupos sem ações e proporções 0 e 1) e teste de bootstrap reprodutível pela semente.
+import numpy as np
+import pandas as pd
+import pytest
+
+import estatistica_comparacao
+from dashboard_data import COL_QTD_CORRETA, COL_TOTAL_CALCULADO
+# `testar_diferenca_bootstrap` é chamado pelo módulo: importado pelo nome, o pytest o coletaria como teste
+from estatistica_comparacao import (
+    calcular_intervalo_wilson, adicionar_intervalos_wilson, comparar_eficiencias,
+    definir_reamostragens, COL_IC_INFERIOR, COL_IC_SUPERIOR, REAMOSTRAGENS_MAXIMAS, REAMOSTRAGENS_MINIMAS
+)
+
+# Intervalo de score (Wilson, sem correção de continuidade) da Tabela I de Newcombe (1998),
+# "Two-sided confidence intervals for the single proportion", e casos simétricos com n = 10
+LIMITES_WILSON_CONHECIDOS = [
+    # (acertos, total, inferior, superior)
+    (81, 263, 0.2553, 0.3662),
+    (15, 148, 0.0624, 0.1605),
+    (0, 20, 0.0, 0.1611),
+    (1, 29, 0.0061, 0.1718),
+    (5, 10, 0.2366, 0.7634),
+    (0, 10, 0.0, 0.2775),
+    (10, 10, 0.7225, 1.0),
+]
+
+@pytest.mark.parametrize('acertos, total, inferior, superior', LIMITES_WILSON_CONHECIDOS)
+def test_intervalo_wilson_igual_aos_valores_publicados(acertos, total, inferior, superior):
+    limite_inferior, limite_superior = calcular_intervalo_wilson(acertos, total)
+
+    assert float(limite_inferior) == pytest.approx(inferior, abs=5e-5)
+    assert float(limite_superior) == pytest.approx(superior, abs=5e-5)
+
+def test_intervalo_wilson_nos_extremos():
+    inferior, superior = calcular_intervalo_wilson([0, 0, 7, 1, 0], [0, 7, 7, 1, 1])
+
+    # Sem ações: nenhuma informação
+    assert (inferior[0], superior[0]) == (0.0, 1.0)
+    # Proporção 0 fica colada em 0 e proporção 1 colada em 1, sem sair de [0, 1]
+    assert inferior[1] == 0.0 and 0.0 < superior[1] < 1.0
+    assert 0.0 < inferior[2] < 1.0 and superior[2] == 1.0
+    assert (inferior[3] + superior[4], superior[3] + inferior[4]) == pytest.approx((1.0, 1.0))
+
+def test_intervalo_wilson_vetorizado_igual_ao_calculado_por_grupo():
+    acertos = np.array([grupo[0] for grupo in LIMITES_WILSON_CONHECIDOS])
+    totais = np.array([grupo[1] for grupo in LIMITES_WILSON_CONHECIDOS])
+    tabela = pd.DataFrame({COL_QTD_CORRETA: pd.array(acertos, dtype='Int16'), COL_TOTAL_CALCULADO: pd.array(totais, dtype='Int16')})
+
+    com_intervalos = adicionar_intervalos_wilson(tabela)
+
+    for posicao, (acertos_grupo, total_grupo) in enumerate(zip(acertos, totais)):
+        inferior, superior = calcular_intervalo_wilson(acertos_grupo, total_grupo)
+        assert com_intervalos[COL_IC_INFERIOR].iloc[posicao] == float(inferior)
+        assert com_intervalos[COL_IC_SUPERIOR].iloc[posicao] == float(superior)
+
+def test_bootstrap_reprodutivel_pela_semente():
+    pares = ([50, 30, 12], [100, 100, 40], [50, 70, 20], [100, 100, 40])
+
+    primeiro = estatistica_comparacao.testar_diferenca_bootstrap(*pares, reamostragens=2_000, semente=7)
+    pd.testing.assert_frame_equal(primeiro, estatistica_comparacao.testar_diferenca_bootstrap(*pares, reamostragens=2_000, semente=7))
+    assert not primeiro[['ic_inferior', 'ic_superior']].equals(
+        estatistica_comparacao.testar_diferenca_bootstrap(*pares, reamostragens=2_000, semente=8)[['ic_inferior', 'ic_superior']]
+    )
+
+def test_bootstrap_separa_diferenca_clara_de_nenhuma_diferenca():
+    resultado = estatistica_comparacao.testar_diferenca_bootstrap([50, 30, 0], [100, 100, 0], [50, 70, 5], [100, 100, 10])
+
+    assert resultado['diferenca'].iloc[:2].tolist() == pytest.approx([0.0, 0.4])
+    assert resultado['significativa'].tolist() == [False, True, False]
+    assert resultado['ic_inferior'].iloc[1] > 0 > resultado['ic_inferior'].iloc[0]
+    # Par com um lado sem ações não é testado
+    assert resultado.iloc[2][['diferenca', 'ic_inferior', 'ic_superior', 'valor_p']].isna().all()
+
+def test_reamostragens_dentro_do_orcamento():
+    assert definir_reamostragens(1) == REAMOSTRAGENS_MAXIMAS
+    assert definir_reamostragens(1_000_000) == REAMOSTRAGENS_MINIMAS
+    assert REAMOSTRAGENS_MINIMAS <= definir_reamostragens(200) <= REAMOSTRAGENS_MAXIMAS
+
+def test_comparar_eficiencias_repete_o_resultado_entre_chamadas():
+    dados_a = pd.DataFrame({COL_QTD_CORRETA: [30, 12], COL_TOTAL_CALCULADO: [60, 20]})
+    dados_b = pd.DataFrame({COL_QTD_CORRETA: [45], COL_TOTAL_CALCULADO: [70]})
+
+    comparacao = comparar_eficiencias(dados_a, dados_b)
+
+    assert comparacao['a']['eficiencia'] == pytest.approx(42 / 80)
+    assert comparacao['b']['ic'] == tuple(float(limite) for limite in calcular_intervalo_wilson(45, 70))
+    pd.testing.assert_series_equal(comparacao['teste'], comparar_eficiencias(dados_a, dados_b)['teste'])
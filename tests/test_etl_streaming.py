@@ -0,0 +1,63 @@
+# ETL em streaming: lida em blocos, a fonte dá a mesma impressão digital e a mesma marca
+# d'água da leitura inteira (os tipos inferidos em cada bloco do CSV podem variar), e os
+# cubos parciais dobrados dão o mesmo cubo do pipeline completo em memória.
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cubo_agregado import construir_cubo_agregado, DIMENSOES_CUBO
+from dashboard_data import processar_dados_brutos, SAIDA_STREAMING_LINHAS, SAIDA_STREAMING_AGREGADOS
+from etl_streaming import processar_fonte_em_blocos, LIMITE_CUBOS_PARCIAIS
+from fontes_dados import FonteCSV
+from gerador_dados_sinteticos import gerar_planilha_sintetica, exportar_planilha_csv
+from ingestao_incremental import criar_estado_ingestao, remover_linhas_vazias_finais
+from snapshot_dados import calcular_impressao_digital
+
+@pytest.fixture
+def csv_com_tipos_variaveis(tmp_path):
+    """
+    CSV em que a inferência de tipos muda conforme o bloco: a quantidade fica vazia em
+    algumas linhas (int x float) e a observação é um número em quase todas (int x texto).
+    """
+    linhas = [
+        {'Data': f'{dia:02d}/03/2024', 'Local': 'Praia A', 'Atleta': 'Atleta 01', 'Tipo': 'Racha',
+         'Fundamentos': 'Saque - Viagem', 'Quantidade correta': None if dia % 5 == 0 else dia, 'Quantidade errada': 1,
+         'Quantidade total': None if dia % 5 == 0 else dia + 1, 'Observações': 'chuva' if dia == 9 else 2}
+        for dia in range(1, 29)
+    ]
+    caminho_csv = tmp_path / 'planilha.csv'
+    with open(caminho_csv, 'w', encoding='utf-8', newline='') as arquivo:
+        arquivo.write('Planilha de treinos\n')
+        pd.DataFrame(linhas).to_csv(arquivo, index=False)
+    return FonteCSV(Path(caminho_csv))
+
+@pytest.mark.parametrize('tamanho_bloco', [3, 4, 7, 100])
+def test_impressao_digital_em_blocos_igual_a_da_leitura_inteira(csv_com_tipos_variaveis, tamanho_bloco):
+    dados_brutos = remover_linhas_vazias_finais(csv_com_tipos_variaveis.ler_dados_brutos())
+    resultado = processar_fonte_em_blocos(csv_com_tipos_variaveis, tamanho_bloco, SAIDA_STREAMING_LINHAS)
+
+    assert resultado.impressao_digital == calcular_impressao_digital(dados_brutos)
+    assert resultado.estado_ingestao == criar_estado_ingestao(dados_brutos)
+
+def normalizar_cubo(cubo: pd.DataFrame) -> pd.DataFrame:
+    """Cubo com as dimensões em texto e ordenado por elas (a ordem das categorias unidas varia)."""
+    dimensoes = [coluna for coluna in DIMENSOES_CUBO if coluna in cubo.columns]
+    cubo = cubo.astype({coluna: str for coluna in dimensoes})
+    return cubo.sort_values(dimensoes).reset_index(drop=True)[sorted(cubo.columns)]
+
+def test_cubo_em_blocos_igual_ao_do_pipeline_completo(tmp_path):
+    tamanho_bloco = 100
+    # Poucas atletas em um ano: as células do cubo somam linhas de blocos diferentes
+    dados_brutos = gerar_planilha_sintetica(tamanho_bloco * (LIMITE_CUBOS_PARCIAIS * 2 + 3), quantidade_atletas=2, quantidade_anos=1)
+    caminho_csv = tmp_path / 'planilha.csv'
+    exportar_planilha_csv(dados_brutos, caminho_csv)
+    fonte_dados = FonteCSV(Path(caminho_csv))
+
+    # Mais blocos que o limite de cubos parciais: o acumulado é dobrado no meio da leitura
+    resultado = processar_fonte_em_blocos(fonte_dados, tamanho_bloco, SAIDA_STREAMING_AGREGADOS)
+    cubo_completo = construir_cubo_agregado(processar_dados_brutos(fonte_dados.ler_dados_brutos()))
+
+    pd.testing.assert_frame_equal(
+        normalizar_cubo(resultado.dados), normalizar_cubo(cubo_completo), check_dtype=False, check_categorical=False
+    )
@@ -0,0 +1,92 @@
+# Indicadores de forma: o estado calculado em partes e combinado é o mesmo do cálculo do
+# zero (janela das últimas sessões e somas com decaimento pela meia-vida), em qualquer
+# ordem e agrupamento das partes, inclusive com um mesmo dia dividido entre elas.
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_data import processar_dados_brutos, COL_ATLETA, COL_CATEGORIA, COL_DATA, COL_QTD_CORRETA, COL_TOTAL_CALCULADO
+from gerador_dados_sinteticos import gerar_planilha_sintetica
+from indicadores_forma import (
+    calcular_indicadores_forma, combinar_indicadores_forma, MEIA_VIDA_FORMA_DIAS, SESSOES_JANELA_FORMA
+)
+
+LINHAS_PLANILHA = 3_000
+
+@pytest.fixture(scope='module')
+def dados_processados():
+    """Planilha sintética processada, na ordem de lançamento."""
+    return processar_dados_brutos(gerar_planilha_sintetica(LINHAS_PLANILHA, quantidade_atletas=4, quantidade_anos=1))
+
+def montar_sessoes(*sessoes) -> pd.DataFrame:
+    """Linhas de uma atleta em Saque a partir de (data, acertos, total)."""
+    return pd.DataFrame({
+        COL_ATLETA: 'Atleta 01',
+        COL_CATEGORIA: 'Saque',
+        COL_DATA: pd.to_datetime([data for data, _, _ in sessoes]),
+        COL_QTD_CORRETA: [acertos for _, acertos, _ in sessoes],
+        COL_TOTAL_CALCULADO: [total for _, _, total in sessoes],
+    })
+
+def indexar_registros(estado_forma: dict) -> dict:
+    return {(registro['atleta'], registro['categoria']): registro for registro in estado_forma['registros']}
+
+def assert_estados_iguais(estado_obtido: dict, estado_esperado: dict):
+    registros_obtidos = indexar_registros(estado_obtido)
+    registros_esperados = indexar_registros(estado_esperado)
+    assert registros_obtidos.keys() == registros_esperados.keys()
+    for chave, esperado in registros_esperados.items():
+        obtido = registros_obtidos[chave]
+        assert obtido['janela'] == esperado['janela'], chave
+        assert obtido['dia_referencia'] == esperado['dia_referencia'], chave
+        assert obtido['acertos_ponderados'] == pytest.approx(esperado['acertos_ponderados'], rel=1e-12), chave
+        assert obtido['total_ponderado'] == pytest.approx(esperado['total_ponderado'], rel=1e-12), chave
+
+def test_decaimento_pela_meia_vida_entre_sessoes():
+    sessoes = montar_sessoes(('2024-03-01', 10, 20), ('2024-03-01', 2, 4), ('2024-03-15', 5, 10))
+    dia_referencia = (pd.Timestamp('2024-03-15') - pd.Timestamp('1970-01-01')).days
+    fator = 0.5 ** (14 / MEIA_VIDA_FORMA_DIAS)
+
+    esperado = {
+        'janela': [[dia_referencia - 14, 12, 24], [dia_referencia, 5, 10]],
+        'acertos_ponderados': pytest.approx(12 * fator + 5),
+        'total_ponderado': pytest.approx(24 * fator + 10),
+        'dia_referencia': dia_referencia,
+    }
+    # Do zero, e com o dia mais antigo calculado antes e trazido ao novo dia de referência
+    for estado_forma in [
+        calcular_indicadores_forma(sessoes),
+        combinar_indicadores_forma(calcular_indicadores_forma(sessoes.iloc[:2]), calcular_indicadores_forma(sessoes.iloc[2:])),
+    ]:
+        (registro,) = estado_forma['registros']
+        assert {chave: registro[chave] for chave in esperado} == esperado
+
+def test_janela_fica_com_as_ultimas_sessoes():
+    sessoes = montar_sessoes(*[(f'2024-03-{dia:02d}', dia, 2 * dia) for dia in range(1, 11)])
+    combinado = combinar_indicadores_forma(*[calcular_indicadores_forma(sessoes.iloc[[posicao]]) for posicao in range(10)])
+
+    (registro,) = combinado['registros']
+    assert [acertos for _, acertos, _ in registro['janela']] == list(range(11 - SESSOES_JANELA_FORMA, 11))
+    assert_estados_iguais(combinado, calcular_indicadores_forma(sessoes))
+
+@pytest.mark.parametrize('quantidade_partes', [2, 7, 40])
+def test_combinar_partes_igual_ao_calculo_do_zero(dados_processados, quantidade_partes):
+    # Partes na ordem de lançamento: um mesmo dia cai em partes diferentes e há linhas retroativas
+    partes = np.array_split(np.arange(len(dados_processados)), quantidade_partes)
+    estado_combinado = calcular_indicadores_forma(dados_processados.iloc[partes[0]])
+    for posicoes in partes[1:]:
+        estado_combinado = combinar_indicadores_forma(estado_combinado, calcular_indicadores_forma(dados_processados.iloc[posicoes]))
+
+    assert_estados_iguais(estado_combinado, calcular_indicadores_forma(dados_processados))
+
+def test_combinacao_e_associativa_e_comutativa(dados_processados):
+    embaralhados = dados_processados.sample(frac=1, random_state=7)
+    terco = len(embaralhados) // 3
+    estado_a, estado_b, estado_c = [
+        calcular_indicadores_forma(parte) for parte in (embaralhados.iloc[:terco], embaralhados.iloc[terco:2 * terco], embaralhados.iloc[2 * terco:])
+    ]
+    esperado = calcular_indicadores_forma(dados_processados)
+
+    assert_estados_iguais(combinar_indicadores_forma(combinar_indicadores_forma(estado_a, estado_b), estado_c), esperado)
+    assert_estados_iguais(combinar_indicadores_forma(estado_a, combinar_indicadores_forma(estado_b, estado_c)), esperado)
+    assert_estados_iguais(combinar_indicadores_forma(estado_c, estado_a, estado_b), esperado)
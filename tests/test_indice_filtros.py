@@ -0,0 +1,52 @@
+# Índice de filtros: montado sobre o cubo, as contagens das opções somam as ações das
+# células e batem com o total de ações das linhas processadas no mesmo recorte.
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from cubo_agregado import construir_cubo_agregado
+from dashboard_data import processar_dados_brutos, COL_ATLETA, COL_CATEGORIA, COL_DATA, COL_FUNDAMENTOS, COL_TIPO, COL_TOTAL_CALCULADO
+from gerador_dados_sinteticos import gerar_planilha_sintetica
+from indice_filtros import construir_indice_filtros, ConsultaFiltros
+
+COLUNAS_FILTRAVEIS = [COL_ATLETA, COL_TIPO, COL_CATEGORIA, COL_FUNDAMENTOS]
+DATA_INICIO, DATA_FIM = date(2024, 3, 1), date(2024, 8, 31)
+
+@pytest.fixture(scope='module')
+def dados_processados():
+    """Planilha sintética processada (linhas, não células do cubo)."""
+    return processar_dados_brutos(gerar_planilha_sintetica(20_000, quantidade_atletas=3, quantidade_anos=2))
+
+@pytest.fixture(scope='module')
+def cubo(dados_processados):
+    """Cubo agregado das linhas processadas."""
+    return construir_cubo_agregado(dados_processados)
+
+def somar_acoes_por_valor(dados: pd.DataFrame, coluna: str) -> dict:
+    totais = dados.groupby(coluna, observed=True)[COL_TOTAL_CALCULADO].sum()
+    return {valor: int(total) for valor, total in totais.items()}
+
+def test_contagens_somam_as_acoes_das_celulas(dados_processados, cubo):
+    consulta = ConsultaFiltros(construir_indice_filtros(cubo, COLUNAS_FILTRAVEIS, COL_TOTAL_CALCULADO))
+    consulta.restringir_datas(DATA_INICIO, DATA_FIM)
+    consulta.restringir(COL_TIPO, ['Racha'])
+
+    datas = dados_processados[COL_DATA]
+    recorte = dados_processados[(datas >= pd.Timestamp(DATA_INICIO)) & (datas <= pd.Timestamp(DATA_FIM))]
+    recorte = recorte[recorte[COL_TIPO] == 'Racha']
+    for coluna in [COL_ATLETA, COL_CATEGORIA, COL_FUNDAMENTOS]:
+        assert consulta.contar_opcoes(coluna) == somar_acoes_por_valor(recorte, coluna)
+
+def test_contagens_iguais_sobre_o_cubo_e_sobre_as_linhas(dados_processados, cubo):
+    contagens = []
+    for dados in (cubo, dados_processados):
+        consulta = ConsultaFiltros(construir_indice_filtros(dados, COLUNAS_FILTRAVEIS, COL_TOTAL_CALCULADO))
+        consulta.restringir(COL_CATEGORIA, ['Saque', 'Recepção'])
+        contagens.append(consulta.contar_opcoes(COL_FUNDAMENTOS))
+
+    assert contagens[0] == contagens[1]
+    # Sem a medida, o cubo contaria células, bem menos que as ações
+    consulta_celulas = ConsultaFiltros(construir_indice_filtros(cubo, COLUNAS_FILTRAVEIS))
+    consulta_celulas.restringir(COL_CATEGORIA, ['Saque', 'Recepção'])
+    assert sum(consulta_celulas.contar_opcoes(COL_FUNDAMENTOS).values()) < sum(contagens[0].values())
@@ -0,0 +1,78 @@
+# Ingestão incremental: linhas acrescentadas são processadas sem reprocessar o histórico,
+# e qualquer edição no histórico já ingerido força a ressincronização completa.
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import dashboard_data
+from dashboard_data import COL_QTD_CORRETA, COL_QTD_ERRADA, COL_QTD_TOTAL
+from fontes_dados import FonteCSV
+from gerador_dados_sinteticos import gerar_planilha_sintetica, exportar_planilha_csv
+from ingestao_incremental import historico_esta_intacto, criar_estado_ingestao
+from snapshot_dados import carregar_snapshot, expirar_snapshot
+
+LINHAS_PLANILHA = 2_000
+
+@pytest.fixture
+def fonte_com_snapshot(tmp_path, monkeypatch):
+    """Fonte CSV já ingerida: snapshot gravado em `tmp_path` e expirado (a próxima carga confere a fonte)."""
+    caminho_csv = tmp_path / 'planilha.csv'
+    caminho_snapshot = tmp_path / 'snapshot.parquet'
+    exportar_planilha_csv(gerar_planilha_sintetica(LINHAS_PLANILHA), caminho_csv)
+    monkeypatch.setattr(dashboard_data, 'CAMINHO_SNAPSHOT', tmp_path / 'dados_processados.parquet')
+    monkeypatch.setattr(dashboard_data, 'obter_caminho_snapshot', lambda fonte_dados: caminho_snapshot)
+
+    fonte_dados = FonteCSV(Path(caminho_csv))
+    dashboard_data.carregar_dados_fonte(fonte_dados)
+    expirar_snapshot(caminho_snapshot)
+    return fonte_dados, caminho_snapshot
+
+def reescrever_csv(fonte_dados, alterar):
+    """Lê o CSV da fonte, aplica `alterar` aos dados crus e grava de volta no mesmo layout."""
+    dados_brutos = fonte_dados.ler_dados_brutos()
+    exportar_planilha_csv(alterar(dados_brutos), fonte_dados.caminho)
+
+def somar_acertos(dados: pd.DataFrame) -> int:
+    return int(dados[COL_QTD_CORRETA].sum())
+
+def test_linhas_acrescentadas_entram_sem_ressincronizar(fonte_com_snapshot, monkeypatch):
+    fonte_dados, caminho_snapshot = fonte_com_snapshot
+    linha_nova = {
+        'Data': '01/02/2026', 'Local': 'Iracema', 'Atleta': 'Atleta 01', 'Tipo': 'Racha',
+        'Fundamentos': 'Saque - Viagem', COL_QTD_CORRETA: 9, COL_QTD_ERRADA: 1, COL_QTD_TOTAL: 10,
+    }
+    reescrever_csv(fonte_dados, lambda dados: pd.concat([dados, pd.DataFrame([linha_nova])], ignore_index=True))
+    monkeypatch.setattr(dashboard_data, 'recarregar_dados_completos', lambda *args: pytest.fail("ressincronização inesperada"))
+
+    antes = carregar_snapshot(caminho_snapshot).dados
+    dados = dashboard_data.carregar_dados_fonte(fonte_dados)
+
+    assert len(dados) == len(antes) + 1
+    assert somar_acertos(dados) == somar_acertos(antes) + 9
+    assert carregar_snapshot(caminho_snapshot).estado_ingestao.linhas_ingeridas == LINHAS_PLANILHA + 1
+
+def test_edicao_no_meio_do_historico_forca_ressincronizacao(fonte_com_snapshot):
+    fonte_dados, caminho_snapshot = fonte_com_snapshot
+    posicao_editada = LINHAS_PLANILHA // 2
+
+    def editar_linha_do_meio(dados):
+        dados.loc[posicao_editada, COL_QTD_CORRETA] = dados.loc[posicao_editada, COL_QTD_CORRETA] + 100
+        dados.loc[posicao_editada, COL_QTD_TOTAL] = dados.loc[posicao_editada, COL_QTD_TOTAL] + 100
+        return dados
+
+    reescrever_csv(fonte_dados, editar_linha_do_meio)
+    snapshot = carregar_snapshot(caminho_snapshot)
+    assert not historico_esta_intacto(snapshot.estado_ingestao, fonte_dados.ler_dados_brutos())
+    assert dashboard_data.atualizar_dados_incrementalmente(snapshot, fonte_dados) is None
+
+    # A carga cai na ressincronização completa e passa a refletir a edição
+    dados = dashboard_data.carregar_dados_fonte(fonte_dados)
+    esperado = dashboard_data.processar_dados_brutos(fonte_dados.ler_dados_brutos())
+    assert somar_acertos(dados) == somar_acertos(esperado)
+    assert carregar_snapshot(caminho_snapshot).estado_ingestao == criar_estado_ingestao(fonte_dados.ler_dados_brutos())
+
+def test_linha_apagada_no_historico_forca_ressincronizacao(fonte_com_snapshot):
+    fonte_dados, caminho_snapshot = fonte_com_snapshot
+    reescrever_csv(fonte_dados, lambda dados: dados.drop(index=10).reset_index(drop=True))
+    assert dashboard_data.atualizar_dados_incrementalmente(carregar_snapshot(caminho_snapshot), fonte_dados) is None
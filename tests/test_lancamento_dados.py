@@ -0,0 +1,142 @@
+# Lançamentos pelo app: buffer write-ahead (fsync antes de confirmar), envio em lotes com
+# espera exponencial após falhas, baixa só dos enviados e complemento do dataset servido
+# separado pelo instante da leitura da fonte.
+import json
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import dashboard_data
+import lancamento_dados
+from dashboard_data import COL_FUNDAMENTOS, COL_QTD_CORRETA, COL_QTD_ERRADA
+from fontes_dados import FonteCSV, DestinoCSV, DestinoMemoria
+from gerador_dados_sinteticos import gerar_planilha_sintetica, exportar_planilha_csv
+from lancamento_dados import (
+    BufferLancamentos, ServicoLancamentos, criar_linhas_lancamento,
+    ESPERA_INICIAL_REENVIO_SEGUNDOS, ESPERA_MAXIMA_REENVIO_SEGUNDOS, RETENCAO_LANCAMENTOS_ENVIADOS_SEGUNDOS
+)
+from snapshot_dados import expirar_snapshot
+
+LINHAS_PLANILHA = 500
+
+def montar_linhas(quantidade: int, acertos: int = 7, erros: int = 3) -> list:
+    """`quantidade` linhas de lançamento (um fundamento cada) para a mesma atleta."""
+    quantidades = pd.DataFrame({COL_FUNDAMENTOS: ['Saque - Viagem'], COL_QTD_CORRETA: [acertos], COL_QTD_ERRADA: [erros]})
+    return [
+        linha for _ in range(quantidade)
+        for linha in criar_linhas_lancamento(date(2026, 2, 1), 'Iracema', 'Atleta 01', 'Racha', quantidades)
+    ]
+
+@pytest.fixture
+def fonte_csv(tmp_path, monkeypatch):
+    """Planilha CSV como única fonte configurada, com snapshots e travas em `tmp_path`."""
+    caminho_csv = tmp_path / 'planilha.csv'
+    exportar_planilha_csv(gerar_planilha_sintetica(LINHAS_PLANILHA), caminho_csv)
+    fonte_dados = FonteCSV(Path(caminho_csv))
+    monkeypatch.setattr(dashboard_data, 'CAMINHO_SNAPSHOT', tmp_path / 'dados_processados.parquet')
+    monkeypatch.setattr(dashboard_data, 'obter_caminho_snapshot', lambda fonte: tmp_path / 'snapshot.parquet')
+    monkeypatch.setattr(dashboard_data, 'obter_fontes_configuradas', lambda nomes_abas: [fonte_dados])
+    return fonte_dados
+
+@pytest.fixture
+def servico_memoria(tmp_path, fonte_csv):
+    """Serviço com destino em memória (nada é escrito na planilha)."""
+    return ServicoLancamentos(fonte_csv, DestinoMemoria(), BufferLancamentos(tmp_path / 'lancamentos.jsonl'), tamanho_lote=2)
+
+def somar_acertos(dados: pd.DataFrame) -> int:
+    return int(dados[COL_QTD_CORRETA].sum())
+
+def test_registro_e_gravado_com_fsync_antes_de_retornar(tmp_path, monkeypatch):
+    buffer = BufferLancamentos(tmp_path / 'lancamentos.jsonl')
+    sincronizados = []
+    monkeypatch.setattr(lancamento_dados.os, 'fsync', lambda descritor: sincronizados.append(buffer.caminho.read_text()))
+
+    registros = buffer.registrar(montar_linhas(2))
+
+    # O fsync vê o arquivo já com as duas linhas, na ordem do lançamento
+    assert len(sincronizados) == 1
+    assert [json.loads(texto)['id'] for texto in sincronizados[0].splitlines()] == [registro['id'] for registro in registros]
+    assert buffer.listar_pendentes() == registros
+
+def test_linha_truncada_e_ignorada_sem_emendar_no_proximo_registro(tmp_path):
+    buffer = BufferLancamentos(tmp_path / 'lancamentos.jsonl')
+    buffer.registrar(montar_linhas(1))
+    with open(buffer.caminho, 'a', encoding='utf-8') as arquivo:
+        arquivo.write('{"id": "interrompido"')
+
+    registros = buffer.registrar(montar_linhas(1))
+
+    assert [registro['id'] for registro in buffer.listar_pendentes()][-1] == registros[0]['id']
+    assert buffer.contar_pendentes() == 2
+
+def test_envio_em_lotes_ate_esvaziar_o_buffer(servico_memoria):
+    envios = []
+    servico_memoria.ao_enviar = lambda: envios.append(True)
+    servico_memoria.registrar(montar_linhas(5))
+
+    assert servico_memoria.enviar_pendentes() == 5
+    assert [len(lote) for lote in servico_memoria.destino.lotes_recebidos] == [2, 2, 1]
+    assert servico_memoria.contar_pendentes() == 0
+    assert envios == [True]
+
+def test_falha_no_envio_mantem_pendentes_e_dobra_a_espera(servico_memoria):
+    servico_memoria.destino.falhas_simuladas = 20
+    servico_memoria.registrar(montar_linhas(3))
+
+    esperas = []
+    for _ in range(12):
+        assert servico_memoria.enviar_pendentes() == 0
+        esperas.append(servico_memoria.calcular_espera())
+    assert servico_memoria.contar_pendentes() == 3
+    assert esperas[:3] == [ESPERA_INICIAL_REENVIO_SEGUNDOS, 2 * ESPERA_INICIAL_REENVIO_SEGUNDOS, 4 * ESPERA_INICIAL_REENVIO_SEGUNDOS]
+    assert esperas[-1] == ESPERA_MAXIMA_REENVIO_SEGUNDOS
+
+    # A primeira escrita aceita zera a espera e dá baixa em tudo
+    servico_memoria.destino.falhas_simuladas = 0
+    assert servico_memoria.enviar_pendentes() == 3
+    assert servico_memoria.calcular_espera() == servico_memoria.intervalo_segundos
+    assert servico_memoria.ultimo_erro is None
+
+def test_marcar_enviados_so_da_baixa_nos_registros_enviados(tmp_path):
+    buffer = BufferLancamentos(tmp_path / 'lancamentos.jsonl')
+    registros = buffer.registrar(montar_linhas(3))
+    buffer.marcar_enviados({registros[0]['id']}, instante_envio=1_000.0)
+
+    assert [registro['id'] for registro in buffer.listar_pendentes()] == [registros[1]['id'], registros[2]['id']]
+    assert buffer.contar_pendentes() == 2
+    # O enviado continua no buffer: nenhuma leitura posterior ao envio foi vista
+    assert len(buffer.listar_fora_da_fonte(None)) == 3
+    assert [registro['id'] for registro in buffer.listar_fora_da_fonte(1_000.0)] == [registros[1]['id'], registros[2]['id']]
+
+def test_enviado_so_sai_do_buffer_apos_retencao_e_leitura_posterior(tmp_path):
+    buffer = BufferLancamentos(tmp_path / 'lancamentos.jsonl')
+    antigo, recente = buffer.registrar(montar_linhas(2))
+    buffer.marcar_enviados({antigo['id']}, instante_envio=1_000.0)
+    depois_da_retencao = 1_000.0 + RETENCAO_LANCAMENTOS_ENVIADOS_SEGUNDOS + 1
+
+    # Retenção vencida, mas nenhuma leitura da fonte trouxe o enviado: ele fica
+    buffer.marcar_enviados({recente['id']}, instante_envio=depois_da_retencao, instante_leitura_visto=999.0)
+    assert {registro['id'] for registro in buffer.listar_fora_da_fonte(None)} == {antigo['id'], recente['id']}
+
+    buffer.marcar_enviados(set(), instante_envio=depois_da_retencao, instante_leitura_visto=1_001.0)
+    assert [registro['id'] for registro in buffer.listar_fora_da_fonte(None)] == [recente['id']]
+
+def test_complemento_separa_linhas_pelo_instante_da_leitura(tmp_path, fonte_csv):
+    servico = ServicoLancamentos(fonte_csv, DestinoCSV(fonte_csv.caminho), BufferLancamentos(tmp_path / 'lancamentos.jsonl'))
+    dados_antes = dashboard_data.montar_dados_processados()
+    acertos_antes = somar_acertos(dados_antes)
+
+    servico.registrar(montar_linhas(1, acertos=7))
+    assert somar_acertos(servico.complementar_dados(dados_antes)) == acertos_antes + 7
+
+    # Enviado à planilha: o dataset lido antes do envio ainda precisa do complemento
+    assert servico.enviar_pendentes() == 1
+    assert somar_acertos(servico.complementar_dados(dados_antes)) == acertos_antes + 7
+
+    # Uma leitura posterior já traz a linha da fonte, e o complemento não a repete
+    expirar_snapshot(tmp_path / 'snapshot.parquet')
+    dados_depois = dashboard_data.montar_dados_processados()
+    assert somar_acertos(dados_depois) == acertos_antes + 7
+    assert somar_acertos(servico.complementar_dados(dados_depois)) == acertos_antes + 7
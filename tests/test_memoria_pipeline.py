@@ -0,0 +1,141 @@
+# Memória do pipeline de dados: com o copy-on-write do pandas nenhuma etapa de
+# `processar_dados_brutos` precisa de cópias defensivas, então o pico de cada uma fica
+# abaixo de um múltiplo do tamanho dos dados crus. Também confere que o pipeline não
+# altera os dados crus e que a preparação dos componentes visuais não altera as
+# estruturas compartilhadas entre sessões (cubo e agregados por período): uma atribuição
+# de coluna no objeto errado mudaria o cache de todos.
+import ctypes
+import ctypes.util
+import gc
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from cubo_agregado import construir_cubo_agregado
+from dashboard_data import (
+    limpar_e_padronizar_dados, aplicar_regras_negocio_volei, calcular_metricas_performance, calcular_chaves_periodo,
+    MotorConsultas, FiltrosConsulta, COL_ATLETA, COL_CHAVE_DIA, COL_CHAVE_MES
+)
+from gerador_dados_sinteticos import gerar_planilha_sintetica
+from instrumentacao import (
+    iniciar_execucao, obter_registros_execucao, ativar_medicao_pico, medir_memoria_processo_mb, medir_memoria_dados_mb
+)
+from preparacao_visualizacoes import (
+    preparar_kpis_globais, preparar_metricas_por_categoria, preparar_resumo_ataque, preparar_resumo_levantamento,
+    construir_agregados_periodo, filtrar_agregado_periodo, preparar_dados_grafico_categoria,
+    preparar_serie_eficiencia_diaria
+)
+
+LINHAS_PLANILHA = 100_000
+LINHAS_AQUECIMENTO = 1_000
+# Memória além da residente no início de cada etapa, em múltiplos do tamanho dos dados crus
+LIMITE_PICO_RELATIVO = 1.0
+# Mais uma folga fixa: os alocadores reservam memória em blocos de alguns MB, o que pesa
+# no pico de planilhas pequenas independentemente do número de linhas
+FOLGA_PICO_MB = 8.0
+
+# Etapas de `processar_dados_brutos`, na ordem
+ETAPAS_PIPELINE = [limpar_e_padronizar_dados, aplicar_regras_negocio_volei, calcular_metricas_performance, calcular_chaves_periodo]
+
+def liberar_memoria_livre():
+    """Coleta o lixo e devolve ao sistema a memória livre do malloc (glibc) e do pool do Arrow."""
+    gc.collect()
+    pa.default_memory_pool().release_unused()
+    biblioteca_c = ctypes.util.find_library('c')
+    if biblioteca_c:
+        try:
+            ctypes.CDLL(biblioteca_c).malloc_trim(0)
+        except (OSError, AttributeError):  # Outra libc (ex: macOS) não tem malloc_trim
+            pass
+
+def calcular_assinatura(dados: pd.DataFrame) -> tuple:
+    """Colunas, tipos e hash do conteúdo: muda com qualquer alteração do DataFrame."""
+    return (
+        tuple(dados.columns), tuple(map(str, dados.dtypes)),
+        int(pd.util.hash_pandas_object(dados, index=True).sum())
+    )
+
+def medir_pipeline(dados_brutos: pd.DataFrame) -> tuple:
+    """
+    Roda o pipeline e mede a memória de cada etapa (o pico de cada uma é relativo à
+    memória residente no seu início).
+
+    Returns:
+        tuple: (dados processados, etapas medidas).
+    """
+    # Uma passada sobre poucas linhas antes da medição: a inicialização única das
+    # bibliotecas (módulos carregados sob demanda, caches) não entra no pico das etapas
+    dados_aquecimento = dados_brutos.head(LINHAS_AQUECIMENTO)
+    for etapa in ETAPAS_PIPELINE:
+        dados_aquecimento = etapa(dados_aquecimento)
+
+    dados, etapas = dados_brutos, []
+    for etapa in ETAPAS_PIPELINE:
+        liberar_memoria_livre()
+        memoria_inicial_mb = medir_memoria_processo_mb()
+        iniciar_execucao()
+        dados = etapa(dados)
+        registro = obter_registros_execucao()[-1]
+        if registro.get('pico_memoria_mb') is not None and memoria_inicial_mb is not None:
+            etapas.append({**registro, 'pico_extra_mb': registro['pico_memoria_mb'] - memoria_inicial_mb})
+    return dados, etapas
+
+def verificar_preparacoes_sem_mutacao(dados: pd.DataFrame) -> list:
+    """
+    Roda as preparações dos componentes sobre o cubo e os agregados por período.
+
+    Returns:
+        list: Nomes das estruturas compartilhadas que foram alteradas (vazia se nenhuma).
+    """
+    cubo = construir_cubo_agregado(dados)
+    motor_consultas = MotorConsultas(cubo)
+    agregados = {
+        'agregados_mensais': construir_agregados_periodo(motor_consultas, COL_CHAVE_MES),
+        'agregados_diarios': construir_agregados_periodo(motor_consultas, COL_CHAVE_DIA, True),
+    }
+    compartilhados = {'cubo': cubo, **agregados}
+    assinaturas = {nome: calcular_assinatura(tabela) for nome, tabela in compartilhados.items()}
+
+    atleta = str(cubo[COL_ATLETA].iloc[0])
+    filtros = FiltrosConsulta(valores_por_coluna={COL_ATLETA: [atleta]})
+    preparar_kpis_globais(motor_consultas, filtros)
+    preparar_metricas_por_categoria(motor_consultas, filtros)
+    preparar_resumo_ataque(motor_consultas, filtros)
+    preparar_resumo_levantamento(motor_consultas, filtros)
+    preparar_dados_grafico_categoria(filtrar_agregado_periodo(agregados['agregados_mensais'], atleta), atleta)
+    preparar_serie_eficiencia_diaria(agregados['agregados_diarios'], atleta)
+
+    return [nome for nome, tabela in compartilhados.items() if calcular_assinatura(tabela) != assinaturas[nome]]
+
+@pytest.fixture
+def medicao_pico():
+    """Liga a medição do pico só durante o teste (as etapas rodam uma por vez aqui)."""
+    ativar_medicao_pico()
+    yield
+    ativar_medicao_pico(False)
+
+def test_pico_das_etapas_abaixo_do_limite(medicao_pico):
+    dados_brutos = gerar_planilha_sintetica(LINHAS_PLANILHA)
+    tamanho_brutos_mb = medir_memoria_dados_mb(dados_brutos)
+    _, etapas = medir_pipeline(dados_brutos)
+    if not etapas:
+        pytest.skip("pico de memória indisponível nesta plataforma (requer /proc/self/clear_refs)")
+
+    limite_mb = LIMITE_PICO_RELATIVO * tamanho_brutos_mb + FOLGA_PICO_MB
+    picos_acima = {etapa['etapa']: round(etapa['pico_extra_mb'], 1) for etapa in etapas if etapa['pico_extra_mb'] > limite_mb}
+    assert not picos_acima, f"pico acima de {limite_mb:.1f} MB (crus: {tamanho_brutos_mb:.1f} MB)"
+
+def test_pipeline_nao_altera_dados_crus():
+    dados_brutos = gerar_planilha_sintetica(LINHAS_AQUECIMENTO * 10)
+    assinatura_brutos = calcular_assinatura(dados_brutos)
+    dados = dados_brutos
+    for etapa in ETAPAS_PIPELINE:
+        dados = etapa(dados)
+    assert calcular_assinatura(dados_brutos) == assinatura_brutos
+
+def test_preparacoes_nao_alteram_estruturas_compartilhadas():
+    dados = gerar_planilha_sintetica(LINHAS_AQUECIMENTO * 10)
+    for etapa in ETAPAS_PIPELINE:
+        dados = etapa(dados)
+    assert verificar_preparacoes_sem_mutacao(dados) == []
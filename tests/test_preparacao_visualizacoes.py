@@ -0,0 +1,41 @@
+# Redução da série diária por LTTB: primeiro e último ponto mantidos, exatamente
+# `limite_pontos` posições crescentes, série que já cabe no limite devolvida inteira e
+# picos e vales isolados preservados.
+import numpy as np
+import pytest
+
+from preparacao_visualizacoes import selecionar_pontos_lttb
+
+@pytest.fixture
+def serie_ruidosa():
+    """Mil dias de eficiência com ruído em torno de 60%."""
+    gerador = np.random.default_rng(3)
+    return np.arange(1_000, dtype=np.float64), np.clip(0.6 + 0.1 * gerador.standard_normal(1_000), 0, 1)
+
+@pytest.mark.parametrize('limite_pontos', [3, 4, 10, 300, 999])
+def test_mantem_extremos_e_devolve_o_limite_de_pontos(serie_ruidosa, limite_pontos):
+    eixo_x, eixo_y = serie_ruidosa
+
+    posicoes = selecionar_pontos_lttb(eixo_x, eixo_y, limite_pontos)
+
+    assert len(posicoes) == limite_pontos
+    assert posicoes[0] == 0 and posicoes[-1] == len(eixo_x) - 1
+    assert np.all(np.diff(posicoes) > 0)
+
+@pytest.mark.parametrize('quantidade, limite_pontos', [(0, 300), (1, 300), (3, 3), (50, 300), (300, 300)])
+def test_serie_dentro_do_limite_volta_inteira(quantidade, limite_pontos):
+    eixo_x = np.arange(quantidade, dtype=np.float64)
+
+    posicoes = selecionar_pontos_lttb(eixo_x, np.sin(eixo_x), limite_pontos)
+
+    np.testing.assert_array_equal(posicoes, np.arange(quantidade))
+
+def test_pico_e_vale_isolados_sao_preservados(serie_ruidosa):
+    eixo_x, eixo_y = serie_ruidosa
+    eixo_y = eixo_y.copy()
+    eixo_y[417] = 1.0
+    eixo_y[702] = 0.0
+
+    posicoes = selecionar_pontos_lttb(eixo_x, eixo_y, 50)
+
+    assert 417 in posicoes and 702 in posicoes
@@ -0,0 +1,83 @@
+# Motor de regras de negócio: a primeira regra que casar decide a ação, regras inválidas
+# são recusadas na compilação, e a tabela padrão corrige os dados exatamente como a
+# sequência de if/else que ela substituiu.
+import json
+
+import pandas as pd
+import pytest
+
+from configuracoes import REGRAS_NEGOCIO_VOLEI
+from dashboard_data import (
+    limpar_e_padronizar_dados, aplicar_regras_negocio_volei,
+    COL_FUNDAMENTOS, COL_QTD_CORRETA, COL_QTD_ERRADA, COL_QTD_TOTAL,
+    CASO_LEVANTAMENTO_BOM, CASOS_LEVANTAMENTO_ERRO_FATAL, PREFIXO_ATAQUE, TEXTO_LEVANTAMENTO
+)
+from gerador_dados_sinteticos import gerar_planilha_sintetica
+from regras_negocio import (
+    compilar_regras_negocio, carregar_regras_negocio, calcular_assinatura_regras, resolver_acoes_fundamentos,
+    ACAO_NENHUMA, ACAO_FORCAR_ACERTO, ACAO_FORCAR_ERRO, ACAO_REMOVER_TOTALIZADOR, REGRAS_NEGOCIO
+)
+
+LINHAS_PLANILHA = 5_000
+
+def aplicar_regras_if_else(dados: pd.DataFrame) -> pd.DataFrame:
+    """As regras como eram escritas antes da tabela declarativa (referência do teste)."""
+    dados = dados.copy()
+    filtro_lev_bom = dados[COL_FUNDAMENTOS] == CASO_LEVANTAMENTO_BOM
+    dados.loc[filtro_lev_bom, COL_QTD_CORRETA] = dados.loc[filtro_lev_bom, COL_QTD_TOTAL]
+    dados.loc[filtro_lev_bom, COL_QTD_ERRADA] = 0
+
+    filtro_lev_erro = dados[COL_FUNDAMENTOS].isin(CASOS_LEVANTAMENTO_ERRO_FATAL)
+    dados.loc[filtro_lev_erro, COL_QTD_CORRETA] = 0
+    dados.loc[filtro_lev_erro, COL_QTD_ERRADA] = dados.loc[filtro_lev_erro, COL_QTD_TOTAL]
+
+    return dados[~dados[COL_FUNDAMENTOS].isin([TEXTO_LEVANTAMENTO, PREFIXO_ATAQUE])]
+
+@pytest.mark.parametrize('esquema_compacto', [True, False])
+def test_tabela_padrao_igual_ao_if_else_substituido(esquema_compacto):
+    dados = limpar_e_padronizar_dados(gerar_planilha_sintetica(LINHAS_PLANILHA), esquema_compacto=esquema_compacto)
+
+    corrigidos = aplicar_regras_negocio_volei(dados)
+
+    # A planilha sintética tem linhas de todas as regras
+    assert len(corrigidos) < len(dados)
+    assert dados[COL_FUNDAMENTOS].isin([CASO_LEVANTAMENTO_BOM, *CASOS_LEVANTAMENTO_ERRO_FATAL]).any()
+    pd.testing.assert_frame_equal(corrigidos, aplicar_regras_if_else(dados))
+
+def test_primeira_regra_que_casar_vence():
+    forcar_acerto = {'fundamento': 'Saque - Viagem', 'acao': 'forcar_acerto'}
+    forcar_erro = {'padrao': r'^Saque', 'acao': 'forcar_erro'}
+    valores = ['Saque - Viagem', 'Saque - Por baixo', 'Recepção - Manchete']
+
+    acoes = resolver_acoes_fundamentos(valores, compilar_regras_negocio([forcar_acerto, forcar_erro]))
+    assert acoes.tolist() == [ACAO_FORCAR_ACERTO, ACAO_FORCAR_ERRO, ACAO_NENHUMA]
+
+    acoes = resolver_acoes_fundamentos(valores, compilar_regras_negocio([forcar_erro, forcar_acerto]))
+    assert acoes.tolist() == [ACAO_FORCAR_ERRO, ACAO_FORCAR_ERRO, ACAO_NENHUMA]
+
+def test_fundamento_em_lista_e_padrao_na_mesma_regra():
+    (regra,) = compilar_regras_negocio([{'fundamento': ['Ataque'], 'padrao': r'\(Total\)$', 'acao': 'remover_totalizador'}])
+
+    assert regra.casa('Ataque') and regra.casa('Saque (Total)')
+    assert not regra.casa('Ataque - Diagonal')
+    assert regra.codigo_acao == ACAO_REMOVER_TOTALIZADOR
+
+@pytest.mark.parametrize('regra_invalida', [
+    {'fundamento': 'Saque - Viagem', 'acao': 'ignorar'},
+    {'fundamento': 'Saque - Viagem'},
+    {'acao': 'forcar_erro'},
+    {'fundamento': [], 'padrao': '', 'acao': 'forcar_erro'},
+])
+def test_regra_invalida_e_recusada(regra_invalida):
+    with pytest.raises(ValueError):
+        compilar_regras_negocio([*REGRAS_NEGOCIO_VOLEI, regra_invalida])
+
+def test_tabela_em_json_igual_a_da_configuracao(tmp_path):
+    caminho_regras = tmp_path / 'regras.json'
+    caminho_regras.write_text(json.dumps(REGRAS_NEGOCIO_VOLEI, ensure_ascii=False), encoding='utf-8')
+
+    regras = carregar_regras_negocio(str(caminho_regras))
+
+    assert regras == REGRAS_NEGOCIO
+    assert calcular_assinatura_regras(regras) == calcular_assinatura_regras(REGRAS_NEGOCIO)
+    assert calcular_assinatura_regras(regras[:2]) != calcular_assinatura_regras(REGRAS_NEGOCIO)